@@ -0,0 +1,150 @@
+import itertools
+import time
+import traceback
+from threading import Condition, Event, Thread
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+SUPERSEDED = 'superseded'
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class AnalysisJob:
+    """One requested analysis. The running code calls check() between
+    stages so a newer request can cancel it."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.state = QUEUED
+        self.error = None
+        self.requested_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def latency(self) -> float:
+        """Seconds from the request to the end of the job."""
+        if self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.requested_at
+
+
+class AnalysisScheduler:
+    """Runs analyses on a worker thread so the hotkey callback returns at once.
+
+    The queue holds a single pending slot: a new request replaces a job
+    that hasn't started yet (superseded) and cancels the one in flight, so
+    only the latest press is ever worked on.
+    """
+
+    def __init__(self, run_job, on_state=None):
+        self.run_job = run_job
+        self.on_state = on_state
+        self._cond = Condition()
+        self._pending = None
+        self._running = None
+        self._stopped = False
+        self._thread = Thread(target=self._worker, name="analysis", daemon=True)
+
+        self.started_at = time.perf_counter()
+        self.counts = {QUEUED: 0, DONE: 0, FAILED: 0, CANCELLED: 0, SUPERSEDED: 0}
+        self.busy_seconds = 0.0
+        self.total_latency = 0.0
+
+        self._thread.start()
+
+    def _set_state(self, job: AnalysisJob, state: str) -> None:
+        job.state = state
+        if state in self.counts:
+            self.counts[state] += 1
+        if self.on_state:
+            try:
+                self.on_state(job)
+            except Exception:
+                pass
+
+    def submit(self) -> AnalysisJob:
+        job = AnalysisJob()
+        with self._cond:
+            if self._pending is not None:
+                self._pending.cancel()
+                self._set_state(self._pending, SUPERSEDED)
+            if self._running is not None:
+                self._running.cancel()
+            self._pending = job
+            self._set_state(job, QUEUED)
+            self._cond.notify()
+        return job
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job = self._pending
+                self._pending = None
+                self._running = job
+
+            job.started_at = time.perf_counter()
+            self._set_state(job, RUNNING)
+            try:
+                self.run_job(job)
+                state = DONE
+            except JobCancelled:
+                state = CANCELLED
+            except Exception as ex:
+                job.error = ex
+                state = FAILED
+                print(f"\n❌ Error: {ex}")
+                traceback.print_exc()
+            job.finished_at = time.perf_counter()
+
+            with self._cond:
+                self._running = None
+                self.busy_seconds += job.finished_at - job.started_at
+                if state == DONE:
+                    self.total_latency += job.latency()
+                self._set_state(job, state)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopped = True
+            if self._running is not None:
+                self._running.cancel()
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        elapsed = time.perf_counter() - self.started_at
+        done = self.counts[DONE]
+        return {
+            'submitted': self.counts[QUEUED],
+            'done': done,
+            'failed': self.counts[FAILED],
+            'cancelled': self.counts[CANCELLED],
+            'superseded': self.counts[SUPERSEDED],
+            'avg_latency_ms': self.total_latency / done * 1000 if done else 0.0,
+            'throughput_per_min': done / elapsed * 60 if elapsed else 0.0,
+            'utilization': self.busy_seconds / elapsed if elapsed else 0.0,
+        }
@@ -1,66 +1,256 @@
+import time
+_PROCESS_START = time.perf_counter()
+
+import argparse
 import cv2
 import numpy as np
-import mss
-import json
-import time
-from PIL import Image, ImageTk
-from difflib import SequenceMatcher
-import easyocr
-import keyboard
-import tkinter as tk
-from threading import Thread
+from threading import Thread, Lock, Event, get_ident, local
+from contextlib import contextmanager, nullcontext
 import warnings
+from catalog_store import load_catalog
+from item_table import DEMAND_HIGH, DEMAND_LOW, DEFAULT_DEMAND, FAIR_MARGIN
+from refresh_service import CatalogSnapshot, RefreshService, format_age, load_fetcher_class
+from screen_capture import CaptureService, grab_frame
+from change_detector import WatchSession
+from ocr_cache import OCR_CACHE_FILE, OCRCache
+from ocr_tuning import create_reader, describe_reader
+from icon_recognizer import ICON_INDEX_FILE, IconIndex
+from debug_writer import DEBUG_LEVELS, DebugWriter
+from analysis_scheduler import QUEUED, RUNNING, SUPERSEDED, AnalysisScheduler
+from overlay import PANEL_H, PANEL_W, OverlayWindow, PanelRenderer, panel_origin
+from tracing import span, tracer
 
 # Suppress deprecation warnings from dependencies
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 
+# easyocr (and torch with it) and the OCR worker pool (multiprocessing)
+# are imported on the warm-up thread, mss when the screen is first grabbed,
+# keyboard when the hotkeys are registered, PIL and tkinter only when an
+# overlay is shown, so none of them delay startup
+_IMPORT_SECONDS = time.perf_counter() - _PROCESS_START
+
 class TradeHelper:
-    def __init__(self):
+    def __init__(self, capture_thread=False, capture_fps=10.0, capture_full=False,
+                 ocr_cache_size=32, ocr_cache_ttl=600.0, ocr_cache_tolerance=0, ocr_cache_file=None,
+                 icon_index_file=None, debug_level='async', debug_format='png', debug_compression=1,
+                 ocr_workers=0, ocr_quantize=True, ocr_threads=0, ocr_interop_threads=0,
+                 cache_file='item_values_cache.json', screen_size=None,
+                 refresh=False, refresh_interval=None):
+        # (step, seconds, thread id) for --profile-startup
+        self.startup_profile = [('module imports', _IMPORT_SECONDS, get_ident())]
+        
         print("="*70)
         print(" "*15 + "COUNTER BLOX TRADE HELPER - OCR")
         print("="*70)
         
-        print("\n Loading EasyOCR...")
-        self.reader = easyocr.Reader(['en'], gpu=False)
-        print("EasyOCR ready")
+        step = time.perf_counter()
+        self.ocr_cache = OCRCache(max_entries=ocr_cache_size, ttl=ocr_cache_ttl,
+                                  phash_tolerance=ocr_cache_tolerance, path=ocr_cache_file)
+        self.ocr_cache.load()
+        step = self._profile_step('OCR cache load', step)
         
-        with open('item_values_cache.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self.items = data.get('items', {})
+        # analyses pin the snapshot they start with (see pinned_catalog)
+        self._pinned = local()
+        items, last_update = load_catalog(cache_file)
+        step = self._profile_step('catalog load', step)
+        self.set_items(items, last_update)
+        step = self._profile_step('match index build', step)
         
         print(f"\n✓ Loaded {len(self.items)} items")
         
+        self.icon_index = None
+        if icon_index_file:
+            try:
+                self.icon_index = IconIndex.load(icon_index_file)
+                print(f"✓ Loaded {len(self.icon_index)} item icons")
+            except Exception as e:
+                print(f"   Could not load icon index ({e}), using OCR only")
+            step = self._profile_step('icon index load', step)
+        
         # get screen dim
-        with mss.mss() as sct:
-            monitor = sct.monitors[1]
-            self.screen_width = monitor['width']
-            self.screen_height = monitor['height']
+        if screen_size:
+            self.screen_width, self.screen_height = screen_size
+        else:
+            import mss
+            with mss.mss() as sct:
+                monitor = sct.monitors[1]
+                self.screen_width = monitor['width']
+                self.screen_height = monitor['height']
         print(f"✓ Screen: {self.screen_width}x{self.screen_height}")
+        step = self._profile_step('screen probe', step)
+        
+        # built on first use: its first cv2 text draw initializes fonts
+        # (~40 ms), which the OCR warm-up thread pays in the background
+        self._panel_renderer = None
+        self.overlay_window = OverlayWindow(display_seconds=15)
+        
+        self.debug_writer = DebugWriter(level=debug_level, fmt=debug_format, png_compression=debug_compression)
+        
+        self.capture_service = None
+        if capture_thread:
+            rois = None if capture_full else list(self.offer_regions())
+            self.capture_service = CaptureService(rois=rois, fps=capture_fps)
+            self.capture_service.start()
+            print(f"✓ Capture thread: {'full screen' if capture_full else 'offer regions'} @ {capture_fps:g} fps")
+            step = self._profile_step('capture thread start', step)
+        
+        # the model loads in the background; an early F8 waits on ocr_ready
+        self.reader = None
+        self.reader_error = None
+        self.ocr_workers = ocr_workers
+        self.reader_options = {'quantize': ocr_quantize, 'intra_op': ocr_threads, 'inter_op': ocr_interop_threads}
+        self.ocr_pool = None
+        self.ocr_ready = Event()
+        self.ocr_lock = Lock()
+        print("\n Loading EasyOCR in the background...")
+        Thread(target=self._load_reader, name="ocr-warmup", daemon=True).start()
         
         print("\n" + "="*70)
         print("INSTRUCTIONS:")
         print("="*70)
         print("1. Open Counter Blox trade screen")
         print("2. Press F8 to capture and analyze")
-        print("3. Press 'q' to quit")
+        print("3. Press F9 to toggle watch mode (auto-analyze on changes)")
+        print("4. Press 'q' to quit")
         print("="*70 + "\n")
         
+        # background value-list refresh, swapped in between analyses
+        self.refresh_service = None
+        if refresh:
+            fetcher = load_fetcher_class()(cache_file=cache_file)
+            self.refresh_service = RefreshService(fetcher, self.swap_catalog, interval=refresh_interval,
+                                                  current=lambda: self._catalog)
+            self.refresh_service.start()
+            print(f"✓ Value list refresh every {self.refresh_service.interval:g}s")
+        
         self.running = True
-        self.analyzing = False
+        self._closed = False
+        self.scheduler = AnalysisScheduler(self.analyze_trade_screen, on_state=self._report_job)
+        
+        self.watching = False
+        self._watch_session = None
+        self._watch_thread = None
+        self._watch_stop = Event()
+        self.watch_options = {}
     
-    def capture_screen(self):
-        with mss.mss() as sct:
-            monitor = sct.monitors[1]
-            screenshot = sct.grab(monitor)
-            img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
-            return np.array(img)
+    def _profile_step(self, label, started):
+        now = time.perf_counter()
+        self.startup_profile.append((label, now - started, get_ident()))
+        return now
+    
+    def _load_reader(self):
+        try:
+            # one tiny inference so the first real F8 doesn't pay for lazy setup
+            sample = np.full((48, 200, 3), 255, dtype=np.uint8)
+            cv2.putText(sample, "AK-47 Ace", (5, 34), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+            
+            step = time.perf_counter()
+            if self.ocr_workers:
+                from ocr_worker import OCRWorkerPool
+                pool = OCRWorkerPool(self.ocr_workers, self.reader_options)
+                pool.start()
+                step = self._profile_step(f'start {self.ocr_workers} OCR worker(s)', step)
+                pool.readtext_many([sample] * self.ocr_workers)
+                self._profile_step('warm-up inference', step)
+                self.ocr_pool = pool
+                print(f"\nEasyOCR ready ({self.ocr_workers} worker process(es))")
+                return
+            
+            import easyocr
+            step = self._profile_step('import easyocr/torch', step)
+            
+            reader = create_reader(**self.reader_options)
+            step = self._profile_step('easyocr.Reader init', step)
+            print(f"\n Reader: {describe_reader(reader)}")
+            
+            with self.ocr_lock:
+                reader.readtext(sample, detail=1, paragraph=True)
+            self._profile_step('warm-up inference', step)
+            
+            self.reader = reader
+            print("\nEasyOCR ready")
+        except Exception as e:
+            self.reader_error = e
+            print(f"\n❌ Could not load EasyOCR: {e}")
+        finally:
+            self.ocr_ready.set()
+    
+    def _wait_for_reader(self):
+        if not self.ocr_ready.is_set():
+            print("   Waiting for EasyOCR to finish loading...")
+            self.ocr_ready.wait()
+        if self.reader is None and self.ocr_pool is None:
+            raise RuntimeError(f"EasyOCR is not available ({self.reader_error})")
+    
+    def print_startup_profile(self, ready_seconds=None):
+        main_thread = self.startup_profile[0][2]
+        print("\n" + "="*70)
+        print("STARTUP PROFILE")
+        print("="*70)
+        for label, seconds, thread in self.startup_profile:
+            where = "main" if thread == main_thread else "background"
+            print(f"   {label:<30} {seconds*1000:>10.1f} ms   ({where})")
+        if ready_seconds is not None:
+            print("─"*70)
+            print(f"   {'ready for F8 after':<30} {ready_seconds*1000:>10.1f} ms")
+        print("="*70 + "\n")
+    
+    def set_items(self, items, last_update=None):
+        """Replace the catalog and rebuild the name indexes from it"""
+        self.swap_catalog(CatalogSnapshot(items, last_update))
+    
+    def swap_catalog(self, snapshot):
+        """Publish a fully built CatalogSnapshot. One reference assignment,
+        so readers see either the old snapshot or the new one; returns the
+        seconds the swap took"""
+        started = time.perf_counter()
+        self._catalog = snapshot
+        return time.perf_counter() - started
+    
+    @property
+    def catalog(self):
+        """The snapshot pinned by the current analysis, else the newest one"""
+        return getattr(self._pinned, 'catalog', None) or self._catalog
+    
+    @property
+    def items(self):
+        return self.catalog.items
+    
+    @property
+    def matcher(self):
+        return self.catalog.matcher
+    
+    @property
+    def table(self):
+        return self.catalog.table
+    
+    @contextmanager
+    def pinned_catalog(self):
+        """Keep this thread on one catalog snapshot until the block exits,
+        so a refresh landing mid-analysis can't mix old and new values"""
+        outer = getattr(self._pinned, 'catalog', None)
+        self._pinned.catalog = outer or self._catalog
+        try:
+            yield self._pinned.catalog
+        finally:
+            self._pinned.catalog = outer
+    
+    def offer_regions(self):
+        """(x, y, w, h) of your and their offer panels"""
+        h = self.screen_height
+        w = self.screen_width
+        your_region = (0, int(h*0.10), int(w*0.45), int(h*0.30))
+        their_region = (0, int(h*0.43), int(w*0.45), int(h*0.30))
+        return your_region, their_region
     
-    def capture_region(self, x, y, w, h):
-        monitor = {"top": y, "left": x, "width": w, "height": h}
+    def capture_frame(self, rois=None, sct=None):
+        """Grab the monitor (or just the box around ``rois``) once;
+        regions are sliced from the returned Frame"""
+        if sct is not None:
+            return grab_frame(sct, sct.monitors[1], rois)
+        import mss
         with mss.mss() as sct:
-            screenshot = sct.grab(monitor)
-            img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
-            return np.array(img)
+            return grab_frame(sct, sct.monitors[1], rois)
     
     def preprocess_for_ocr(self, img):
         gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
@@ -73,32 +263,121 @@ class TradeHelper:
         
         return processed
     
-    def extract_text(self, img):
+    @staticmethod
+    def _ocr_result(results):
+        """(text, boxes) from readtext(detail=1, paragraph=True) output"""
+        text = ' '.join(text for _, text in results).strip()
+        boxes = [[[int(x), int(y)] for x, y in box] for box, _ in results]
+        return text, boxes
+    
+    def _readtext(self, img):
+        """(text, boxes) of one crop, or None when OCR failed; failures
+        are never cached, so the next F8 retries"""
         try:
+            self._wait_for_reader()
+            if self.ocr_pool is not None:
+                return self.ocr_pool.readtext(img)
             # rgb shts
-            results = self.reader.readtext(img, detail=0, paragraph=True)
-            text = ' '.join(results)
-            return text.strip()
+            with self.ocr_lock:
+                results = self.reader.readtext(img, detail=1, paragraph=True)
+            return self._ocr_result(results)
         except Exception as e:
             print(f"   OCR Error: {e}")
-            return ""
+            return None
     
-    def find_item(self, text):
-        text = text.lower().strip()
-        if len(text) < 3:
-            return None, 0
-        
-        best = None
-        best_score = 0
-        
-        for name, data in self.items.items():
-            score = SequenceMatcher(None, text, name.lower()).ratio()
-            # matching
-            if score > best_score and score > 0.75:
-                best_score = score
-                best = data
+    def extract_text(self, img):
+        with span('ocr.extract_text', shape=img.shape[:2]) as sp:
+            cached = self.ocr_cache.get(img)
+            if cached is not None:
+                sp.set(cached=True)
+                return cached[0]
+            result = self._readtext(img)
+            if result is None:
+                return ""
+            text, boxes = result
+            self.ocr_cache.put(img, text, boxes)
+            return text
+    
+    def extract_texts(self, imgs):
+        """OCR several regions through the reader together, one text per region.
+        
+        Crops already in the OCR cache are answered from it. The rest are
+        grouped by size so same-sized crops share a single readtext_batched
+        call; a crop with a unique size falls back to a plain readtext. With
+        OCR worker processes the crops are spread across them instead.
+        """
+        texts = [None] * len(imgs)
+        groups = {}
+        with span('ocr.cache_lookup', crops=len(imgs)) as sp:
+            for idx, img in enumerate(imgs):
+                cached = self.ocr_cache.get(img)
+                if cached is not None:
+                    texts[idx] = cached[0]
+                else:
+                    groups.setdefault(img.shape, []).append(idx)
+            sp.set(hits=len(imgs) - sum(len(indexes) for indexes in groups.values()))
+        
+        if groups and not self.ocr_ready.is_set():
+            print("   Waiting for EasyOCR to finish loading...")
+            with span('ocr.wait_for_reader'):
+                self.ocr_ready.wait()
+        
+        if self.ocr_pool is not None:
+            # worker processes take one crop each, in parallel
+            groups = {'all': [idx for indexes in groups.values() for idx in indexes]} if groups else {}
+        
+        for indexes in groups.values():
+            if self.ocr_pool is not None:
+                with span('ocr.workers', crops=len(indexes)):
+                    try:
+                        results = self.ocr_pool.readtext_many([imgs[idx] for idx in indexes])
+                    except Exception as e:
+                        print(f"   OCR worker Error: {e}")
+                        results = [self._readtext(imgs[idx]) for idx in indexes]
+            elif len(indexes) == 1:
+                with span('ocr.extract_text', shape=imgs[indexes[0]].shape[:2]):
+                    results = [self._readtext(imgs[indexes[0]])]
+            else:
+                with span('ocr.batched', crops=len(indexes), shape=imgs[indexes[0]].shape[:2]):
+                    try:
+                        self._wait_for_reader()
+                        batch = [imgs[idx] for idx in indexes]
+                        with self.ocr_lock:
+                            batched = self.reader.readtext_batched(batch, detail=1, paragraph=True)
+                        results = [self._ocr_result(region_results) for region_results in batched]
+                    except Exception as e:
+                        print(f"   Batched OCR Error: {e}")
+                        results = [self._readtext(imgs[idx]) for idx in indexes]
+            
+            for idx, result in zip(indexes, results):
+                if result is None:
+                    texts[idx] = ""
+                    continue
+                text, boxes = result
+                texts[idx] = text
+                self.ocr_cache.put(imgs[idx], text, boxes)
+        
+        return texts
+    
+    def recognize_icons(self, region_img):
+        """Items of an offer recognized from their card thumbnails, or None
+        when icon matching is off or not confident for every card"""
+        if self.icon_index is None:
+            return None
+        names = self.icon_index.recognize_region(region_img)
+        if names is None:
+            return None
         
-        return best, best_score
+        items = []
+        for name in names:
+            data = self.items.get(name) or self.find_item(name)[0]
+            if data is None:
+                return None
+            items.append(data)
+        return items
+    
+    def find_item(self, text):
+        return self.matcher.find(text, threshold=0.75)
     
     def parse_text_for_items(self, text):
         items = []
@@ -145,63 +424,135 @@ class TradeHelper:
             
             print(f"         Searching in chunk: '{chunk}'")
             
-            remaining_text = chunk.lower()
-            chunk_items = []
+            with span('parse.chunk', chars=len(chunk)) as sp:
+                # exact names in one automaton pass, fuzzy matching on what's left
+                exact_hits, remaining_text = self.matcher.find_exact(chunk.lower())
+                chunk_items = []
             
-            for attempt in range(5):
-                if len(remaining_text) < 3:
-                    break
-                    
-                best_match = None
-                best_score = 0
-                best_name = None
-                
-                sorted_items = sorted(self.items.items(), key=lambda x: len(x[0]), reverse=True)
-                
-                for name, data in sorted_items:
-                    name_lower = name.lower()
-                    if name_lower in remaining_text:
-                        score = 1.0
-                    else:
-                        score = SequenceMatcher(None, remaining_text, name_lower).ratio()
+                sp.set(exact=len(exact_hits))
+                for _, _, idx in exact_hits:
+                    name = self.matcher.names[idx]
+                    if name not in found_names:
+                        chunk_items.append((self.matcher.data[idx], name, 1.0))
+                        found_names.add(name)
+            
+                for attempt in range(5 - len(chunk_items)):
+                    if len(remaining_text) < 3:
+                        break
                     
-                    if score > best_score and score > 0.50:
-                        best_score = score
-                        best_match = data
-                        best_name = name
+                    with span('parse.attempt', attempt=attempt, chars=len(remaining_text)):
+                        best_name, best_match, best_score = self.matcher.find_in_text(remaining_text, threshold=0.50)
                 
-                if best_match and best_name not in found_names:
-                    chunk_items.append((best_match, best_name, best_score))
-                    found_names.add(best_name)
-                    remaining_text = remaining_text.replace(best_name.lower(), ' ', 1)
-                    remaining_text = ' '.join(remaining_text.split()) 
+                    if best_match and best_name not in found_names:
+                        chunk_items.append((best_match, best_name, best_score))
+                        found_names.add(best_name)
+                        remaining_text = remaining_text.replace(best_name.lower(), ' ', 1)
+                        remaining_text = ' '.join(remaining_text.split()) 
                     
-                    if best_score < 0.75:
-                        print(f"      ⚠️  Low confidence match (score: {best_score:.2f})")
-                else:
-                    break
+                        if best_score < 0.75:
+                            print(f"      ⚠️  Low confidence match (score: {best_score:.2f})")
+                    else:
+                        break
             
             for match_data, match_name, match_score in chunk_items:
                 items.append(match_data)
         
         return items
     
-    def analyze_trade_screen(self):
+    def _report_job(self, job):
+        if job.state == QUEUED:
+            print("\n" + "="*70)
+            print(f" F8 pressed - analysis #{job.id} queued")
+            print("="*70)
+        elif job.state == RUNNING:
+            print(f"\n Analysis #{job.id} started after {(job.started_at - job.requested_at)*1000:.0f} ms")
+        elif job.state == SUPERSEDED:
+            print(f"\n Analysis #{job.id} replaced by a newer F8 press")
+        else:
+            print(f"\n Analysis #{job.id} {job.state} in {job.latency():.2f}s")
+    
+    def analyze_trade_screen(self, job=None):
+        """Capture, recognize and show one trade. ``job`` (from the analysis
+        scheduler) is checked between stages so a newer F8 can cancel it."""
+        with span('analysis', job=job.id if job is not None else None), self.pinned_catalog():
+            return self._analyze_trade_screen(job)
+    
+    def _analyze_trade_screen(self, job):
+        check = job.check if job is not None else (lambda: None)
+        
         print("\n" + "─"*70)
         print("CAPTURING SCREEN...")
         print("─"*70)
         
-        screen = self.capture_screen()
-        screen_bgr = cv2.cvtColor(screen, cv2.COLOR_RGB2BGR)
+        your_region, their_region = self.offer_regions()
+        
+        # newest frame from the capture thread, or a fresh grab
+        with span('capture.grab') as sp:
+            lease = self.capture_service.latest() if self.capture_service else None
+            sp.set(source='capture thread' if lease is not None else 'grab')
+            if lease is None:
+                lease = nullcontext(self.capture_frame())
+        
+        with lease as frame, span('capture.convert'):
+            # the full frame is only converted when debug images want it
+            screen_bgr = frame.bgr(self.screen_width, self.screen_height) if self.debug_writer.enabled else None
+            backdrop = self.panel_backdrop(frame)
+            # the reader was always fed RGB crops, keep it that way
+            your_img = frame.region_rgb(*your_region)
+            their_img = frame.region_rgb(*their_region)
+        
+        check()
+        if screen_bgr is not None:
+            with span('debug.submit', images=2):
+                self.debug_writer.submit('debug_screen.png', screen_bgr)
+                self.debug_writer.submit('debug_regions.png',
+                                         render=lambda: self.draw_debug_regions(screen_bgr, your_region, their_region))
+        
+        # card thumbnails first; only offers they can't fully explain go to OCR
+        with span('icons'):
+            your_items = self.recognize_icons(your_img)
+            their_items = self.recognize_icons(their_img)
+        
+        pending = [img for img, items in ((your_img, your_items), (their_img, their_items)) if items is None]
+        texts = []
+        if pending:
+            check()
+            print(f"\n RUNNING OCR ON {len(pending)} OFFER(S)...")
+            with span('ocr', crops=len(pending)):
+                texts = self.extract_texts(pending)
+        
+        check()
+        print("\n SCANNING YOUR OFFER...")
+        if your_items is None:
+            with span('parse', side='your'):
+                your_items = self.parse_text_for_items(texts.pop(0))
+        else:
+            print("   Recognized from card icons")
+        print(f"   Found {len(your_items)} items")
         
-        cv2.imwrite('debug_screen.png', screen_bgr)
+        print("\n SCANNING THEIR OFFER...")
+        if their_items is None:
+            with span('parse', side='their'):
+                their_items = self.parse_text_for_items(texts.pop(0))
+        else:
+            print("   Recognized from card icons")
+        print(f"   Found {len(their_items)} items")
         
-        h = self.screen_height
-        w = self.screen_width
+        stats = self.ocr_cache.stats()
+        print(f"   OCR cache: {stats['hits']} hits / {stats['misses']} misses")
+        if self.debug_writer.level == 'async':
+            stats = self.debug_writer.stats()
+            print(f"   Debug writer: {stats['written']} written, {stats['dropped']} dropped, "
+                  f"{stats['avg_write_ms']:.1f} ms avg write")
         
-        your_region = (0, int(h*0.10), int(w*0.45), int(h*0.30))
-        their_region = (0, int(h*0.43), int(w*0.45), int(h*0.30))
+        if not your_items and not their_items:
+            print("\n Non items detected")
+            return
         
+        check()
+        self.present_result(backdrop, your_items, their_items)
+    
+    def draw_debug_regions(self, screen_bgr, your_region, their_region):
         debug_with_regions = screen_bgr.copy()
         cv2.rectangle(debug_with_regions, 
                      (your_region[0], your_region[1]),
@@ -218,205 +569,155 @@ class TradeHelper:
         cv2.putText(debug_with_regions, "THEIR OFFER", 
                    (their_region[0], their_region[1]-10),
                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-        
-        cv2.imwrite('debug_regions.png', debug_with_regions)
-        
-        print("\n SCANNING YOUR OFFER...")
-        your_img = self.capture_region(*your_region)
-        your_text = self.extract_text(your_img)
-        
-        your_items = self.parse_text_for_items(your_text)
-        print(f"   Found {len(your_items)} items")
-        
-        print("\n SCANNING THEIR OFFER...")
-        their_img = self.capture_region(*their_region)
-        their_text = self.extract_text(their_img)
-        
-        their_items = self.parse_text_for_items(their_text)
-        print(f"   Found {len(their_items)} items")
-        
-        if not your_items and not their_items:
-            print("\n Non items detected")
-            return
-        
-        self.show_result(your_items, their_items)
-        
-        result_img = self.draw_overlay(screen_bgr, your_items, their_items)
-        cv2.imwrite('trade_result.png', result_img)
-        print("\n Result saved: trade_result.png")
+        return debug_with_regions
+    
+    def present_result(self, backdrop, your_items, their_items):
+        with span('valuation'):
+            totals = self.trade_totals(your_items, their_items)
+        
+        with span('show_result'):
+            self.show_result(your_items, their_items, totals)
+        catalog = self.catalog
+        print(f" Values: catalog v{catalog.version}, {format_age(catalog.age())} old")
+        
+        with span('draw_overlay'):
+            result_img = self.draw_overlay(None, your_items, their_items, backdrop=backdrop, totals=totals)
+        with span('debug.submit', images=1):
+            saved = self.debug_writer.submit('trade_result.png', result_img)
+        if saved:
+            print("\n Result saved: trade_result.png")
         
         # overlay screen
         print(" overlay for 15 seconds...")
-        self.show_overlay_window(result_img)
-    
-    def draw_overlay(self, img, your_items, their_items):
-        overlay = img.copy()
-        h, w = overlay.shape[:2]
-        
-        your_val = sum(i.get('base_value', 0) for i in your_items)
-        their_val = sum(i.get('base_value', 0) for i in their_items)
-        diff = their_val - your_val
-        pct = (diff / max(your_val, 1)) * 100 if your_val > 0 else 0
-        
-        your_val_adj = self.calculate_adjusted_value(your_items)
-        their_val_adj = self.calculate_adjusted_value(their_items)
-        diff_adj = their_val_adj - your_val_adj
-        pct_adj = (diff_adj / max(your_val_adj, 1)) * 100 if your_val_adj > 0 else 0
-        
-        panel_w = 900
-        panel_h = 400
-        panel_x = w - panel_w - 30
-        panel_y = 30
-        
-        cv2.rectangle(overlay, (panel_x, panel_y), 
-                     (panel_x + panel_w, panel_y + panel_h), 
-                     (30, 30, 30), -1)
-        cv2.rectangle(overlay, (panel_x, panel_y), 
-                     (panel_x + panel_w, panel_y + panel_h), 
-                     (255, 255, 255), 3)
-        
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        y_pos = panel_y + 50
-        
-        cv2.putText(overlay, "TRADE ANALYSIS", (panel_x + 30, y_pos), 
-                   font, 1.2, (255, 255, 255), 2)
-        
-        y_pos += 60
-        cv2.putText(overlay, f"Your Offer:", 
-                   (panel_x + 30, y_pos), font, 0.8, (200, 200, 200), 2)
-        cv2.putText(overlay, f"{int(your_val):,}", 
-                   (panel_x + 250, y_pos), font, 0.8, (100, 200, 255), 2)
-        cv2.putText(overlay, f"Demand: {int(your_val_adj):,}", 
-                   (panel_x + 550, y_pos), font, 0.7, (80, 180, 235), 2)
-        cv2.putText(overlay, f"({len(your_items)} items)", 
-                   (panel_x + 30, y_pos + 30), font, 0.5, (150, 150, 150), 1)
-        
-        y_pos += 80
-        cv2.putText(overlay, f"Their Offer:", 
-                   (panel_x + 30, y_pos), font, 0.8, (200, 200, 200), 2)
-        cv2.putText(overlay, f"{int(their_val):,}", 
-                   (panel_x + 250, y_pos), font, 0.8, (255, 200, 100), 2)
-        cv2.putText(overlay, f"Demand: {int(their_val_adj):,}", 
-                   (panel_x + 550, y_pos), font, 0.7, (235, 180, 80), 2)
-        cv2.putText(overlay, f"({len(their_items)} items)", 
-                   (panel_x + 30, y_pos + 30), font, 0.5, (150, 150, 150), 1)
-        
-        y_pos += 60
-        cv2.line(overlay, (panel_x + 30, y_pos - 30), 
-                (panel_x + panel_w - 30, y_pos - 30), (100, 100, 100), 2)
-        
-        if abs(diff) < 50:
-            status = "FAIR TRADE"
-            color = (0, 255, 255)
-        elif diff > 0:
-            status = f"WIN (+{int(diff):,} / +{pct:.1f}%)"
-            color = (0, 255, 0)
-        else:
-            status = f"LOSE ({int(diff):,} / {pct:.1f}%)"
-            color = (0, 0, 255)
-        
-        cv2.putText(overlay, "Base Value:", (panel_x + 30, y_pos + 10), 
-                   font, 0.7, (200, 200, 200), 1)
-        cv2.putText(overlay, status, (panel_x + 30, y_pos + 45), 
-                   font, 1.0, color, 3)
-        
-        y_pos += 90
-        if abs(diff_adj) < 50:
-            status_adj = "FAIR TRADE"
-            color_adj = (0, 255, 255)
-        elif diff_adj > 0:
-            status_adj = f"WIN (+{int(diff_adj):,} / +{pct_adj:.1f}%)"
-            color_adj = (0, 255, 0)
-        else:
-            status_adj = f"LOSE ({int(diff_adj):,} / {pct_adj:.1f}%)"
-            color_adj = (0, 0, 255)
+        with span('overlay.show'):
+            self.show_overlay_window(result_img)
+    
+    def start_watch(self, interval=0.5, rows=2, cols=4):
+        """Re-analyze automatically whenever an offer region changes"""
+        if self.watching:
+            return
+        # a fresh session and stop event per run: the previous thread may
+        # still be inside a step after stop_watch(wait=False)
+        self._watch_session = WatchSession(2, rows, cols)
+        self.watching = True
+        self._watch_stop = Event()
+        self._watch_thread = Thread(target=self._watch_loop, args=(interval, self._watch_stop, self._watch_session),
+                                    daemon=True)
+        self._watch_thread.start()
+        print(f"\n Watch mode ON (every {interval:g}s, {rows}x{cols} tiles per offer)")
+    
+    def stop_watch(self, wait=True):
+        self.watching = False
+        self._watch_stop.set()
+        if self._watch_thread and wait:
+            self._watch_thread.join(timeout=5)
+        self._watch_thread = None
+        print("\n Watch mode OFF")
+    
+    def _watch_loop(self, interval, stop, session):
+        # one mss handle for the whole session instead of one per tick
+        import mss
+        with mss.mss() as sct:
+            while not stop.is_set() and self.running:
+                started = time.perf_counter()
+                try:
+                    self.watch_step(sct, session)
+                except Exception as ex:
+                    print(f"\n❌ Watch error: {ex}")
+                elapsed = time.perf_counter() - started
+                stop.wait(max(0.0, interval - elapsed))
+    
+    def watch_step(self, sct=None, session=None):
+        """One watch tick. Fingerprints both offers and only OCRs the offers
+        that changed; returns True when a new result was shown"""
+        with self.pinned_catalog():
+            return self._watch_step(sct, session or self._watch_session)
+    
+    def _watch_step(self, sct, session):
+        regions = self.offer_regions()
+        
+        lease = self.capture_service.latest() if self.capture_service else None
+        if lease is None:
+            lease = nullcontext(self.capture_frame(rois=regions, sct=sct))
+        
+        changed = []
+        backdrop = None
+        with lease as frame:
+            for watcher, region in zip(session.watchers, regions):
+                if watcher.update(frame.region(*region)):
+                    # the same whole-offer RGB crop F8 reads, so the OCR cache is shared too
+                    changed.append((watcher, frame.region_rgb(*region)))
+            if changed:
+                backdrop = self.panel_backdrop(frame)
+        
+        if not changed:
+            return False
+        
+        print(f"\n WATCH: {len(changed)} offer(s) changed, running OCR...")
+        with span('ocr', crops=len(changed), watch=True):
+            texts = self.extract_texts([img for _, img in changed])
+        for (watcher, _), text in zip(changed, texts):
+            watcher.text = text
+        
+        your_watcher, their_watcher = session.watchers
+        with span('parse', side='your'):
+            your_items = self.parse_text_for_items(your_watcher.text)
+        with span('parse', side='their'):
+            their_items = self.parse_text_for_items(their_watcher.text)
+        
+        names = ([i['name'] for i in your_items], [i['name'] for i in their_items])
+        if names == session.last_names:
+            return False
+        session.last_names = names
         
-        cv2.putText(overlay, "Demand Adjusted:", (panel_x + 30, y_pos), 
-                   font, 0.7, (200, 200, 200), 1)
-        cv2.putText(overlay, status_adj, (panel_x + 30, y_pos + 35), 
-                   font, 1.0, color_adj, 3)
+        if not your_items and not their_items:
+            print("\n Non items detected")
+            return False
         
-        result = cv2.addWeighted(overlay, 0.85, img, 0.15, 0)
-        return result
+        self.present_result(backdrop, your_items, their_items)
+        return True
+    
+    def panel_backdrop(self, frame):
+        """BGR copy of the screen area under the result panel, if it was grabbed"""
+        panel_x, panel_y = panel_origin(self.screen_width)
+        if not frame.contains(panel_x, panel_y, PANEL_W, PANEL_H):
+            return None
+        return frame.region_bgr(panel_x, panel_y, PANEL_W, PANEL_H)
+    
+    def trade_totals(self, your_items, their_items):
+        """ItemTable.compare for two lists of matched item dicts"""
+        return self.table.compare(self.table.rows(your_items), self.table.rows(their_items))
+    
+    def draw_overlay(self, img, your_items, their_items, backdrop=None, totals=None):
+        """Render the result panel, blended over the BGR screen ``img`` or
+        directly over the panel-sized ``backdrop``"""
+        totals = totals or self.trade_totals(your_items, their_items)
+        your, their = totals['your'], totals['their']
+        
+        if backdrop is None and img is not None:
+            panel_x, panel_y = panel_origin(img.shape[1])
+            backdrop = img[panel_y:panel_y + PANEL_H, panel_x:panel_x + PANEL_W]
+        
+        if self._panel_renderer is None:
+            self._panel_renderer = PanelRenderer()
+        return self._panel_renderer.render(your['base'], their['base'], your['adjusted'], their['adjusted'],
+                                          your['count'], their['count'], backdrop)
     
     def calculate_adjusted_value(self, items):
         """Calculate value adjusted by demand"""
-        total = 0
-        for item in items:
-            base = item.get('base_value', 0)
-            demand = item.get('demand', 5)
-            
-            # Demand adjustment: 1-3=low (-20%), 4-7=normal (0%), 8-10=high (+20%)
-            if demand <= 3:
-                adjusted = base * 0.80
-            elif demand >= 8:
-                adjusted = base * 1.20
-            else:
-                adjusted = base
-            
-            total += adjusted
-        return total
+        return self.table.totals(self.table.rows(items))['adjusted']
     
-    def show_overlay_window(self, img_bgr):
-        """Display overlay panel on screen using Tkinter"""
+    def show_overlay_window(self, panel_bgr):
+        """Display overlay panel on screen in the persistent overlay window"""
         try:
-            h, w = img_bgr.shape[:2]
-            
-            panel_w = 900
-            panel_h = 400
-            panel_x = w - panel_w - 30
-            panel_y = 30
-            
-            panel_img = img_bgr[panel_y:panel_y+panel_h, panel_x:panel_x+panel_w]
-            
-            img_rgb = cv2.cvtColor(panel_img, cv2.COLOR_BGR2RGB)
-            img_pil = Image.fromarray(img_rgb)
-            
-            # Create RGBA image for transparency
-            img_rgba = Image.new('RGBA', img_pil.size)
-            img_rgba.paste(img_pil)
-            
-            # Apply semi-transparency (0-255, lower = more transparent)
-            alpha = img_rgba.split()[3]
-            alpha = Image.eval(alpha, lambda a: 220)  # 220/255 = ~86% opacity
-            img_rgba.putalpha(alpha)
-            
-            root = tk.Tk()
-            root.overrideredirect(True)
-            root.attributes('-topmost', True)
-            root.attributes('-alpha', 0.9)  # Window transparency
-            
-            screen_width = root.winfo_screenwidth()
-            screen_height = root.winfo_screenheight()
-            x_pos = screen_width - panel_w - 30
-            y_pos = 30
-            
-            root.geometry(f'{panel_w}x{panel_h}+{x_pos}+{y_pos}')
-            root.configure(bg='black')
-            
-            photo = ImageTk.PhotoImage(img_rgba)
-            
-            label = tk.Label(root, image=photo, bg='black', borderwidth=0)
-            label.image = photo 
-            label.pack()
-            
-            def close_window(event=None):
-                root.destroy()
-            
-            root.bind('<Button-1>', close_window)
-            root.bind('<Escape>', close_window)
-            root.after(15000, close_window) 
-            
-            root.mainloop()
+            self.overlay_window.show(panel_bgr)
         except Exception as e:
             print(f"    Could not display overlay: {e}")
     
-    def show_result(self, your_items, their_items):
-        your_val = sum(i.get('base_value', 0) for i in your_items)
-        their_val = sum(i.get('base_value', 0) for i in their_items)
-        
-        your_val_adj = self.calculate_adjusted_value(your_items)
-        their_val_adj = self.calculate_adjusted_value(their_items)
+    def show_result(self, your_items, their_items, totals=None):
+        totals = totals or self.trade_totals(your_items, their_items)
+        your_val, your_val_adj = totals['your']['base'], totals['your']['adjusted']
+        their_val, their_val_adj = totals['their']['base'], totals['their']['adjusted']
         
         print("\n" + "="*70)
         print(" "*25 + " TRADE ANALYSIS")
@@ -427,8 +728,8 @@ class TradeHelper:
         if your_items:
             for i in your_items:
                 val = int(i.get('base_value', 0))
-                demand = i.get('demand', 5)
-                demand_icon = "🔥" if demand >= 8 else "❄️" if demand <= 3 else "⚖️"
+                demand = i.get('demand', DEFAULT_DEMAND)
+                demand_icon = "🔥" if demand >= DEMAND_HIGH else "❄️" if demand <= DEMAND_LOW else "⚖️"
                 print(f"   {i['name']:<45} {demand_icon} {val:>13,}")
         else:
             print("   (no items detected)")
@@ -441,8 +742,8 @@ class TradeHelper:
         if their_items:
             for i in their_items:
                 val = int(i.get('base_value', 0))
-                demand = i.get('demand', 5)
-                demand_icon = "🔥" if demand >= 8 else "❄️" if demand <= 3 else "⚖️"
+                demand = i.get('demand', DEFAULT_DEMAND)
+                demand_icon = "🔥" if demand >= DEMAND_HIGH else "❄️" if demand <= DEMAND_LOW else "⚖️"
                 print(f"   {i['name']:<45} {demand_icon} {val:>13,}")
         else:
             print("   (no items detected)")
@@ -450,15 +751,12 @@ class TradeHelper:
         print(f"   {'BASE TOTAL:':<50} {int(their_val):>15,}")
         print(f"   {'DEMAND ADJUSTED:':<50} {int(their_val_adj):>15,}")
         
-        diff = their_val - your_val
-        pct = (diff / max(your_val, 1)) * 100 if your_val > 0 else 0
-        
-        diff_adj = their_val_adj - your_val_adj
-        pct_adj = (diff_adj / max(your_val_adj, 1)) * 100 if your_val_adj > 0 else 0
+        diff, pct = totals['base']['diff'], totals['base']['pct']
+        diff_adj, pct_adj = totals['adjusted']['diff'], totals['adjusted']['pct']
         
         print("\n" + "="*70)
         print(" "*20 + " BASE VALUE ANALYSIS")
-        if abs(diff) < 50:
+        if abs(diff) < FAIR_MARGIN:
             print(" "*25 + "⚖️  FAIR TRADE")
         elif diff > 0:
             print(" "*20 + f"✅ WIN (+{int(diff):,} | +{pct:.1f}%)")
@@ -467,7 +765,7 @@ class TradeHelper:
         
         print("\n" + "─"*70)
         print(" "*18 + "🔥 DEMAND ADJUSTED ANALYSIS")
-        if abs(diff_adj) < 50:
+        if abs(diff_adj) < FAIR_MARGIN:
             print(" "*25 + "⚖️  FAIR TRADE")
         elif diff_adj > 0:
             print(" "*20 + f"✅ WIN (+{int(diff_adj):,} | +{pct_adj:.1f}%)")
@@ -475,45 +773,168 @@ class TradeHelper:
             print(" "*20 + f"❌ LOSE ({int(diff_adj):,} | {pct_adj:.1f}%)")
         print("="*70 + "\n")
     
-    def run(self):
+    def close(self):
+        """Stop the background services and save the OCR cache. run() calls
+        this on exit; scripts that only construct a helper call it
+        themselves. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        self.running = False
+        if self.refresh_service:
+            self.refresh_service.stop()
+        self.scheduler.stop()
+        if self.watching:
+            self.stop_watch()
+        if self.capture_service:
+            self.capture_service.stop()
+        self.ocr_cache.save()
+        if self.ocr_pool is not None:
+            self.ocr_pool.close()
+        self.overlay_window.close()
+        self.debug_writer.close()
+    
+    def run(self, profile_startup=False, trace_file=None):
         print("\n Trade Helper is running!")
         print("   Press F8 anywhere to analyze trade")
         print("   Press 'q' to quit\n")
         
+        # the hook callbacks only hand work off, so they return immediately
         def on_f8_press(e):
-            if not self.analyzing:
-                self.analyzing = True
-                print("\n" + "="*70)
-                print(" F8 pressed - Starting analysis...")
-                print("="*70)
-                try:
-                    self.analyze_trade_screen()
-                except Exception as ex:
-                    print(f"\n❌ Error: {ex}")
-                    import traceback
-                    traceback.print_exc()
-                finally:
-                    self.analyzing = False
+            self.scheduler.submit()
+        
+        def on_f9_press(e):
+            if self.watching:
+                self.stop_watch(wait=False)
+            else:
+                self.start_watch(**self.watch_options)
         
         def on_q_press(e):
             print("\n Exiting...")
             self.running = False
         
+        step = time.perf_counter()
+        import keyboard
         keyboard.on_press_key('f8', on_f8_press)
+        keyboard.on_press_key('f9', on_f9_press)
         keyboard.on_press_key('q', on_q_press)
         
+        self._profile_step('hotkey registration', step)
+        ready_seconds = time.perf_counter() - _PROCESS_START
+        print(f" Ready for F8 after {ready_seconds:.2f}s")
+        
+        if profile_startup:
+            # wait for the model so the background steps show up too
+            def report():
+                self.ocr_ready.wait()
+                self.print_startup_profile(ready_seconds)
+            Thread(target=report, daemon=True).start()
+        
         try:
             while self.running:
                 time.sleep(0.1)
         finally:
             keyboard.unhook_all()
+            self.close()
+            if self.refresh_service:
+                stats = self.refresh_service.stats()
+                print(f" Value list: {stats['refreshes']} refreshes, {stats['swaps']} swapped in "
+                      f"({stats['patched']} patched), "
+                      f"{stats['unchanged']} unchanged, {stats['failed']} failed, "
+                      f"{stats['avg_swap_us']:.1f} us avg swap, {stats['last_build_ms']:.0f} ms last build")
+            stats = self.scheduler.stats()
+            print(f" Analyses: {stats['done']} done, {stats['cancelled']} cancelled, "
+                  f"{stats['superseded']} superseded, {stats['failed']} failed, "
+                  f"{stats['avg_latency_ms']:.0f} ms avg latency, {stats['throughput_per_min']:.1f}/min")
+            if trace_file:
+                try:
+                    count = tracer.export(trace_file)
+                    print(f" Trace: {count} spans written to {trace_file}")
+                except OSError as e:
+                    print(f" Could not write trace: {e}")
+            if self.debug_writer.enabled:
+                stats = self.debug_writer.stats()
+                print(f" Debug images: {stats['written']} written, {stats['dropped']} dropped, "
+                      f"{stats['avg_write_ms']:.1f} ms avg write")
             print(" Cleanup complete")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Counter Blox trade helper")
+    parser.add_argument('--capture-thread', action='store_true',
+                        help="keep grabbing frames in the background so F8 skips the screen grab")
+    parser.add_argument('--capture-fps', type=float, default=10.0,
+                        help="background capture rate (default: 10)")
+    parser.add_argument('--capture-full', action='store_true',
+                        help="background-capture the full screen instead of only the offer regions")
+    parser.add_argument('--watch', action='store_true',
+                        help="start in watch mode (F9 toggles it)")
+    parser.add_argument('--watch-interval', type=float, default=0.5,
+                        help="seconds between watch-mode change checks (default: 0.5)")
+    parser.add_argument('--watch-grid', default='2x4',
+                        help="ROWSxCOLS change-detection tiles per offer; a changed offer is OCR'd whole (default: 2x4)")
+    parser.add_argument('--ocr-cache-size', type=int, default=32,
+                        help="OCR results kept per region image, 0 disables the cache (default: 32)")
+    parser.add_argument('--ocr-cache-ttl', type=float, default=600.0,
+                        help="seconds a cached OCR result stays valid, 0 = forever (default: 600)")
+    parser.add_argument('--ocr-cache-tolerance', type=int, default=0,
+                        help="reuse results for near-identical crops up to this many hash bits apart (default: 0, exact only)")
+    parser.add_argument('--ocr-cache-persist', action='store_true',
+                        help=f"keep OCR results between runs in {OCR_CACHE_FILE}")
+    parser.add_argument('--ocr-workers', type=int, default=0,
+                        help="run EasyOCR in this many separate processes instead of in-process (default: 0)")
+    parser.add_argument('--ocr-precision', choices=('int8', 'fp32'), default='int8',
+                        help="int8 = dynamically quantized recognizer/detector (easyocr's CPU default), fp32 = unquantized")
+    parser.add_argument('--ocr-threads', type=int, default=0,
+                        help="torch intra-op threads for OCR inference, 0 = torch default")
+    parser.add_argument('--ocr-interop-threads', type=int, default=0,
+                        help="torch inter-op threads for OCR inference, 0 = torch default")
+    parser.add_argument('--icons', action='store_true',
+                        help=f"recognize item cards by thumbnail using {ICON_INDEX_FILE} before falling back to OCR")
+    parser.add_argument('--debug-images', choices=DEBUG_LEVELS, default='async',
+                        help="how debug_screen/debug_regions/trade_result images are written (default: async)")
+    parser.add_argument('--debug-format', choices=('png', 'npy'), default='png',
+                        help="debug image format, npy skips encoding entirely (default: png)")
+    parser.add_argument('--debug-compression', type=int, default=1, choices=range(10), metavar='0-9',
+                        help="PNG compression level for debug images (default: 1)")
+    parser.add_argument('--refresh', action='store_true',
+                        help="re-fetch the value list in the background and swap new values in without restarting")
+    parser.add_argument('--refresh-interval', type=float, default=None,
+                        help="seconds between value list refreshes (default: the fetcher's, 300)")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="record per-stage timing spans and write them on exit, "
+                             "as JSON lines for *.jsonl or Chrome trace_event JSON otherwise")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print a breakdown of import and init time once EasyOCR has loaded")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.trace:
+        tracer.enable()
     try:
         print("Starting Trade Helper...")
-        helper = TradeHelper()
-        helper.run()
+        helper = TradeHelper(capture_thread=args.capture_thread,
+                             capture_fps=args.capture_fps,
+                             capture_full=args.capture_full,
+                             ocr_cache_size=args.ocr_cache_size,
+                             ocr_cache_ttl=args.ocr_cache_ttl,
+                             ocr_cache_tolerance=args.ocr_cache_tolerance,
+                             ocr_cache_file=OCR_CACHE_FILE if args.ocr_cache_persist else None,
+                             icon_index_file=ICON_INDEX_FILE if args.icons else None,
+                             debug_level=args.debug_images,
+                             debug_format=args.debug_format,
+                             debug_compression=args.debug_compression,
+                             ocr_workers=args.ocr_workers,
+                             ocr_quantize=args.ocr_precision == 'int8',
+                             ocr_threads=args.ocr_threads,
+                             ocr_interop_threads=args.ocr_interop_threads,
+                             refresh=args.refresh,
+                             refresh_interval=args.refresh_interval)
+        rows, cols = (int(n) for n in args.watch_grid.lower().split('x'))
+        helper.watch_options = {'interval': args.watch_interval, 'rows': rows, 'cols': cols}
+        if args.watch:
+            helper.start_watch(**helper.watch_options)
+        helper.run(profile_startup=args.profile_startup, trace_file=args.trace)
     except KeyboardInterrupt:
         print("\n\n Exiting...")
     except Exception as e:
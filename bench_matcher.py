@@ -0,0 +1,145 @@
+import argparse
+import json
+import random
+import time
+from difflib import SequenceMatcher
+
+from item_matcher import ItemMatcher
+
+WEAPONS = ['AK-47', 'AWP', 'M4A4', 'M4A1-S', 'Desert Eagle', 'Glock-18', 'USP-S', 'P250',
+           'P90', 'MP7', 'MP9', 'MAC-10', 'FAMAS', 'Galil AR', 'AUG', 'SG 553', 'Scout',
+           'Negev', 'PP-Bizon', 'Nova', 'XM1014', 'MAG-7', 'Sawed-Off', 'Tec-9',
+           'Karambit', 'Huntsman', 'Bayonet', 'Butterfly', 'Bowie', 'Falchion', 'Flip',
+           'Gut', 'Sports Gloves', 'Driver Gloves']
+SKIN_PARTS = ['Ace', 'Blood', 'Boom', 'Autumn', 'Aqua', 'Marine', 'Crimson', 'Web',
+              'Fade', 'Night', 'Storm', 'Frost', 'Neon', 'Rider', 'Hyper', 'Beast',
+              'Dragon', 'Lore', 'Tiger', 'Tooth', 'Slaughter', 'Gamma', 'Doppler',
+              'Case', 'Hardened', 'Ruby', 'Sapphire', 'Emerald', 'Urban', 'Masked']
+
+
+def synthetic_catalog(size, rng):
+    items = {}
+    while len(items) < size:
+        skin = ' '.join(rng.sample(SKIN_PARTS, rng.choice([1, 1, 2])))
+        name = f"{rng.choice(WEAPONS)} {skin}"
+        items[name] = {'name': name, 'base_value': rng.randint(10, 50000), 'demand': rng.randint(1, 10)}
+    return items
+
+
+def load_catalog(path, size, rng):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f).get('items', {})
+        if items:
+            return items, path
+    except FileNotFoundError:
+        pass
+    return synthetic_catalog(size, rng), f"synthetic ({size} items)"
+
+
+def ocr_noise(text, rng, rate):
+    chars = list(text)
+    for i in range(len(chars)):
+        roll = rng.random()
+        if roll < rate / 2:
+            chars[i] = rng.choice('abcdefghijklmnopqrstuvwxyz ')
+        elif roll < rate:
+            chars[i] = ''
+    return ''.join(chars)
+
+
+def build_corpus(items, count, rng):
+    names = list(items.keys())
+    single = []
+    chunks = []
+    for _ in range(count):
+        name = rng.choice(names)
+        single.append(ocr_noise(name, rng, rng.choice([0.0, 0.05, 0.15, 0.3])))
+        picked = rng.sample(names, rng.choice([1, 2, 3]))
+        chunk = ' '.join(ocr_noise(n, rng, rng.choice([0.0, 0.1])) for n in picked)
+        chunks.append(' '.join(chunk.lower().split()))
+    return single, chunks
+
+
+def linear_find_item(items, text):
+    """The pre-index TradeHelper.find_item scan."""
+    text = text.lower().strip()
+    if len(text) < 3:
+        return None, 0
+    best = None
+    best_score = 0
+    for name, data in items.items():
+        score = SequenceMatcher(None, text, name.lower()).ratio()
+        if score > best_score and score > 0.75:
+            best_score = score
+            best = data
+    return best, best_score
+
+
+def linear_find_in_text(items, remaining_text):
+    """One attempt of the pre-index parse_text_for_items inner loop."""
+    best_match = None
+    best_score = 0
+    best_name = None
+    sorted_items = sorted(items.items(), key=lambda x: len(x[0]), reverse=True)
+    for name, data in sorted_items:
+        name_lower = name.lower()
+        if name_lower in remaining_text:
+            score = 1.0
+        else:
+            score = SequenceMatcher(None, remaining_text, name_lower).ratio()
+        if score > best_score and score > 0.50:
+            best_score = score
+            best_match = data
+            best_name = name
+    return best_name, best_match, best_score
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the trigram matcher against the linear SequenceMatcher scan")
+    parser.add_argument('--cache', default='item_values_cache.json')
+    parser.add_argument('--size', type=int, default=3000, help="synthetic catalog size when no cache file exists")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items, source = load_catalog(args.cache, args.size, rng)
+    single, chunks = build_corpus(items, args.queries, rng)
+
+    start = time.perf_counter()
+    matcher = ItemMatcher(items)
+    build_time = time.perf_counter() - start
+
+    print("="*70)
+    print(f"Catalog: {source}, {len(items)} items")
+    print(f"Index build: {build_time*1000:.1f} ms")
+    print("="*70)
+
+    for label, queries, legacy, indexed in [
+        ('find_item (>0.75)', single,
+         lambda q: linear_find_item(items, q)[0],
+         lambda q: matcher.find(q, threshold=0.75)[0]),
+        ('find_in_text (>0.50)', chunks,
+         lambda q: linear_find_in_text(items, q)[0],
+         lambda q: matcher.find_in_text(q, threshold=0.50)[0]),
+    ]:
+        old_results, old_time = timed(legacy, queries)
+        new_results, new_time = timed(indexed, queries)
+        agree = sum(1 for a, b in zip(old_results, new_results) if a == b)
+
+        print(f"\n{label}")
+        print(f"   linear scan:   {old_time / len(queries) * 1000:8.2f} ms/query")
+        print(f"   trigram index: {new_time / len(queries) * 1000:8.2f} ms/query")
+        print(f"   speedup:       {old_time / max(new_time, 1e-9):8.1f}x")
+        print(f"   agreement:     {agree}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+import cv2
+
+from auto_trade_helper import TradeHelper
+from bench_matcher import synthetic_catalog
+from screen_capture import Frame
+
+STAGES = ('load', 'ocr', 'parse', 'valuation', 'draw_overlay', 'total')
+
+
+def load_corpus(corpus_dir):
+    """(name, screenshot path, expected) for every ``<screen>.png`` with a
+    ``<screen>.json`` holding {"your": [...], "their": [...]} item names."""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.png'))):
+        label_path = os.path.splitext(path)[0] + '.json'
+        if not os.path.exists(label_path):
+            print(f"  Skipping {os.path.basename(path)} (no label file)")
+            continue
+        with open(label_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        corpus.append((os.path.basename(path), path, expected))
+    return corpus
+
+
+def write_synthetic_cache(path, corpus, distractors, seed=1234):
+    """Catalog with every labeled item plus ``distractors`` made-up names,
+    so matching has the same kind of near misses as the real value list."""
+    rng = random.Random(seed)
+    items = synthetic_catalog(distractors, rng)
+    for _, _, expected in corpus:
+        for name in expected.get('your', []) + expected.get('their', []):
+            items.setdefault(name, {'name': name, 'base_value': rng.randint(10, 50000),
+                                    'demand': rng.randint(1, 10)})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'items': items, 'last_update': None}, f, indent=2)
+    print(f"   Wrote synthetic catalog: {path} ({len(items)} items)")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'p50_ms': pick(0.50),
+        'p90_ms': pick(0.90),
+        'p99_ms': pick(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def run_screen(helper, path):
+    """One headless pass of the analysis pipeline; returns (timings, found)."""
+    timings = {}
+    started = stage = time.perf_counter()
+
+    bgr = cv2.imread(path)
+    if bgr is None:
+        raise ValueError(f"unreadable screenshot: {path}")
+    frame = Frame(cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA))
+    helper.screen_width, helper.screen_height = frame.width, frame.height
+    your_region, their_region = helper.offer_regions()
+    your_img = frame.region_rgb(*your_region)
+    their_img = frame.region_rgb(*their_region)
+    backdrop = helper.panel_backdrop(frame)
+    now = time.perf_counter()
+    timings['load'], stage = now - stage, now
+
+    your_text, their_text = helper.extract_texts([your_img, their_img])
+    now = time.perf_counter()
+    timings['ocr'], stage = now - stage, now
+
+    your_items = helper.parse_text_for_items(your_text)
+    their_items = helper.parse_text_for_items(their_text)
+    now = time.perf_counter()
+    timings['parse'], stage = now - stage, now
+
+    totals = helper.trade_totals(your_items, their_items)
+    now = time.perf_counter()
+    timings['valuation'], stage = now - stage, now
+
+    helper.draw_overlay(None, your_items, their_items, backdrop=backdrop, totals=totals)
+    now = time.perf_counter()
+    timings['draw_overlay'] = now - stage
+    timings['total'] = now - started
+
+    found = {'your': [i['name'] for i in your_items], 'their': [i['name'] for i in their_items]}
+    return timings, found
+
+
+def score(found, expected):
+    true_pos = false_pos = false_neg = 0
+    for side in ('your', 'their'):
+        got = Counter(found.get(side, []))
+        want = Counter(expected.get(side, []))
+        hits = sum((got & want).values())
+        true_pos += hits
+        false_pos += sum(got.values()) - hits
+        false_neg += sum(want.values()) - hits
+    return true_pos, false_pos, false_neg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the trade-screen pipeline headlessly over recorded screenshots")
+    parser.add_argument('corpus', help="directory of <screen>.png + <screen>.json files")
+    parser.add_argument('--cache', help="item catalog to match against (default: <corpus>/item_values_cache.json "
+                                        "if present, else a synthetic one in a temporary directory)")
+    parser.add_argument('--distractors', type=int, default=2000,
+                        help="extra made-up items when the synthetic catalog has to be written")
+    parser.add_argument('--repeat', type=int, default=1, help="passes over the corpus")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--ocr-workers', type=int, default=0)
+    parser.add_argument('--ocr-precision', choices=('int8', 'fp32'), default='int8')
+    parser.add_argument('--ocr-threads', type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print("No labeled screenshots found")
+        return
+    if args.cache and not os.path.exists(args.cache):
+        print(f"Catalog not found: {args.cache}")
+        return
+    cache_file = args.cache or os.path.join(args.corpus, 'item_values_cache.json')
+    # the corpus is input: a synthetic catalog goes to a temporary directory, not next to it
+    with tempfile.TemporaryDirectory() as tmp:
+        if not os.path.exists(cache_file):
+            cache_file = os.path.join(tmp, 'item_values_cache.json')
+            write_synthetic_cache(cache_file, corpus, args.distractors)
+
+        # the OCR cache would turn every repeat into a hit, keep it off
+        helper = TradeHelper(screen_size=(1920, 1080), cache_file=cache_file, ocr_cache_size=0,
+                             debug_level='off', ocr_workers=args.ocr_workers,
+                             ocr_quantize=args.ocr_precision == 'int8', ocr_threads=args.ocr_threads)
+        # the catalog is read into memory here, so the directory can go right after
+
+    samples = {stage: [] for stage in STAGES}
+    true_pos = false_pos = false_neg = 0
+    screens = []
+    try:
+        helper.ocr_ready.wait()
+        for run in range(args.repeat):
+            for name, path, expected in corpus:
+                timings, found = run_screen(helper, path)
+                for stage, seconds in timings.items():
+                    samples[stage].append(seconds)
+                if run == 0:
+                    tp, fp, fn = score(found, expected)
+                    true_pos += tp
+                    false_pos += fp
+                    false_neg += fn
+                    screens.append({'screen': name, 'found': found, 'expected': expected,
+                                    'true_pos': tp, 'false_pos': fp, 'false_neg': fn})
+    finally:
+        helper.close()
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'corpus': os.path.abspath(args.corpus),
+        'screens': len(corpus),
+        'repeat': args.repeat,
+        'catalog_items': len(helper.items),
+        'config': {'ocr_workers': args.ocr_workers, 'ocr_precision': args.ocr_precision,
+                   'ocr_threads': args.ocr_threads},
+        'stages': {stage: percentiles(values) for stage, values in samples.items()},
+        'accuracy': {
+            'precision': true_pos / max(true_pos + false_pos, 1),
+            'recall': true_pos / max(true_pos + false_neg, 1),
+            'true_pos': true_pos,
+            'false_pos': false_pos,
+            'false_neg': false_neg,
+        },
+        'per_screen': screens,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "="*70)
+    print(f"PIPELINE BENCHMARK ({len(corpus)} screens x {args.repeat})")
+    print("="*70)
+    print(f"   {'stage':<15} {'mean ms':>10} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}")
+    for stage in STAGES:
+        p = report['stages'][stage]
+        print(f"   {stage:<15} {p['mean_ms']:>10.1f} {p['p50_ms']:>10.1f} {p['p90_ms']:>10.1f} {p['p99_ms']:>10.1f}")
+    print("─"*70)
+    print(f"   precision {report['accuracy']['precision']:.1%}   recall {report['accuracy']['recall']:.1%}")
+    print(f"\n Results saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import gc
+import importlib.util
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from value_list_parser import IrregularMarkup, parse_value_list, refresh_value_list
+
+WEAPONS = ['AK-47', 'AWP', 'M4A4', 'M4A1-S', 'Desert Eagle', 'Glock-18', 'USP-S', 'P250',
+           'MP7', 'MAC-10', 'FAMAS', 'Galil AR', 'AUG', 'Scout', 'Negev', 'Nova']
+KNIVES = ['Karambit', 'Huntsman', 'Bayonet', 'Butterfly', 'Bowie', 'Falchion', 'Flip', 'Gut']
+SKINS = ['Ace', 'Blood Boom', 'Autumness', 'Aqua Marine', 'Crimson Web', 'Fade', 'Night Storm',
+         'Frost', 'Neon Rider', 'Hyper Beast', 'Dragon Lore', 'Tiger Tooth', 'Slaughter',
+         'Gamma Doppler', 'Case Hardened', 'Ruby', 'Sapphire', 'Emerald', 'Urban Masked']
+STATUSES = ['Good 🔴 Red', 'Bad Pink', 'Mid Purple', 'High Gold', 'Low Blue', 'Decent Covert',
+            'Too small to have a status', 'Classified']
+
+# markup the streaming parser doesn't rebuild the way an HTML tree builder
+# does; it has to reject these so doc-scrape falls back to the soup parser
+_ROW = ('<tr><td>Easy to find</td></tr><tr><td>Skin</td><td>Base Value</td><td>DG Value</td>'
+        '<td>CK Value</td><td>UPG Value</td><td>Status</td></tr>')
+IRREGULAR = {
+    'nested table': '<p>AK-47</p><table>' + _ROW + '<tr><td>Ace</td><td><table><tr><td>1</td></tr></table>10'
+                    '</td><td>20</td><td>30</td><td>40</td><td>Good</td></tr></table>',
+    'unclosed <p>': '<p>AK-47<table>' + _ROW + '<tr><td>Ace</td><td>10</td><td>20</td><td>30</td>'
+                    '<td>40</td><td>Good</td></tr></table>',
+    'omitted </td>': '<p>AK-47</p><table>' + _ROW + '<tr><td>Ace<td>10<td>20<td>30<td>40<td>Good</tr></table>',
+    'omitted </tr>': '<p>AK-47</p><table>' + _ROW + '<tr><td>Ace</td><td>10</td><td>20</td><td>30</td>'
+                     '<td>40</td><td>Good</td><tr><td>Bad</td></table>',
+}
+
+
+def load_doc_scrape():
+    # doc-scrape.py has a hyphen in its name, so it can't be imported normally
+    spec = importlib.util.spec_from_file_location('doc_scrape', os.path.join(os.path.dirname(__file__) or '.', 'doc-scrape.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def cell(text):
+    return f'<td class="c4" colspan="1" rowspan="1"><p class="c2"><span class="c1">{text}</span></p></td>'
+
+
+def synthetic_export(tables, rows, rng):
+    """HTML shaped like a Google Docs export of the value list: styled
+    paragraphs, headings and tables whose cells wrap text in <p><span>."""
+    out = ['<html><head><meta content="text/html; charset=UTF-8" http-equiv="content-type">'
+           '<style type="text/css">.c1{color:#000}.c2{padding:0}</style></head><body class="c5">']
+    for t in range(tables):
+        knife = t % 4 == 3
+        weapon = rng.choice(KNIVES) if knife else rng.choice(WEAPONS)
+        out.append('<p class="c2"><span class="c1">&nbsp;</span></p>')
+        if knife:
+            out.append(f'<h2 class="c7"><span class="c1">{weapon.upper()} KNIVES 🔪</span></h2>')
+        else:
+            out.append(f'<p class="c2"><span class="c1">{weapon}&#39;s ✨</span></p>')
+        out.append('<p class="c2"><span class="c1">Rarities below</span></p>')
+        out.append('<table class="c9"><tbody>')
+        out.append(f'<tr class="c3">{cell("Easy to find")}{cell("Hard to find")}</tr>')
+        out.append('<tr class="c3">' + ''.join(cell(h) for h in
+                   ('Skin', 'Base Value', 'DG Value', 'CK Value', 'UPG Value', 'Status')) + '</tr>')
+        for _ in range(rows):
+            skin = rng.choice(SKINS) + (f" {rng.randint(2, 99)}" if rng.random() < 0.5 else '')
+            values = [f"{rng.randint(1, 90000):,}" if rng.random() < 0.9 else 'N/A' for _ in range(4)]
+            out.append('<tr class="c3">' + cell(f"{skin} ⭐" if rng.random() < 0.1 else skin)
+                       + ''.join(cell(v) for v in values) + cell(rng.choice(STATUSES)) + '</tr>')
+        out.append('</tbody></table>')
+    out.append('</body></html>')
+    return ''.join(out).encode('utf-8')
+
+
+def edit_one_value(html, items, tables, attempts=200):
+    """The export with one value cell replaced, nearest the end first.
+
+    A cell whose item name also appears in a later table is overwritten
+    there and changes nothing, so candidates are tried until the edit
+    shows up in the delta."""
+    text = html.decode('utf-8')
+    cells = list(re.compile(r'>\s*(\d[\d,]*)\s*<').finditer(text))
+    for match in reversed(cells[-attempts:]):
+        edited = (text[:match.start(1)] + '1234567' + text[match.end(1):]).encode('utf-8')
+        if refresh_value_list(edited, items, tables)[1]:
+            return edited
+    return html
+
+
+def measure(parse, html, repeat):
+    """(best wall seconds, tracemalloc peak bytes, items)"""
+    best = float('inf')
+    items = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = parse(html)
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, items
+
+
+def first_difference(soup, stream):
+    for name in dict.fromkeys(list(soup) + list(stream)):
+        if soup.get(name) != stream.get(name):
+            return f"{name}: soup={soup.get(name)} stream={stream.get(name)}"
+    return "same items in a different order"
+
+
+def check(soup_parse, html):
+    """Both parsers give the same items for ``html``, and the streaming
+    parser rejects every IRREGULAR sample."""
+    ok = True
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        soup = soup_parse(html)
+    try:
+        stream = parse_value_list(html)
+    except IrregularMarkup as e:
+        print(f"   export: stream parser rejected it ({e})")
+        return False
+    if list(soup.items()) == list(stream.items()):
+        print(f"   export: identical ({len(stream)} items)")
+    else:
+        print(f"   export: MISMATCH, {first_difference(soup, stream)}")
+        ok = False
+
+    for name, sample in IRREGULAR.items():
+        try:
+            parse_value_list(sample)
+        except IrregularMarkup:
+            print(f"   {name}: rejected")
+        else:
+            print(f"   {name}: NOT rejected")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the streaming value-list parser with the BeautifulSoup one")
+    parser.add_argument('--fixture', help="saved HTML export to parse (default: a generated one)")
+    parser.add_argument('--save-fixture', help="write the generated export here")
+    parser.add_argument('--tables', type=int, default=200)
+    parser.add_argument('--rows', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true',
+                        help="only check that both parsers agree; exit 1 if they don't")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, 'rb') as f:
+            html = f.read()
+        source = args.fixture
+    else:
+        html = synthetic_export(args.tables, args.rows, random.Random(42))
+        source = f"synthetic ({args.tables} tables x {args.rows} rows)"
+        if args.save_fixture:
+            with open(args.save_fixture, 'wb') as f:
+                f.write(html)
+
+    doc_scrape = load_doc_scrape()
+    with tempfile.TemporaryDirectory() as tmp:
+        fetcher = doc_scrape.ValueListFetcher(cache_file=os.path.join(tmp, 'cache.json'))
+
+    if args.check:
+        print(f"Checking {source}")
+        sys.exit(0 if check(fetcher._parse_document, html) else 1)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # the soup parser prints per-table progress
+        results = {
+            'soup': measure(fetcher._parse_document, html, args.repeat),
+            'stream': measure(parse_value_list, html, args.repeat),
+        }
+        # a refresh after one edit only re-parses the edited table
+        items, _, tables = refresh_value_list(html, {})
+        edited = edit_one_value(html, items, tables)
+        edit_seconds, edit_peak, (_, delta, _) = measure(lambda doc: refresh_value_list(doc, items, tables),
+                                                         edited, args.repeat)
+
+    print("\n" + "="*70)
+    print(f"VALUE LIST PARSER BENCHMARK: {source}, {len(html)/1e6:.1f} MB")
+    print("="*70)
+    print(f"   {'parser':<10} {'best ms':>10} {'peak MB':>10} {'items':>8}")
+    for name, (seconds, peak, items) in results.items():
+        print(f"   {name:<10} {seconds*1000:>10.1f} {peak/1e6:>10.1f} {len(items):>8}")
+    print(f"   {'1 edit':<10} {edit_seconds*1000:>10.1f} {edit_peak/1e6:>10.1f} {len(delta):>8}  (incremental refresh, items = delta size)")
+    soup, stream = results['soup'], results['stream']
+    print("─"*70)
+    print(f"   speedup: {soup[0] / max(stream[0], 1e-9):.1f}x, peak memory: {soup[1] / max(stream[1], 1):.1f}x lower")
+
+    if list(soup[2].items()) == list(stream[2].items()):
+        print("   output: identical")
+    else:
+        print("   output: MISMATCH")
+        print(f"     {first_difference(soup[2], stream[2])}")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
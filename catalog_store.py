@@ -0,0 +1,345 @@
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'CBCATLG\x00'
+# 2: the name hash table is gone, readers index names in memory
+VERSION = 2
+
+# magic, version, rows, strings, last_update (unix time, NaN = unknown)
+HEADER = struct.Struct('<8sIIId')
+
+NUMERIC_FIELDS = ('value', 'base_value', 'dg_value', 'ck_value', 'upg_value', 'rap')
+STRING_FIELDS = ('name', 'status', 'category')
+INT_FIELDS = ('demand',)
+
+NO_STRING = -1
+NO_INT = -2**31
+
+
+def pointer_path(json_path: str) -> str:
+    """item_values_cache.json -> item_values_cache.catalog, which names the
+    current snapshot file"""
+    return os.path.splitext(json_path)[0] + '.catalog'
+
+
+def _snapshot_files(json_path: str) -> List[str]:
+    """item_values_cache.000001.bin, item_values_cache.000002.bin, ..."""
+    base = glob.escape(os.path.splitext(json_path)[0])
+    return sorted(glob.glob(base + '.[0-9][0-9][0-9][0-9][0-9][0-9].bin'))
+
+
+def _layout(rows: int, strings: int) -> Dict[str, Tuple[int, int]]:
+    """(offset, length in bytes) of every section after the header."""
+    sections = {}
+    offset = HEADER.size
+    for field in NUMERIC_FIELDS:
+        sections[field] = (offset, rows * 8)
+        offset += rows * 8
+    for field in STRING_FIELDS + INT_FIELDS:
+        sections[field] = (offset, rows * 4)
+        offset += rows * 4
+    sections['string_offsets'] = (offset, (strings + 1) * 4)
+    offset += (strings + 1) * 4
+    sections['string_data'] = (offset, None)
+    return sections
+
+
+def write_catalog(path: str, items: Dict[str, Dict], last_update: Optional[datetime] = None) -> None:
+    """Write ``items`` as a binary snapshot, atomically (temp file + os.replace)."""
+    names = list(items.keys())
+    rows = len(names)
+
+    strings = []
+    interned = {}
+
+    def intern(text) -> int:
+        if text is None:
+            return NO_STRING
+        text = str(text)
+        idx = interned.get(text)
+        if idx is None:
+            idx = interned[text] = len(strings)
+            strings.append(text.encode('utf-8'))
+        return idx
+
+    numeric = {field: [] for field in NUMERIC_FIELDS}
+    string_ids = {field: [] for field in STRING_FIELDS}
+    demand = []
+    for name in names:
+        data = items[name]
+        for field in NUMERIC_FIELDS:
+            value = data.get(field)
+            numeric[field].append(math.nan if value is None else float(value))
+        string_ids['name'].append(intern(name))
+        for field in STRING_FIELDS[1:]:
+            string_ids[field].append(intern(data.get(field)))
+        value = data.get('demand')
+        demand.append(NO_INT if value is None else int(value))
+
+    offsets = [0]
+    for encoded in strings:
+        offsets.append(offsets[-1] + len(encoded))
+
+    stamp = last_update.timestamp() if last_update else math.nan
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, rows, len(strings), stamp))
+            for field in NUMERIC_FIELDS:
+                f.write(struct.pack(f'<{rows}d', *numeric[field]))
+            for field in STRING_FIELDS:
+                f.write(struct.pack(f'<{rows}i', *string_ids[field]))
+            f.write(struct.pack(f'<{rows}i', *demand))
+            f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+            f.write(b''.join(strings))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_catalog(json_path: str, items: Dict[str, Dict], last_update: Optional[datetime] = None) -> str:
+    """Write ``items`` as a new snapshot generation next to ``json_path`` and
+    point item_values_cache.catalog at it; returns the snapshot path.
+
+    Snapshots are never overwritten: Windows can't replace a file another
+    process has mapped, so readers keep their generation until they reopen,
+    and only the small pointer file is swapped.
+    """
+    existing = _snapshot_files(json_path)
+    generation = int(existing[-1].rsplit('.', 2)[-2]) + 1 if existing else 1
+    path = f"{os.path.splitext(json_path)[0]}.{generation:06d}.bin"
+    write_catalog(path, items, last_update)
+
+    pointer = pointer_path(json_path)
+    tmp_path = f"{pointer}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(path))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, pointer)
+
+    # a generation still mapped somewhere can't be removed on Windows; the next save retries
+    for old in existing:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return path
+
+
+def open_catalog(json_path: str) -> 'Catalog':
+    """Map the snapshot item_values_cache.catalog currently points at."""
+    with open(pointer_path(json_path), 'r', encoding='utf-8') as f:
+        name = f.read().strip()
+    return Catalog(os.path.join(os.path.dirname(json_path), name))
+
+
+class RowItems(Sequence):
+    """Item dicts of a Catalog by row, built only when read."""
+
+    def __init__(self, catalog: 'Catalog'):
+        self.catalog = catalog
+
+    def __len__(self) -> int:
+        return len(self.catalog)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.catalog.item(r) for r in range(len(self))[row]]
+        return self.catalog.item(row)
+
+
+class Catalog(Mapping):
+    """Read-only, memory-mapped view of a binary catalog snapshot.
+
+    Behaves like the ``items`` dict of the JSON cache: name -> item dict.
+    Item dicts are built from the columns on first access and kept; the
+    pages themselves are shared by every process that maps the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from('<8sI', self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} catalog")
+        _, _, rows, strings, stamp = HEADER.unpack_from(self._mm, 0)
+        self.rows = rows
+        self.string_count = strings
+        self.last_update = None if math.isnan(stamp) else datetime.fromtimestamp(stamp)
+
+        self._view = memoryview(self._mm)
+        sections = _layout(rows, strings)
+        self.columns = {}
+        for field in NUMERIC_FIELDS:
+            offset, length = sections[field]
+            self.columns[field] = self._view[offset:offset + length].cast('d')
+        for field in STRING_FIELDS + INT_FIELDS:
+            offset, length = sections[field]
+            self.columns[field] = self._view[offset:offset + length].cast('i')
+        offset, length = sections['string_offsets']
+        self._string_offsets = self._view[offset:offset + length].cast('I')
+        self._string_base = sections['string_data'][0]
+
+        # decoded once on first use; the matcher needs every name anyway
+        self._names: Optional[List[str]] = None
+        self._index: Optional[Dict[str, int]] = None
+        self._items: List[Optional[Dict]] = [None] * rows
+
+    def string(self, idx: int) -> Optional[str]:
+        if idx == NO_STRING:
+            return None
+        start = self._string_base + self._string_offsets[idx]
+        end = self._string_base + self._string_offsets[idx + 1]
+        return str(self._mm[start:end], 'utf-8')
+
+    def names(self) -> List[str]:
+        """Every item name in row order, decoded in one pass."""
+        if self._names is None:
+            data = self._mm[self._string_base:]
+            offsets = self._string_offsets
+            self._names = [str(data[offsets[idx]:offsets[idx + 1]], 'utf-8') for idx in self.columns['name']]
+        return self._names
+
+    def name(self, row: int) -> str:
+        return self.names()[row]
+
+    def row(self, name: str) -> int:
+        """Row of ``name`` or -1."""
+        if self._index is None:
+            self._index = {name: row for row, name in enumerate(self.names())}
+        return self._index.get(name, -1)
+
+    def item(self, row: int) -> Dict:
+        data = self._items[row]
+        if data is None:
+            data = self._items[row] = self._build_item(row)
+        return data
+
+    def item_list(self) -> RowItems:
+        return RowItems(self)
+
+    def _build_item(self, row: int) -> Dict:
+        data = {'name': self.name(row)}
+        for field in NUMERIC_FIELDS:
+            value = self.columns[field][row]
+            if not math.isnan(value):
+                data[field] = value
+        demand = self.columns['demand'][row]
+        if demand != NO_INT:
+            data['demand'] = demand
+        for field in STRING_FIELDS[1:]:
+            value = self.string(self.columns[field][row])
+            if value is not None:
+                data[field] = value
+        return data
+
+    def __getitem__(self, name: str) -> Dict:
+        row = self.row(name)
+        if row < 0:
+            raise KeyError(name)
+        return self.item(row)
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self.row(name) >= 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Plain dict copy, safe to edit"""
+        return {data['name']: dict(data) for data in (self.item(row) for row in range(self.rows))}
+
+    def close(self) -> None:
+        self._names = self._index = None
+        self._items = []
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self._string_offsets.release()
+        self._view.release()
+        self._mm.close()
+
+
+def export_json(path: str, items: Dict[str, Dict], last_update: Optional[datetime] = None) -> None:
+    """The original item_values_cache.json layout, also written atomically."""
+    data = {
+        'items': dict(items) if not isinstance(items, Catalog) else items.to_dict(),
+        'last_update': last_update.isoformat() if last_update else None
+    }
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_catalog(json_path: str):
+    """(items, last_update) from the binary snapshot next to ``json_path``,
+    or from the JSON itself when there is no snapshot or the JSON is newer.
+
+    Raises FileNotFoundError when neither exists.
+    """
+    pointer = pointer_path(json_path)
+    try:
+        bin_mtime = os.path.getmtime(pointer)
+    except OSError:
+        bin_mtime = None
+    try:
+        json_mtime = os.path.getmtime(json_path)
+    except OSError:
+        json_mtime = None
+
+    if bin_mtime is not None and (json_mtime is None or bin_mtime >= json_mtime):
+        try:
+            catalog = open_catalog(json_path)
+            return catalog, catalog.last_update
+        except (OSError, ValueError, struct.error) as e:
+            print(f"   Could not map the catalog named in {pointer} ({e}), reading {json_path}")
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    last_update = data.get('last_update')
+    return data.get('items', {}), datetime.fromisoformat(last_update) if last_update else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert between item_values_cache.json and the binary catalog")
+    parser.add_argument('source', help="a .json cache to snapshot, or a .bin snapshot to export as .json")
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    if args.source.endswith('.bin'):
+        catalog = Catalog(args.source)
+        output = args.output or os.path.splitext(args.source)[0] + '.json'
+        export_json(output, catalog, catalog.last_update)
+        print(f"Exported {len(catalog)} items to {output}")
+        catalog.close()
+    else:
+        with open(args.source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        last_update = data.get('last_update')
+        last_update = datetime.fromisoformat(last_update) if last_update else None
+        if args.output:
+            write_catalog(args.output, data.get('items', {}), last_update)
+            output = args.output
+        else:
+            output = save_catalog(args.source, data.get('items', {}), last_update)
+        print(f"Wrote {len(data.get('items', {}))} items to {output}")
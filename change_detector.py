@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+
+
+class TileWatcher:
+    """Cheap change detection for one screen region.
+
+    The region is split into a rows x cols grid and every tile gets a
+    difference hash (dHash) computed from a tiny downscaled copy. A tile
+    only counts as changed when its hash moves by more than ``tolerance``
+    bits, so cursor blinks and compression noise don't trigger OCR.
+
+    The tiles only decide *whether* the region changed: OCR always reads
+    the whole region, like F8 does, because item names and values cross
+    tile edges. The last text of the region is kept for unchanged ticks.
+    """
+
+    def __init__(self, rows: int = 2, cols: int = 4, hash_size: int = 8, tolerance: int = 6):
+        self.rows = rows
+        self.cols = cols
+        self.hash_size = hash_size
+        self.tolerance = tolerance
+        self.hashes = None
+        self.text = ''
+
+    def tiles(self, width: int, height: int):
+        """(x, y, w, h) of every tile relative to the region, row-major."""
+        xs = np.linspace(0, width, self.cols + 1).astype(int)
+        ys = np.linspace(0, height, self.rows + 1).astype(int)
+        return [(xs[c], ys[r], xs[c + 1] - xs[c], ys[r + 1] - ys[r])
+                for r in range(self.rows) for c in range(self.cols)]
+
+    def fingerprint(self, region_bgra: np.ndarray) -> np.ndarray:
+        size = self.hash_size
+        small = cv2.resize(region_bgra, (self.cols * (size + 1), self.rows * size),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGRA2GRAY).astype(np.int16)
+        grid = gray.reshape(self.rows, size, self.cols, size + 1).transpose(0, 2, 1, 3)
+        return grid[..., 1:] > grid[..., :-1]
+
+    def update(self, region_bgra: np.ndarray):
+        """Fingerprint the region and return the indexes of changed tiles.
+
+        Every tile counts as changed on the first call.
+        """
+        hashes = self.fingerprint(region_bgra)
+        if self.hashes is None:
+            changed = list(range(self.rows * self.cols))
+        else:
+            distance = (hashes != self.hashes).sum(axis=(2, 3)).ravel()
+            changed = np.flatnonzero(distance > self.tolerance).tolist()
+        if changed:
+            self.hashes = hashes
+        return changed
+
+    def reset(self) -> None:
+        self.hashes = None
+        self.text = ''
+
+
+class WatchSession:
+    """State of one watch-mode run: a TileWatcher per offer region and the
+    item names last shown. Every start gets a new session, so a run that is
+    still finishing its last tick never touches the next run's state."""
+
+    def __init__(self, regions: int = 2, rows: int = 2, cols: int = 4):
+        self.watchers = [TileWatcher(rows, cols) for _ in range(regions)]
+        self.last_names = None
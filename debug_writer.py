@@ -0,0 +1,115 @@
+import os
+import queue
+import time
+from threading import Lock, Thread
+
+import cv2
+import numpy as np
+
+from tracing import span
+
+DEBUG_LEVELS = ('off', 'async', 'sync')
+
+
+class DebugWriter:
+    """Writes debug images (debug_screen.png, trade_result.png, ...).
+
+    level 'sync' writes inline like before, 'async' hands frames to a
+    bounded queue drained by a writer thread, 'off' discards them. A full
+    queue drops the frame instead of blocking the analysis. ``fmt`` is
+    'png' (with ``png_compression`` 0-9) or 'npy' for raw arrays.
+    """
+
+    def __init__(self, level: str = 'async', queue_size: int = 4, png_compression: int = 1, fmt: str = 'png'):
+        if level not in DEBUG_LEVELS:
+            raise ValueError(f"debug level must be one of {DEBUG_LEVELS}, got {level!r}")
+        self.level = level
+        self.png_compression = png_compression
+        self.fmt = fmt
+
+        self.written = 0
+        self.dropped = 0
+        self.write_seconds = 0.0
+        self._stats_lock = Lock()
+
+        self._queue = None
+        self._thread = None
+        if level == 'async':
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = Thread(target=self._run, name="debug-writer", daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self.level != 'off'
+
+    def submit(self, filename: str, image: np.ndarray = None, render=None) -> bool:
+        """Queue (or write) one image. ``render`` is a callable producing the
+        image, so drawing work can happen on the writer thread too.
+        Returns False when the frame was dropped, couldn't be written (sync
+        mode; async failures are only logged) or debug output is off."""
+        if self.level == 'off':
+            return False
+        if self.level == 'sync':
+            return self._write(filename, image, render)
+        try:
+            self._queue.put_nowait((filename, image, render))
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._write(*job)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, filename, image, render) -> bool:
+        # runs on the writer thread in 'async' mode, so the trace shows the
+        # real render/encode cost there instead of just the submit
+        start = time.perf_counter()
+        with span('debug.write', file=os.path.basename(filename), fmt=self.fmt) as sp:
+            try:
+                if render is not None:
+                    with span('debug.render'):
+                        image = render()
+                if self.fmt == 'npy':
+                    np.save(os.path.splitext(filename)[0] + '.npy', image)
+                elif not cv2.imwrite(filename, image, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]):
+                    # a bad path or extension makes imwrite return False, not raise
+                    raise OSError("cv2.imwrite failed")
+            except Exception as e:
+                sp.set(error=type(e).__name__)
+                print(f"   Debug write error ({filename}): {e}")
+                return False
+        with self._stats_lock:
+            self.written += 1
+            self.write_seconds += time.perf_counter() - start
+        return True
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'level': self.level,
+                'written': self.written,
+                'dropped': self.dropped,
+                'avg_write_ms': self.write_seconds / self.written * 1000 if self.written else 0.0,
+                'queued': self._queue.qsize() if self._queue else 0,
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued frames and stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
@@ -1,312 +1,410 @@
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
 import json
+import os
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 import re
+from catalog_store import export_json, load_catalog, save_catalog
+from price_history import PriceHistory, history_path
+from value_list_parser import (IrregularMarkup, ValueDelta, diff_items, refresh_value_list, remove_emojis,
+                               status_to_demand)
 
 GOOGLE_DOCS_ID = "1teYBaOkmtAHz_4yEp1nJdOuzxhL09OSkYdAJt_gxTeo"
 VALUE_CACHE_FILE = "item_values_cache.json"
 VALUE_REFRESH_INTERVAL = 300
 
-def remove_emojis(text: str) -> str:
-    return ''.join(char for char in text if ord(char) < 128)
+def fetch_state_path(cache_file: str) -> str:
+    """item_values_cache.json -> item_values_cache.fetch.json"""
+    return os.path.splitext(cache_file)[0] + '.fetch.json'
 
 class ValueListFetcher:
-    def __init__(self, cache_file: str = VALUE_CACHE_FILE):
+    def __init__(self, cache_file: str = VALUE_CACHE_FILE, export_url: Optional[str] = None,
+                 parser: str = 'stream'):
         self.cache_file = cache_file
+        # stand-in for the Google Docs export, e.g. a local test server
+        self.export_url = export_url
+        # 'stream' = value_list_parser, 'soup' = the BeautifulSoup tree in _parse_document
+        self.parser = parser
         self.values_cache: Dict[str, Dict] = {}
         self.last_update: Optional[datetime] = None
         self.refresh_interval = VALUE_REFRESH_INTERVAL
+
+        # one pooled connection reused across refreshes
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        # etag / last_modified / content_hash of the document behind the cache
+        self.fetch_state: Dict[str, Optional[str]] = {}
+        self._pending_state: Dict[str, Optional[str]] = {}
+        self.last_fetch: Dict = {}
+
+        # per-table fingerprints of the document behind values_cache, so a
+        # refresh only re-parses edited tables; in memory only
+        self.table_cache = None
+        self._pending_tables = None
+        # what the last refresh changed, for consumers that update in place
+        self.last_delta = ValueDelta()
+        # every changed value, appended after each save; opened on first use
+        self.history: Optional[PriceHistory] = None
         self._load_cache()
 
     def _load_cache(self) -> None:
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.values_cache = data.get('items', {})
-                last_update_str = data.get('last_update')
-                if last_update_str:
-                    self.last_update = datetime.fromisoformat(last_update_str)
-                print(f"Loaded {len(self.values_cache)} items from cache")
+            items, self.last_update = load_catalog(self.cache_file)
+            # the fetcher edits its cache, so it keeps a plain dict
+            self.values_cache = items.to_dict() if hasattr(items, 'to_dict') else items
+            print(f"Loaded {len(self.values_cache)} items from cache")
         except FileNotFoundError:
             print("No cache file found, will fetch fresh data")
         except Exception as e:
             print(f"Error loading cache: {e}")
+        try:
+            with open(fetch_state_path(self.cache_file), 'r', encoding='utf-8') as f:
+                self.fetch_state = json.load(f)
+        except (OSError, ValueError):
+            self.fetch_state = {}
+
+    def _commit_fetch_state(self) -> None:
+        self.fetch_state = self._pending_state
+        self._pending_state = {}
+        try:
+            with open(fetch_state_path(self.cache_file), 'w', encoding='utf-8') as f:
+                json.dump(self.fetch_state, f)
+        except Exception as e:
+            print(f"Error saving fetch state: {e}")
 
-    def _save_cache(self) -> None:
+    def _save_cache(self) -> bool:
+        """Write the JSON cache, then the binary snapshot. False when the JSON
+        couldn't be written; the fetch validators are then left as they were,
+        so the next refresh downloads and saves the document again."""
+        # JSON first: loaders only prefer the binary snapshot when it's at least as new
         try:
-            data = {
-                'items': self.values_cache,
-                'last_update': self.last_update.isoformat() if self.last_update else None
-            }
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            export_json(self.cache_file, self.values_cache, self.last_update)
             print(f"Saved {len(self.values_cache)} items to cache")
         except Exception as e:
             print(f"Error saving cache: {e}")
+            self._pending_state = {}
+            return False
+        try:
+            save_catalog(self.cache_file, self.values_cache, self.last_update)
+        except Exception as e:
+            # the JSON is newer now, so loaders fall back to it
+            print(f"Error saving binary catalog: {e}")
+        if self._pending_state:
+            self._commit_fetch_state()
+        return True
 
-
-
-    def _fetch_from_google_docs(self, document_id: str) -> Dict[str, Dict]:
+    def _record_history(self) -> None:
+        try:
+            if self.history is None:
+                self.history = PriceHistory(history_path(self.cache_file))
+            appended = self.history.record(self.values_cache, self.last_update)
+            print(f"Recorded {appended} changed value(s) in history")
+        except Exception as e:
+            print(f"Error recording value history: {e}")
+
+
+    def _download(self, url: str) -> Optional[bytes]:
+        """Raw export body, or None when the document is known to be unchanged:
+        the server answered 304 to our validators, or the body hashes the same
+        as the one behind the current cache."""
+        headers = {}
+        if self.values_cache:
+            if self.fetch_state.get('etag'):
+                headers['If-None-Match'] = self.fetch_state['etag']
+            if self.fetch_state.get('last_modified'):
+                headers['If-Modified-Since'] = self.fetch_state['last_modified']
+
+        fetch_start = time.perf_counter()
+        response = self.session.get(url, timeout=15, headers=headers)
+        self.last_fetch['fetch_ms'] = (time.perf_counter() - fetch_start) * 1000
+        self.last_fetch['status'] = response.status_code
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        body = response.content
+        self.last_fetch['bytes'] = len(body)
+        # committed to fetch_state only once the new cache has been saved
+        self._pending_state = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': hashlib.blake2b(body, digest_size=16).hexdigest(),
+        }
+        if self.values_cache and self._pending_state['content_hash'] == self.fetch_state.get('content_hash'):
+            self._commit_fetch_state()
+            return None
+        return body
+
+    def _fetch_from_google_docs(self, document_id: str) -> Optional[Dict[str, Dict]]:
+        """Items parsed from the value list, {} on failure, or None when the
+        document hasn't changed since the current cache was built. The delta
+        against the current cache is left in last_delta."""
+        self.last_fetch = {'status': None, 'bytes': 0, 'fetch_ms': 0.0, 'parse_ms': 0.0, 'unchanged': False}
         try:
-            export_url = f"https://docs.google.com/document/d/{document_id}/export?format=html"
+            export_url = self.export_url or f"https://docs.google.com/document/d/{document_id}/export?format=html"
 
             print(f"Fetching data from Google Docs...")
             print(f"URL: {export_url}")
-            response = requests.get(export_url, timeout=15)
-            response.raise_for_status()
+            body = self._download(export_url)
+            if body is None:
+                self.last_fetch['unchanged'] = True
+                return None
+
+            parse_start = time.perf_counter()
+            if self.parser == 'soup':
+                items = self._parse_document(body)
+                self.last_delta = diff_items(self.values_cache, items)
+            else:
+                # the table cache only describes values_cache once that's non-empty
+                previous = self.table_cache if self.values_cache else None
+                try:
+                    items, self.last_delta, self._pending_tables = refresh_value_list(body, self.values_cache,
+                                                                                      previous, verbose=True)
+                except IrregularMarkup as e:
+                    print(f"   Streaming parser can't read this export ({e}), using BeautifulSoup")
+                    items = self._parse_document(body)
+                    self.last_delta = diff_items(self.values_cache, items)
+                    self._pending_tables = None
+                print(f"\n[OK] Fetched {len(items)} items from Google Docs")
+            self.last_fetch['parse_ms'] = (time.perf_counter() - parse_start) * 1000
+            return items
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        except requests.RequestException as e:
+            print(f"Error fetching from Google Docs: {e}")
+            print("Make sure the document is publicly accessible or shared with 'Anyone with the link'")
+            return {}
+        except Exception as e:
+            print(f"Unexpected error parsing Google Docs: {e}")
+            import traceback
+            traceback.print_exc()
+            return {}
 
-            items = {}
+    def _parse_document(self, html) -> Dict[str, Dict]:
+        soup = BeautifulSoup(html, 'html.parser')
 
-            tables = soup.find_all('table')
-            print(f"Found {len(tables)} tables in document")
+        items = {}
 
-            all_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table'])
+        tables = soup.find_all('table')
+        print(f"Found {len(tables)} tables in document")
 
-            for element_idx, element in enumerate(all_elements):
-                if element.name != 'table':
-                    continue
+        all_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table'])
 
-                current_category = ""
-                candidates = []
-                
-                for j in range(max(0, element_idx - 5), element_idx):
-                    prev_elem = all_elements[j]
-                    if prev_elem.name in ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                        text = prev_elem.get_text().strip()
-                        text = remove_emojis(text).strip()
+        for element_idx, element in enumerate(all_elements):
+            if element.name != 'table':
+                continue
+
+            current_category = ""
+            candidates = []
+            
+            for j in range(max(0, element_idx - 5), element_idx):
+                prev_elem = all_elements[j]
+                if prev_elem.name in ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+                    text = prev_elem.get_text().strip()
+                    text = remove_emojis(text).strip()
+                    
+                    if not text or len(text) < 2:
+                        continue
+                    
+                    cleaned_text = text
+                    for suffix in ["'s", "'S"]:
+                        if cleaned_text.endswith(suffix):
+                            cleaned_text = cleaned_text[:-len(suffix)]
+                            break
+                    
+                    if 'CKS' in cleaned_text or 'CASE KNIVES' in cleaned_text.upper():
+                        for delimiter in ["CKS", " CK", " -", " (", "CASE"]:
+                            if delimiter in cleaned_text:
+                                before = cleaned_text.split(delimiter)[0].strip()
+                                if before and len(before) >= 2:
+                                    cleaned_text = before
+                                    break
+                    
+                    cleaned_text = cleaned_text.strip()
+                    
+                    if cleaned_text.lower() in ['hi', 'guns', 'gloves', 'knives', '']:
+                        continue
+                    
+                    if 'rarities' in cleaned_text.lower():
+                        continue
+                    
+                    if 2 <= len(cleaned_text) <= 50:
+                        text_lower = cleaned_text.lower()
                         
-                        if not text or len(text) < 2:
+                        if cleaned_text.replace(',', '').replace('.', '').replace('-', '').replace('+', '').replace('k', '').replace(' ', '').isdigit():
                             continue
                         
-                        cleaned_text = text
-                        for suffix in ["'s", "'S"]:
-                            if cleaned_text.endswith(suffix):
-                                cleaned_text = cleaned_text[:-len(suffix)]
-                                break
+                        priority = 0
+                        distance = element_idx - j
                         
-                        if 'CKS' in cleaned_text or 'CASE KNIVES' in cleaned_text.upper():
-                            for delimiter in ["CKS", " CK", " -", " (", "CASE"]:
-                                if delimiter in cleaned_text:
-                                    before = cleaned_text.split(delimiter)[0].strip()
-                                    if before and len(before) >= 2:
-                                        cleaned_text = before
-                                        break
+                        weapon_keywords = ['ak-47', 'ak', 'awp', 'm4a4', 'm4a1', 'mp', 'mac', 'p250', 'p90',
+                                         'eagle', 'desert', 'deagle', 'five', 'seven', 'glock', 'usp',
+                                         'famas', 'galil', 'aug', 'sg', 'ssg', 'scout', 'negev',
+                                         'bizon', 'ppsh', 'thompson', 'nova', 'xm', 'mag', 'sawed',
+                                         'karambit', 'huntsman', 'bayonet', 'butterfly', 'bowie',
+                                         'falchion', 'flip', 'gut', 'navaja', 'shadow', 'stiletto',
+                                         'talon', 'ursus', 'cleaver', 'sickle']
                         
-                        cleaned_text = cleaned_text.strip()
+                        has_weapon_keyword = any(kw in text_lower for kw in weapon_keywords)
+                        if has_weapon_keyword:
+                            priority += 100
                         
-                        if cleaned_text.lower() in ['hi', 'guns', 'gloves', 'knives', '']:
-                            continue
+                        if any(c.isdigit() for c in cleaned_text) or '-' in cleaned_text:
+                            priority += 50
                         
-                        if 'rarities' in cleaned_text.lower():
-                            continue
+                        if cleaned_text.isupper() and len(cleaned_text) <= 8:
+                            priority += 40
                         
-                        if 2 <= len(cleaned_text) <= 50:
-                            text_lower = cleaned_text.lower()
-                            
-                            if cleaned_text.replace(',', '').replace('.', '').replace('-', '').replace('+', '').replace('k', '').replace(' ', '').isdigit():
-                                continue
-                            
-                            priority = 0
-                            distance = element_idx - j
-                            
-                            weapon_keywords = ['ak-47', 'ak', 'awp', 'm4a4', 'm4a1', 'mp', 'mac', 'p250', 'p90',
-                                             'eagle', 'desert', 'deagle', 'five', 'seven', 'glock', 'usp',
-                                             'famas', 'galil', 'aug', 'sg', 'ssg', 'scout', 'negev',
-                                             'bizon', 'ppsh', 'thompson', 'nova', 'xm', 'mag', 'sawed',
-                                             'karambit', 'huntsman', 'bayonet', 'butterfly', 'bowie',
-                                             'falchion', 'flip', 'gut', 'navaja', 'shadow', 'stiletto',
-                                             'talon', 'ursus', 'cleaver', 'sickle']
-                            
-                            has_weapon_keyword = any(kw in text_lower for kw in weapon_keywords)
-                            if has_weapon_keyword:
-                                priority += 100
-                            
-                            if any(c.isdigit() for c in cleaned_text) or '-' in cleaned_text:
-                                priority += 50
-                            
-                            if cleaned_text.isupper() and len(cleaned_text) <= 8:
-                                priority += 40
-                            
-                            priority += max(0, 11 - distance * 2)
-                            
-                            status_words = ['decent', 'good', 'bad', 'mid', 'tsthas', 'unknown yet',
-                                          'null', 'doesnt exist', 'low', 'high', 'pink', 'red', 'blue',
-                                          'purple', 'gold', 'covert', 'classified', 'cks', 'ck']
-                            if text_lower in status_words:
-                                priority -= 50
-                            
-                            candidates.append((priority, cleaned_text, distance))
-                
-                if candidates:
-                    candidates.sort(key=lambda x: (-x[0], x[2]))
-                    current_category = candidates[0][1]
-                else:
-                    current_category = "Unknown"
-
-                print(f"\nProcessing table with category: '{current_category}'...")
-                
-                table = element
-                rows = table.find_all('tr')
+                        priority += max(0, 11 - distance * 2)
+                        
+                        status_words = ['decent', 'good', 'bad', 'mid', 'tsthas', 'unknown yet',
+                                      'null', 'doesnt exist', 'low', 'high', 'pink', 'red', 'blue',
+                                      'purple', 'gold', 'covert', 'classified', 'cks', 'ck']
+                        if text_lower in status_words:
+                            priority -= 50
+                        
+                        candidates.append((priority, cleaned_text, distance))
+            
+            if candidates:
+                candidates.sort(key=lambda x: (-x[0], x[2]))
+                current_category = candidates[0][1]
+            else:
+                current_category = "Unknown"
 
-                if len(rows) < 3:
-                    print(f"  Skipping - not enough rows (need at least 3, found {len(rows)})")
-                    continue
+            print(f"\nProcessing table with category: '{current_category}'...")
+            
+            table = element
+            rows = table.find_all('tr')
 
-                data_rows = rows[2:]
+            if len(rows) < 3:
+                print(f"  Skipping - not enough rows (need at least 3, found {len(rows)})")
+                continue
 
-                print(f"  Found {len(data_rows)} data rows (skipped 2 header rows)")
+            data_rows = rows[2:]
 
-                header_row = rows[1]
-                headers = []
-                for cell in header_row.find_all(['th', 'td']):
-                    headers.append(cell.get_text().strip().lower())
+            print(f"  Found {len(data_rows)} data rows (skipped 2 header rows)")
 
-                print(f"  Headers: {headers}")
+            header_row = rows[1]
+            headers = []
+            for cell in header_row.find_all(['th', 'td']):
+                headers.append(cell.get_text().strip().lower())
 
-                name_idx = 0
-                base_value_idx = 1 if len(headers) > 1 else -1
-                dg_value_idx = 2 if len(headers) > 2 else -1
-                ck_value_idx = 3 if len(headers) > 3 else -1
-                upg_value_idx = 4 if len(headers) > 4 else -1
-                status_idx = 5 if len(headers) > 5 else -1
+            print(f"  Headers: {headers}")
 
-                print(f"  Column mapping: Name={name_idx}, Base={base_value_idx}, DG={dg_value_idx}, CK={ck_value_idx}, UPG={upg_value_idx}, Status={status_idx}")
+            name_idx = 0
+            base_value_idx = 1 if len(headers) > 1 else -1
+            dg_value_idx = 2 if len(headers) > 2 else -1
+            ck_value_idx = 3 if len(headers) > 3 else -1
+            upg_value_idx = 4 if len(headers) > 4 else -1
+            status_idx = 5 if len(headers) > 5 else -1
 
-                items_in_table = 0
-                for row in data_rows:
-                    cells = row.find_all(['td', 'th'])
+            print(f"  Column mapping: Name={name_idx}, Base={base_value_idx}, DG={dg_value_idx}, CK={ck_value_idx}, UPG={upg_value_idx}, Status={status_idx}")
 
-                    if len(cells) <= name_idx:
-                        continue
+            items_in_table = 0
+            for row in data_rows:
+                cells = row.find_all(['td', 'th'])
 
-                    skin_name = cells[name_idx].get_text().strip()
-                    skin_name = remove_emojis(skin_name).strip()
+                if len(cells) <= name_idx:
+                    continue
 
-                    if not skin_name:
-                        continue
+                skin_name = cells[name_idx].get_text().strip()
+                skin_name = remove_emojis(skin_name).strip()
 
-                    skin_name_lower = skin_name.lower()
+                if not skin_name:
+                    continue
 
-                    header_keywords = [
-                        'skin', 'item', 'name', 'rarities', 'rarity',
-                        'too small to have a status', 'tsthas',
-                        'easy to find', 'a little bit harder to find', 'hard to find',
-                        'doesn\'t exist', 'noone ever had it', 'case item',
-                        'base value', 'dg value', 'ck value', 'upg value', 'status',
-                        'value', 'demand', 'except mods'
-                    ]
+                skin_name_lower = skin_name.lower()
 
-                    if any(keyword == skin_name_lower or keyword in skin_name_lower for keyword in header_keywords):
-                        continue
+                header_keywords = [
+                    'skin', 'item', 'name', 'rarities', 'rarity',
+                    'too small to have a status', 'tsthas',
+                    'easy to find', 'a little bit harder to find', 'hard to find',
+                    'doesn\'t exist', 'noone ever had it', 'case item',
+                    'base value', 'dg value', 'ck value', 'upg value', 'status',
+                    'value', 'demand', 'except mods'
+                ]
 
-                    status_keywords = ['good', 'bad', 'mid', 'low', 'high', 'pink', 'red', 'purple',
-                                      'blue', 'gold', 'covert', 'classified', 'restricted', 'mil-spec',
-                                      'consumer', 'industrial', 'decent']
+                if any(keyword == skin_name_lower or keyword in skin_name_lower for keyword in header_keywords):
+                    continue
 
-                    if len(skin_name.split()) <= 2:
-                        if any(keyword in skin_name_lower for keyword in status_keywords):
-                            continue
+                status_keywords = ['good', 'bad', 'mid', 'low', 'high', 'pink', 'red', 'purple',
+                                  'blue', 'gold', 'covert', 'classified', 'restricted', 'mil-spec',
+                                  'consumer', 'industrial', 'decent']
 
-                    if skin_name_lower in status_keywords:
+                if len(skin_name.split()) <= 2:
+                    if any(keyword in skin_name_lower for keyword in status_keywords):
                         continue
 
-                    knife_keywords = ['knives', 'knife']
-                    is_knife_category = any(kw in current_category.lower() for kw in knife_keywords)
-                    
-                    if current_category and current_category.lower() not in skin_name.lower():
-                        if is_knife_category:
-                            clean_category = current_category
-                            for kw in [' KNIVES', ' Knives', ' knives', ' KNIFE', ' Knife', ' knife']:
-                                clean_category = clean_category.replace(kw, '')
-                            name = f"{clean_category} {skin_name}"
-                        else:
-                            name = f"{current_category} {skin_name}"
-                    else:
-                        name = skin_name
-
-                    def get_numeric_value(idx):
-                        if idx >= 0 and idx < len(cells):
-                            text = cells[idx].get_text().strip()
-                            match = re.search(r'[\d,]+\.?\d*', text.replace(',', ''))
-                            if match:
-                                try:
-                                    return float(match.group())
-                                except:
-                                    return 0
-                        return 0
-
-                    def get_text_value(idx):
-                        if idx >= 0 and idx < len(cells):
-                            text = cells[idx].get_text().strip()
-                            return remove_emojis(text).strip()
-                        return ""
-
-                    base_value = get_numeric_value(base_value_idx)
-                    dg_value = get_numeric_value(dg_value_idx)
-                    ck_value = get_numeric_value(ck_value_idx)
-                    upg_value = get_numeric_value(upg_value_idx)
-                    status = get_text_value(status_idx)
-
-                    demand = self._status_to_demand(status)
-
-                    primary_value = base_value or ck_value or dg_value or upg_value
-
-                    items[name] = {
-                        'name': name,
-                        'value': primary_value,
-                        'base_value': base_value,
-                        'dg_value': dg_value,
-                        'ck_value': ck_value,
-                        'upg_value': upg_value,
-                        'rap': primary_value,
-                        'demand': demand,
-                        'status': status,
-                        'category': current_category
-                    }
-                    items_in_table += 1
-
-                print(f"  Parsed {items_in_table} items from this table")
-
-            print(f"\n[OK] Fetched {len(items)} items from Google Docs")
-            return items
+                if skin_name_lower in status_keywords:
+                    continue
 
-        except requests.RequestException as e:
-            print(f"Error fetching from Google Docs: {e}")
-            print("Make sure the document is publicly accessible or shared with 'Anyone with the link'")
-            return {}
-        except Exception as e:
-            print(f"Unexpected error parsing Google Docs: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
+                knife_keywords = ['knives', 'knife']
+                is_knife_category = any(kw in current_category.lower() for kw in knife_keywords)
+                
+                if current_category and current_category.lower() not in skin_name.lower():
+                    if is_knife_category:
+                        clean_category = current_category
+                        for kw in [' KNIVES', ' Knives', ' knives', ' KNIFE', ' Knife', ' knife']:
+                            clean_category = clean_category.replace(kw, '')
+                        name = f"{clean_category} {skin_name}"
+                    else:
+                        name = f"{current_category} {skin_name}"
+                else:
+                    name = skin_name
+
+                def get_numeric_value(idx):
+                    if idx >= 0 and idx < len(cells):
+                        text = cells[idx].get_text().strip()
+                        match = re.search(r'[\d,]+\.?\d*', text.replace(',', ''))
+                        if match:
+                            try:
+                                return float(match.group())
+                            except:
+                                return 0
+                    return 0
+
+                def get_text_value(idx):
+                    if idx >= 0 and idx < len(cells):
+                        text = cells[idx].get_text().strip()
+                        return remove_emojis(text).strip()
+                    return ""
+
+                base_value = get_numeric_value(base_value_idx)
+                dg_value = get_numeric_value(dg_value_idx)
+                ck_value = get_numeric_value(ck_value_idx)
+                upg_value = get_numeric_value(upg_value_idx)
+                status = get_text_value(status_idx)
+
+                demand = self._status_to_demand(status)
+
+                primary_value = base_value or ck_value or dg_value or upg_value
+
+                items[name] = {
+                    'name': name,
+                    'value': primary_value,
+                    'base_value': base_value,
+                    'dg_value': dg_value,
+                    'ck_value': ck_value,
+                    'upg_value': upg_value,
+                    'rap': primary_value,
+                    'demand': demand,
+                    'status': status,
+                    'category': current_category
+                }
+                items_in_table += 1
+
+            print(f"  Parsed {items_in_table} items from this table")
+
+        print(f"\n[OK] Fetched {len(items)} items from Google Docs")
+        return items
 
     def _status_to_demand(self, status: str) -> int:
-        status_lower = status.lower()
-
-        if 'red' in status_lower or 'gold' in status_lower or 'covert' in status_lower:
-            base = 8
-        elif 'pink' in status_lower or 'classified' in status_lower:
-            base = 6
-        elif 'purple' in status_lower or 'restricted' in status_lower:
-            base = 4
-        elif 'blue' in status_lower or 'mil-spec' in status_lower:
-            base = 2
-        else:
-            base = 5
-
-        if 'good' in status_lower or 'high' in status_lower:
-            return min(10, base + 2)
-        elif 'bad' in status_lower or 'low' in status_lower:
-            return max(1, base - 2)
-        else:
-            return base
-
-
+        return status_to_demand(status)
 
     def should_refresh(self) -> bool:
         if not self.last_update:
@@ -322,15 +420,33 @@ class ValueListFetcher:
 
         items = {}
 
-        if GOOGLE_DOCS_ID:
+        if GOOGLE_DOCS_ID or self.export_url:
             print("Fetching data from Google Docs...")
             items = self._fetch_from_google_docs(GOOGLE_DOCS_ID)
+            stats = self.last_fetch
+            print(f"   Fetch: {stats['fetch_ms']:.0f} ms ({stats['bytes']:,} bytes, HTTP {stats['status']}), "
+                  f"parse: {stats['parse_ms']:.0f} ms")
+
+        if items is None:
+            # same document as the cache: nothing to parse or rewrite
+            print("[OK] Value list unchanged, keeping cached items")
+            self.last_update = datetime.now()
+            return True
 
         if items:
-            print(f"[OK] Loaded {len(items)} items from Google Docs")
-            self.values_cache = items
+            print(f"[OK] Loaded {len(items)} items from Google Docs ({self.last_delta.summary()})")
+            self.table_cache, self._pending_tables = self._pending_tables, None
             self.last_update = datetime.now()
-            self._save_cache()
+            if not self.last_delta:
+                # edited, but no item changed: keep the cache files as they are
+                self._commit_fetch_state()
+                return True
+            # only the changed rows are touched in memory; the cache files are
+            # still rewritten whole (the JSON can't be patched and snapshots are
+            # never modified in place), so saving stays O(catalog)
+            self.last_delta.apply(self.values_cache)
+            if self._save_cache():
+                self._record_history()
             return True
         else:
             print("[X] Google Docs fetch failed")
@@ -350,22 +466,25 @@ class ValueListFetcher:
             return datetime.now() - self.last_update
         return None
 
-def test_google_docs_fetch():
+def test_google_docs_fetch(export_url: Optional[str] = None, repeat: int = 1, parser: str = 'stream'):
     print("=" * 60)
     print("Testing Google Docs Scraping")
     print("=" * 60)
 
-    if not GOOGLE_DOCS_ID:
+    if not GOOGLE_DOCS_ID and not export_url:
         print("\nERROR: GOOGLE_DOCS_ID not configured")
         return
 
     print(f"\nDocument ID: {GOOGLE_DOCS_ID}")
-    print(f"URL: https://docs.google.com/document/d/{GOOGLE_DOCS_ID}")
+    print(f"URL: {export_url or f'https://docs.google.com/document/d/{GOOGLE_DOCS_ID}'}")
 
-    fetcher = ValueListFetcher()
+    fetcher = ValueListFetcher(export_url=export_url, parser=parser)
 
     print("\nFetching data from Google Docs...")
     success = fetcher.fetch_values(force_refresh=True)
+    # later rounds should come back unchanged without parsing
+    for _ in range(repeat - 1):
+        success = fetcher.fetch_values(force_refresh=True) and success
 
     if success:
         print("\n[OK] Fetch successful!")
@@ -420,4 +539,14 @@ def test_google_docs_fetch():
         print("4. Click 'Done'")
 
 if __name__ == "__main__":
-    test_google_docs_fetch()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch the value list and refresh the item cache")
+    parser.add_argument('--url', help="fetch the HTML export from this URL instead of Google Docs, "
+                                      "e.g. a saved export served by `python -m http.server`")
+    parser.add_argument('--parser', choices=('stream', 'soup'), default='stream',
+                        help="value-list parser: streaming (default) or the BeautifulSoup tree")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="fetch this many times in a row to check the unchanged-document path")
+    args = parser.parse_args()
+    test_google_docs_fetch(args.url, args.repeat, args.parser)
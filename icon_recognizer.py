@@ -0,0 +1,224 @@
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+ICON_INDEX_FILE = "item_icons_index.npz"
+ICON_DIR = "item_icons"
+ICON_SIZE = 16
+
+
+def icon_vector(img_rgb: np.ndarray, size: int = ICON_SIZE) -> np.ndarray:
+    """Compact brightness-normalized feature vector of a card thumbnail."""
+    gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    small -= small.mean()
+    norm = np.linalg.norm(small)
+    return small / norm if norm else small
+
+
+def card_edges(region_rgb: np.ndarray) -> np.ndarray:
+    """Dilated Canny edge map that card detection and the grid check share."""
+    gray = cv2.cvtColor(region_rgb, cv2.COLOR_RGB2GRAY)
+    edges = cv2.Canny(gray, 40, 120)
+    return cv2.dilate(edges, np.ones((3, 3), np.uint8))
+
+
+def detect_cards(region_rgb: np.ndarray, min_area: float = 0.01, max_area: float = 0.25,
+                 min_aspect: float = 0.5, max_aspect: float = 2.0,
+                 edges: Optional[np.ndarray] = None) -> List[Tuple[int, int, int, int]]:
+    """Bounding boxes of item-card tiles inside an offer region, row-major.
+
+    Cards are the bordered rectangles that stand out from the panel
+    background; boxes are filtered by their share of the region area and
+    their width/height ratio.
+    """
+    if edges is None:
+        edges = card_edges(region_rgb)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    region_area = region_rgb.shape[0] * region_rgb.shape[1]
+    cards = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        share = (w * h) / region_area
+        if min_area <= share <= max_area and min_aspect <= w / h <= max_aspect:
+            cards.append((x, y, w, h))
+
+    # row-major: bucket by rows of roughly one card height
+    if cards:
+        row_height = max(1, int(np.median([h for _, _, _, h in cards]) / 2))
+        cards.sort(key=lambda c: (c[1] // row_height, c[0]))
+    return cards
+
+
+def grid_complete(region_rgb: np.ndarray, cards: List[Tuple[int, int, int, int]],
+                  edges: Optional[np.ndarray] = None, empty_ratio: float = 0.3) -> bool:
+    """Whether ``cards`` accounts for every card in the region.
+
+    Offer cards sit on a regular grid, so the spacing of the detected cards
+    gives every slot the region has room for. A detected card off that
+    grid, or a slot without a detected card that has more than
+    ``empty_ratio`` of a card's edge detail (a card the contour pass
+    missed), means the detection can't be trusted.
+    """
+    if not cards:
+        return False
+    if edges is None:
+        edges = card_edges(region_rgb)
+    width = int(np.median([w for _, _, w, _ in cards]))
+    height = int(np.median([h for _, _, _, h in cards]))
+
+    def pitch(starts, size, fallback):
+        # cards in the same column/row start within half a card of each other
+        steps = [b - a for a, b in zip(starts, starts[1:]) if b - a > size // 2]
+        return min(steps) if steps else fallback
+
+    pitch_x = pitch(sorted(x for x, _, _, _ in cards), width, round(width * 1.1))
+    pitch_y = pitch(sorted(y for _, y, _, _ in cards), height, round(height * 1.1))
+    x0 = min(x for x, _, _, _ in cards)
+    y0 = min(y for _, y, _, _ in cards)
+
+    taken = set()
+    for x, y, _, _ in cards:
+        col = round((x - x0) / pitch_x)
+        row = round((y - y0) / pitch_y)
+        if (abs(x - x0 - col * pitch_x) > pitch_x / 4 or abs(y - y0 - row * pitch_y) > pitch_y / 4
+                or (row, col) in taken):
+            return False
+        taken.add((row, col))
+
+    def density(x, y):
+        return np.count_nonzero(edges[y:y + height, x:x + width]) / (width * height)
+
+    card_density = float(np.median([density(x, y) for x, y, _, _ in cards]))
+    region_h, region_w = edges.shape[:2]
+    for row in range(-(y0 // pitch_y), (region_h - y0 - height) // pitch_y + 1):
+        for col in range(-(x0 // pitch_x), (region_w - x0 - width) // pitch_x + 1):
+            if (row, col) not in taken and density(x0 + col * pitch_x, y0 + row * pitch_y) > empty_ratio * card_density:
+                return False
+    return True
+
+
+class IconIndex:
+    """Item-card thumbnails as an (N, D) matrix of unit vectors.
+
+    Matching every detected card against every known icon is one matrix
+    product, so a card is recognized far faster than OCR can read it.
+    """
+
+    def __init__(self, names: Optional[List[str]] = None, vectors: Optional[np.ndarray] = None,
+                 min_score: float = 0.92, min_margin: float = 0.02):
+        self.names = list(names or [])
+        dim = ICON_SIZE * ICON_SIZE
+        self.vectors = vectors if vectors is not None else np.zeros((0, dim), dtype=np.float32)
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def load(cls, path: str = ICON_INDEX_FILE, **kwargs) -> "IconIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['names'].tolist(), data['vectors'].astype(np.float32), **kwargs)
+
+    def save(self, path: str = ICON_INDEX_FILE) -> None:
+        np.savez_compressed(path, names=np.array(self.names), vectors=self.vectors)
+
+    @classmethod
+    def build(cls, icon_dir: str = ICON_DIR, **kwargs) -> "IconIndex":
+        """Index every ``<item name>.png`` thumbnail in ``icon_dir``."""
+        names = []
+        vectors = []
+        for filename in sorted(os.listdir(icon_dir)):
+            name, ext = os.path.splitext(filename)
+            if ext.lower() not in ('.png', '.jpg', '.jpeg', '.bmp'):
+                continue
+            img = cv2.imread(os.path.join(icon_dir, filename))
+            if img is None:
+                print(f"  Skipping unreadable icon: {filename}")
+                continue
+            names.append(name)
+            vectors.append(icon_vector(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+        matrix = np.vstack(vectors) if vectors else None
+        return cls(names, matrix, **kwargs)
+
+    def match(self, tiles: List[np.ndarray]) -> List[Tuple[Optional[str], float]]:
+        """(name, score) per tile; name is None when the match isn't confident."""
+        if not tiles or not len(self.names):
+            return [(None, 0.0) for _ in tiles]
+
+        queries = np.vstack([icon_vector(tile) for tile in tiles])
+        scores = queries @ self.vectors.T
+
+        results = []
+        for row in scores:
+            if len(row) > 1:
+                second, best = np.partition(row, -2)[-2:]
+            else:
+                second, best = -1.0, row[0]
+            idx = int(np.argmax(row))
+            confident = best >= self.min_score and best - second >= self.min_margin
+            results.append((self.names[idx] if confident else None, float(best)))
+        return results
+
+    def recognize_region(self, region_rgb: np.ndarray) -> Optional[List[str]]:
+        """Item names of every card in the region, or None when any card
+        (or the region itself) couldn't be recognized confidently, or the
+        detected cards don't fill the region's card grid (see grid_complete)."""
+        edges = card_edges(region_rgb)
+        cards = detect_cards(region_rgb, edges=edges)
+        if not cards or not grid_complete(region_rgb, cards, edges):
+            return None
+        tiles = [region_rgb[y:y + h, x:x + w] for x, y, w, h in cards]
+        names = [name for name, _ in self.match(tiles)]
+        if any(name is None for name in names):
+            return None
+        return names
+
+
+def check() -> bool:
+    """Recognize a synthetic 7-card offer, then drop each detected card in
+    turn as if the contour pass had missed it; every drop must return None."""
+    rng = np.random.default_rng(7)
+    tiles = []
+    for _ in range(7):
+        tile = np.full((80, 80, 3), 60, dtype=np.uint8)
+        cv2.rectangle(tile, (0, 0), (79, 79), (220, 220, 220), 2)
+        for _ in range(6):
+            x1, y1, x2, y2 = (int(v) for v in rng.integers(10, 70, 4))
+            cv2.rectangle(tile, (x1, y1), (x2, y2), tuple(int(v) for v in rng.integers(80, 255, 3)), -1)
+        tiles.append(tile)
+    region = np.full((240, 480, 3), 30, dtype=np.uint8)
+    for i, tile in enumerate(tiles):
+        row, col = divmod(i, 4)
+        region[20 + row * 100:100 + row * 100, 16 + col * 96:96 + col * 96] = tile
+
+    names = [f"item {i}" for i in range(len(tiles))]
+    index = IconIndex(names, np.vstack([icon_vector(tile) for tile in tiles]))
+    ok = index.recognize_region(region) == names
+    print(f"  full offer: {'recognized' if ok else 'NOT recognized'}")
+
+    edges = card_edges(region)
+    cards = detect_cards(region, edges=edges)
+    for i in range(len(cards)):
+        masked = cards[:i] + cards[i + 1:]
+        rejected = not grid_complete(region, masked, edges)
+        print(f"  card {i} missed: {'rejected' if rejected else 'NOT rejected'}")
+        ok = ok and rejected
+    return ok
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--check']:
+        sys.exit(0 if check() else 1)
+    icon_dir = sys.argv[1] if len(sys.argv) > 1 else ICON_DIR
+    print(f"Building icon index from {icon_dir}/ ...")
+    start = time.perf_counter()
+    index = IconIndex.build(icon_dir)
+    index.save()
+    print(f"[OK] Indexed {len(index)} icons into {ICON_INDEX_FILE} in {time.perf_counter() - start:.2f}s")
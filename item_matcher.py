@@ -0,0 +1,234 @@
+import copy
+from collections import defaultdict, deque
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from catalog_store import Catalog
+
+# How many trigram-ranked candidates get a full SequenceMatcher score
+DEFAULT_MAX_CANDIDATES = 64
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameAutomaton:
+    """Aho-Corasick automaton over lowercased item names.
+
+    One pass over a chunk reports every verbatim occurrence of every name.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+
+        for idx, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = self.goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(idx)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text: str) -> List[Tuple[int, int, int]]:
+        """Every (start, end, pattern index) occurrence in ``text``."""
+        matches = []
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for idx in self.out[state]:
+                end = pos + 1
+                matches.append((end - len(self.patterns[idx]), end, idx))
+        return matches
+
+
+class ItemMatcher:
+    """Fuzzy item-name lookup backed by a character-trigram inverted index.
+
+    The index is built once from the catalog. A query only scores the
+    handful of names sharing the most trigrams with it, using the same
+    SequenceMatcher ratio and thresholds as the old linear scans.
+    """
+
+    def __init__(self, items: Dict[str, Dict], max_candidates: int = DEFAULT_MAX_CANDIDATES):
+        self.max_candidates = max_candidates
+        self.rebuild(items)
+
+    def rebuild(self, items: Dict[str, Dict]) -> None:
+        self.names: List[str] = list(items.keys())
+        self.lowered: List[str] = [name.lower() for name in self.names]
+        # a mapped Catalog builds item dicts on demand instead of all at startup
+        self.data: Sequence[Dict] = items.item_list() if isinstance(items, Catalog) else [items[name] for name in self.names]
+
+        # parse_text_for_items prefers longer names on ties
+        by_length = sorted(range(len(self.names)), key=lambda i: len(self.names[i]), reverse=True)
+        self.length_rank: List[int] = [0] * len(self.names)
+        for rank, idx in enumerate(by_length):
+            self.length_rank[idx] = rank
+
+        postings = defaultdict(list)
+        self.gram_counts: List[int] = []
+        self.short_names: List[int] = []
+        for idx, lowered in enumerate(self.lowered):
+            grams = trigrams(lowered)
+            self.gram_counts.append(len(grams))
+            if not grams:
+                self.short_names.append(idx)
+            for gram in grams:
+                postings[gram].append(idx)
+        self.postings: Dict[str, List[int]] = dict(postings)
+
+        self.automaton = NameAutomaton(self.lowered)
+
+    def with_items(self, items: Dict[str, Dict]) -> 'ItemMatcher':
+        """A matcher over new data for the same names, sharing this one's
+        postings and automaton; ``items`` must hold exactly ``self.names``."""
+        matcher = copy.copy(self)
+        matcher.data = [items[name] for name in self.names]
+        return matcher
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _shared_counts(self, text: str) -> Dict[int, int]:
+        shared = defaultdict(int)
+        for gram in trigrams(text):
+            for idx in self.postings.get(gram, ()):
+                shared[idx] += 1
+        return shared
+
+    def candidates(self, text: str, containment: bool = False, shared: Optional[Dict[int, int]] = None) -> List[int]:
+        """Return the indexes of the names most likely to match ``text``.
+
+        With ``containment`` the ranking measures how much of each name
+        appears inside the text (for OCR chunks holding several items),
+        otherwise it is the Dice overlap of the two trigram sets.
+        """
+        if shared is None:
+            shared = self._shared_counts(text)
+        query_count = max(len(text) - 2, 1)
+
+        if containment:
+            def rank(idx):
+                return shared[idx] / self.gram_counts[idx]
+        else:
+            def rank(idx):
+                return 2 * shared[idx] / (query_count + self.gram_counts[idx])
+
+        ranked = sorted(shared, key=rank, reverse=True)[:self.max_candidates]
+        return ranked + self.short_names
+
+    def _best_scored(self, text: str, indexes, threshold: float, order: List[int]) -> Tuple[Optional[int], float]:
+        best_idx = None
+        best_score = 0
+        text_len = len(text)
+
+        for idx in indexes:
+            name_lower = self.lowered[idx]
+            # ratio() can never exceed 2*min/(len_a+len_b)
+            total = text_len + len(name_lower)
+            bound = 2 * min(text_len, len(name_lower)) / total if total else 0
+            floor = max(threshold, best_score)
+            if bound < floor or (bound == floor and (best_idx is None or order[idx] > order[best_idx])):
+                continue
+
+            matcher = SequenceMatcher(None, text, name_lower)
+            if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                continue
+
+            score = matcher.ratio()
+            if score <= threshold:
+                continue
+            if score > best_score or (score == best_score and order[idx] < order[best_idx]):
+                best_score = score
+                best_idx = idx
+
+        return best_idx, best_score
+
+    def find(self, text: str, threshold: float = 0.75) -> Tuple[Optional[Dict], float]:
+        """Best catalog entry for a single OCR'd item name."""
+        text = text.lower().strip()
+        if len(text) < 3:
+            return None, 0
+
+        catalog_order = range(len(self.names))
+        best_idx, best_score = self._best_scored(text, self.candidates(text), threshold, catalog_order)
+        if best_idx is None:
+            return None, 0
+        return self.data[best_idx], best_score
+
+    def find_exact(self, text: str) -> Tuple[List[Tuple[int, int, int]], str]:
+        """Verbatim names in a lowercased chunk, in one automaton pass.
+
+        Overlapping hits are resolved longest first (ties go to the earlier
+        position, then to the longer catalog name). Returns the chosen
+        (start, end, index) spans in text order and the leftover text with
+        those spans cut out.
+        """
+        hits = self.automaton.scan(text)
+        hits.sort(key=lambda hit: (hit[0] - hit[1], hit[0], self.length_rank[hit[2]]))
+
+        taken = [False] * len(text)
+        chosen = []
+        for start, end, idx in hits:
+            if any(taken[start:end]):
+                continue
+            for pos in range(start, end):
+                taken[pos] = True
+            chosen.append((start, end, idx))
+        chosen.sort()
+
+        pieces = []
+        last = 0
+        for start, end, _ in chosen:
+            pieces.append(text[last:start])
+            last = end
+        pieces.append(text[last:])
+        leftover = ' '.join(' '.join(pieces).split())
+        return chosen, leftover
+
+    def find_in_text(self, text: str, threshold: float = 0.50) -> Tuple[Optional[str], Optional[Dict], float]:
+        """Best catalog entry contained in (or resembling) a lowercased chunk.
+
+        Names appearing verbatim score 1.0 and the longest one wins, the
+        same as the sorted scan in parse_text_for_items.
+        """
+        shared = self._shared_counts(text)
+
+        # A verbatim name must share every one of its trigrams with the text
+        exact = [idx for idx, count in shared.items()
+                 if count == self.gram_counts[idx] and self.lowered[idx] in text]
+        exact += [idx for idx in self.short_names if self.lowered[idx] in text]
+        if exact:
+            best_idx = min(exact, key=lambda idx: self.length_rank[idx])
+            return self.names[best_idx], self.data[best_idx], 1.0
+
+        candidates = self.candidates(text, containment=True, shared=shared)
+        best_idx, best_score = self._best_scored(text, candidates, threshold, self.length_rank)
+        if best_idx is None:
+            return None, None, 0
+        return self.names[best_idx], self.data[best_idx], best_score
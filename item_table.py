@@ -0,0 +1,135 @@
+import copy
+from typing import Dict, Iterable, List, Mapping
+
+import numpy as np
+
+from catalog_store import NO_INT, Catalog
+
+# Demand adjustment: 1-3=low (-20%), 4-7=normal (0%), 8-10=high (+20%)
+DEMAND_LOW = 3
+DEMAND_HIGH = 8
+DEFAULT_DEMAND = 5
+
+# a value difference below this is a fair trade
+FAIR_MARGIN = 50
+
+VALUE_COLUMNS = {'base': 'base_value', 'dg': 'dg_value', 'ck': 'ck_value', 'upg': 'upg_value'}
+
+
+def demand_multiplier(demand: np.ndarray) -> np.ndarray:
+    return np.where(demand <= DEMAND_LOW, 0.80, np.where(demand >= DEMAND_HIGH, 1.20, 1.0))
+
+
+def verdict(diff: float) -> str:
+    """FAIR, WIN or LOSE for their total minus yours."""
+    if abs(diff) < FAIR_MARGIN:
+        return 'FAIR'
+    return 'WIN' if diff > 0 else 'LOSE'
+
+
+class ItemTable:
+    """The catalog as NumPy columns, one row per item.
+
+    Trades are arrays of row indexes, so totals are a fancy-index and a sum
+    instead of a .get() per dict. ``adjusted`` is the demand-adjusted base
+    value, computed once for the whole catalog.
+    """
+
+    def __init__(self, names: List[str], values: Dict[str, np.ndarray], demand: np.ndarray,
+                 category_codes: np.ndarray, categories: List[str]):
+        self.names = names
+        self.index = {name: row for row, name in enumerate(names)}
+        self.values = values
+        self.demand = demand
+        self.category_codes = category_codes
+        self.categories = categories
+        self.adjusted = values['base'] * demand_multiplier(demand)
+
+    @classmethod
+    def from_items(cls, items: Mapping[str, Dict]) -> 'ItemTable':
+        if isinstance(items, Catalog):
+            return cls.from_catalog(items)
+
+        names = list(items.keys())
+        values = {mode: np.fromiter((items[n].get(field) or 0 for n in names), dtype=np.float64, count=len(names))
+                  for mode, field in VALUE_COLUMNS.items()}
+        demand = np.fromiter((items[n].get('demand', DEFAULT_DEMAND) for n in names), dtype=np.int8, count=len(names))
+        codes = {}
+        category_codes = np.fromiter((codes.setdefault(items[n].get('category', ''), len(codes)) for n in names),
+                                     dtype=np.int16, count=len(names))
+        return cls(names, values, demand, category_codes, list(codes))
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> 'ItemTable':
+        """Build straight from the mapped columns, no item dicts involved."""
+        names = list(catalog)
+        values = {mode: np.nan_to_num(np.frombuffer(catalog.columns[field], dtype=np.float64))
+                  for mode, field in VALUE_COLUMNS.items()}
+        raw_demand = np.frombuffer(catalog.columns['demand'], dtype=np.int32)
+        demand = np.where(raw_demand == NO_INT, DEFAULT_DEMAND, raw_demand).astype(np.int8)
+        string_ids = np.frombuffer(catalog.columns['category'], dtype=np.int32)
+        unique_ids, category_codes = np.unique(string_ids, return_inverse=True)
+        categories = [catalog.string(int(idx)) or '' for idx in unique_ids]
+        return cls(names, values, demand, category_codes.astype(np.int16), categories)
+
+    def with_changes(self, changed: Mapping[str, Dict]) -> 'ItemTable':
+        """A copy with the rows of ``changed`` (name -> new item dict)
+        rewritten; names and row order are shared with this table."""
+        table = copy.copy(self)
+        table.values = {mode: column.copy() for mode, column in self.values.items()}
+        table.demand = self.demand.copy()
+        table.category_codes = self.category_codes.copy()
+        table.categories = list(self.categories)
+        codes = {category: code for code, category in enumerate(table.categories)}
+        rows = []
+        for name, data in changed.items():
+            row = self.index[name]
+            rows.append(row)
+            for mode, field in VALUE_COLUMNS.items():
+                table.values[mode][row] = data.get(field) or 0
+            table.demand[row] = data.get('demand', DEFAULT_DEMAND)
+            category = data.get('category', '')
+            if category not in codes:
+                codes[category] = len(table.categories)
+                table.categories.append(category)
+            table.category_codes[row] = codes[category]
+        table.adjusted = self.adjusted.copy()
+        rows = np.array(rows, dtype=np.intp)
+        table.adjusted[rows] = table.values['base'][rows] * demand_multiplier(table.demand[rows])
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rows(self, items: Iterable) -> np.ndarray:
+        """Row indexes for item dicts (or names) taken from this catalog."""
+        index = self.index
+        return np.fromiter((index[item if isinstance(item, str) else item['name']] for item in items), dtype=np.intp)
+
+    def totals(self, rows: np.ndarray) -> Dict[str, float]:
+        """Base, demand-adjusted and per-mode totals of one side of a trade."""
+        totals = {mode: float(column[rows].sum()) for mode, column in self.values.items()}
+        totals['adjusted'] = float(self.adjusted[rows].sum())
+        totals['count'] = len(rows)
+        return totals
+
+    def compare(self, your_rows: np.ndarray, their_rows: np.ndarray) -> Dict[str, Dict]:
+        """Totals for both sides plus base and adjusted difference/percentage."""
+        your, their = self.totals(your_rows), self.totals(their_rows)
+        result = {'your': your, 'their': their}
+        for key in ('base', 'adjusted'):
+            diff = their[key] - your[key]
+            pct = (diff / max(your[key], 1)) * 100 if your[key] > 0 else 0
+            result[key] = {'diff': diff, 'pct': pct}
+        return result
+
+    def group_totals(self, rows: np.ndarray, offsets: np.ndarray, column: str = 'base') -> np.ndarray:
+        """Per-trade sums for many trades at once: trade ``i`` is
+        ``rows[offsets[i]:offsets[i + 1]]``. Empty trades sum to 0."""
+        values = self.adjusted if column == 'adjusted' else self.values[column]
+        cumulative = np.concatenate(([0.0], np.cumsum(values[rows])))
+        return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+    def nbytes(self) -> int:
+        arrays = list(self.values.values()) + [self.demand, self.category_codes, self.adjusted]
+        return sum(a.nbytes for a in arrays)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+OCR_CACHE_FILE = "ocr_cache.json"
+
+
+def exact_key(img: np.ndarray) -> str:
+    """Content hash of an OCR input crop (shape included)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(img.shape).encode())
+    digest.update(np.ascontiguousarray(img).data)
+    return digest.hexdigest()
+
+
+def perceptual_hash(img: np.ndarray) -> int:
+    """64-bit difference hash; near-identical crops land a few bits apart."""
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+class OCRCache:
+    """LRU cache of OCR results keyed by the pixels that were recognized.
+
+    Exact hits are looked up by content hash. With ``phash_tolerance`` > 0
+    a miss falls back to the closest cached crop of the same size whose
+    perceptual hash is within that many bits. Entries older than ``ttl``
+    seconds are treated as misses.
+    """
+
+    def __init__(self, max_entries: int = 32, ttl: float = 600.0, phash_tolerance: int = 0,
+                 path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.phash_tolerance = phash_tolerance
+        self.path = path
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return self.ttl > 0 and now - entry['created'] > self.ttl
+
+    def get(self, img: np.ndarray) -> Optional[Tuple[str, List]]:
+        """Cached (text, boxes) for ``img``, or None on a miss."""
+        if self.max_entries <= 0:
+            return None
+        key = exact_key(img)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self.phash_tolerance > 0:
+                entry = self._nearest(img, now)
+                if entry is not None:
+                    self.near_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(entry['key'])
+            return entry['text'], entry['boxes']
+
+    def _nearest(self, img: np.ndarray, now: float) -> Optional[dict]:
+        phash = perceptual_hash(img)
+        shape = list(img.shape)
+        best = None
+        best_distance = self.phash_tolerance + 1
+        for entry in self._entries.values():
+            # entries stored without a hash (tolerance was 0) can't be compared
+            if entry.get('phash') is None or entry['shape'] != shape or self._expired(entry, now):
+                continue
+            distance = bin(entry['phash'] ^ phash).count('1')
+            if distance < best_distance:
+                best = entry
+                best_distance = distance
+        return best
+
+    def put(self, img: np.ndarray, text: str, boxes: List) -> None:
+        if self.max_entries <= 0:
+            return
+        key = exact_key(img)
+        entry = {
+            'key': key,
+            'text': text,
+            'boxes': boxes,
+            'shape': list(img.shape),
+            'phash': perceptual_hash(img) if self.phash_tolerance > 0 else None,
+            'created': time.time(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'near_hits': self.near_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('entries', [])
+            now = time.time()
+            with self._lock:
+                for entry in entries[-self.max_entries:]:
+                    # older caches wrote 0 for "not hashed"
+                    if entry.get('phash') == 0:
+                        entry['phash'] = None
+                    if not self._expired(entry, now):
+                        self._entries[entry['key']] = entry
+            print(f"Loaded {len(self._entries)} OCR results from cache")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading OCR cache: {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        try:
+            with self._lock:
+                entries = list(self._entries.values())
+            # temp file + os.replace, so a crash mid-write keeps the old cache
+            tmp_path = f"{self.path}.tmp{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+            print(f"Saved {len(entries)} OCR results to cache")
+        except Exception as e:
+            print(f"Error saving OCR cache: {e}")
@@ -0,0 +1,36 @@
+def configure_threads(intra_op: int = 0, inter_op: int = 0) -> int:
+    """Set torch's CPU thread pools (0 keeps torch's default) and return
+    the intra-op thread count in effect."""
+    import torch
+
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            print("   Inter-op threads can only be set before torch starts parallel work, ignoring")
+    return torch.get_num_threads()
+
+
+def create_reader(quantize: bool = True, intra_op: int = 0, inter_op: int = 0, languages=('en',)):
+    """CPU easyocr.Reader with the requested precision and thread counts.
+
+    With ``quantize`` easyocr applies dynamic int8 quantization to the
+    recognizer's Linear/LSTM layers and to the detector on CPU; without it
+    both networks stay fp32.
+    """
+    configure_threads(intra_op, inter_op)
+    import easyocr
+    return easyocr.Reader(list(languages), gpu=False, quantize=quantize)
+
+
+def quantized_layer_count(module) -> int:
+    """How many submodules of a torch model are dynamically quantized."""
+    return sum(1 for m in module.modules() if '.quantized' in type(m).__module__)
+
+
+def describe_reader(reader) -> str:
+    recognizer = quantized_layer_count(reader.recognizer)
+    detector = quantized_layer_count(reader.detector)
+    return f"{recognizer} quantized recognizer layers, {detector} quantized detector layers"
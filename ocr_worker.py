@@ -0,0 +1,185 @@
+import itertools
+import multiprocessing as mp
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import List, Tuple
+
+import numpy as np
+
+
+class OCRWorkerError(Exception):
+    pass
+
+
+def _worker_main(requests, results, reader_options):
+    """Entry point of an OCR process: owns the easyocr.Reader and reads crops
+    straight out of shared memory. Only text and boxes are sent back."""
+    import warnings
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+    try:
+        from ocr_tuning import create_reader
+        reader = create_reader(**reader_options)
+    except Exception as e:
+        results.put(('error', None, str(e)))
+        return
+    results.put(('ready', None, None))
+
+    while True:
+        msg = requests.get()
+        if msg is None:
+            return
+        job_id, shm_name, shape, dtype = msg
+        shm = None
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            img = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            found = reader.readtext(img, detail=1, paragraph=True)
+            del img
+            text = ' '.join(t for _, t in found).strip()
+            boxes = [[[int(x), int(y)] for x, y in box] for box, _ in found]
+            results.put((job_id, text, boxes))
+        except Exception as e:
+            results.put((job_id, None, str(e)))
+        finally:
+            if shm is not None:
+                shm.close()
+
+
+class OCRWorker:
+    """One OCR process plus the shared-memory block used to hand it frames.
+
+    A crashed or hung process is killed and respawned on the next request;
+    nothing else in the parent (item catalog, indexes) is touched.
+    """
+
+    _job_ids = itertools.count(1)
+
+    def __init__(self, reader_options: dict = None, timeout: float = 30.0, start_timeout: float = 120.0):
+        # keyword arguments for ocr_tuning.create_reader in the child
+        self.reader_options = dict(reader_options or {})
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self._ctx = mp.get_context('spawn')
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._shm = None
+        self._lock = Lock()
+        self.restarts = 0
+
+    def start(self) -> None:
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(target=_worker_main, name="ocr-worker", daemon=True,
+                                          args=(self._requests, self._results, self.reader_options))
+        self._process.start()
+        try:
+            status, _, error = self._results.get(timeout=self.start_timeout)
+        except queue.Empty:
+            self._kill()
+            raise OCRWorkerError("OCR worker did not start in time")
+        if status != 'ready':
+            self._kill()
+            raise OCRWorkerError(f"OCR worker failed to start: {error}")
+
+    def _kill(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.join(timeout=5)
+            self._process = None
+
+    def restart(self) -> None:
+        print("   Restarting OCR worker...")
+        self._kill()
+        self.restarts += 1
+        self.start()
+
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _buffer(self, nbytes: int) -> shared_memory.SharedMemory:
+        # one block per worker, only replaced when a bigger crop shows up
+        if self._shm is None or self._shm.size < nbytes:
+            self._release_buffer()
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return self._shm
+
+    def _release_buffer(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def readtext(self, img: np.ndarray) -> Tuple[str, List]:
+        with self._lock:
+            if not self.alive():
+                self.restart()
+
+            shm = self._buffer(img.nbytes)
+            np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+
+            job_id = next(self._job_ids)
+            self._requests.put((job_id, shm.name, img.shape, img.dtype.str))
+
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    result_id, text, extra = self._results.get(timeout=max(0.05, min(remaining, 1.0)))
+                except queue.Empty:
+                    if not self.alive():
+                        self._kill()
+                        raise OCRWorkerError("OCR worker crashed")
+                    if remaining <= 0:
+                        self._kill()
+                        raise OCRWorkerError(f"OCR worker hung for more than {self.timeout:g}s")
+                    continue
+                if result_id != job_id:
+                    continue  # stale answer from before a timeout
+                if text is None:
+                    raise OCRWorkerError(extra)
+                return text, extra
+
+    def close(self) -> None:
+        with self._lock:
+            if self.alive():
+                self._requests.put(None)
+                self._process.join(timeout=5)
+            self._kill()
+            self._release_buffer()
+
+
+class OCRWorkerPool:
+    """N OCR processes; readtext_many spreads crops across them in parallel."""
+
+    def __init__(self, workers: int = 1, reader_options: dict = None, timeout: float = 30.0):
+        self.workers = [OCRWorker(reader_options, timeout) for _ in range(max(1, workers))]
+        self._idle = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.workers), thread_name_prefix="ocr-dispatch")
+
+    def __len__(self) -> int:
+        return len(self.workers)
+
+    def start(self) -> None:
+        # spawn them all at once, model loading dominates
+        list(self._executor.map(lambda worker: worker.start(), self.workers))
+        for worker in self.workers:
+            self._idle.put(worker)
+
+    def readtext(self, img: np.ndarray) -> Tuple[str, List]:
+        worker = self._idle.get()
+        try:
+            return worker.readtext(img)
+        finally:
+            self._idle.put(worker)
+
+    def readtext_many(self, imgs: List[np.ndarray]) -> List[Tuple[str, List]]:
+        return list(self._executor.map(self.readtext, imgs))
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.close()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,184 @@
+import queue
+from threading import Event, Thread
+
+import cv2
+import numpy as np
+
+from item_table import FAIR_MARGIN
+
+PANEL_W = 900
+PANEL_H = 400
+PANEL_MARGIN = 30
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def panel_origin(screen_width: int):
+    """Top-left corner of the panel on a screen of the given width."""
+    return screen_width - PANEL_W - PANEL_MARGIN, PANEL_MARGIN
+
+
+def verdict(diff: float, pct: float):
+    """Overlay status text and BGR color for a value difference."""
+    if abs(diff) < FAIR_MARGIN:
+        return "FAIR TRADE", (0, 255, 255)
+    elif diff > 0:
+        return f"WIN (+{int(diff):,} / +{pct:.1f}%)", (0, 255, 0)
+    else:
+        return f"LOSE ({int(diff):,} / {pct:.1f}%)", (0, 0, 255)
+
+
+class PanelRenderer:
+    """Draws the trade-analysis panel at panel size only.
+
+    The background, border and fixed labels are rendered once; each result
+    copies that chrome and adds the numbers. Blending with the screen
+    underneath is limited to the panel area, so the cost no longer depends
+    on the screen resolution.
+    """
+
+    def __init__(self):
+        self.chrome = self._render_chrome()
+
+    @staticmethod
+    def _render_chrome() -> np.ndarray:
+        panel = np.zeros((PANEL_H, PANEL_W, 3), dtype=np.uint8)
+        cv2.rectangle(panel, (0, 0), (PANEL_W, PANEL_H), (30, 30, 30), -1)
+        cv2.rectangle(panel, (0, 0), (PANEL_W, PANEL_H), (255, 255, 255), 3)
+
+        cv2.putText(panel, "TRADE ANALYSIS", (30, 50), FONT, 1.2, (255, 255, 255), 2)
+        cv2.putText(panel, "Your Offer:", (30, 110), FONT, 0.8, (200, 200, 200), 2)
+        cv2.putText(panel, "Their Offer:", (30, 190), FONT, 0.8, (200, 200, 200), 2)
+        cv2.putText(panel, "Base Value:", (30, 260), FONT, 0.7, (200, 200, 200), 1)
+        cv2.putText(panel, "Demand Adjusted:", (30, 340), FONT, 0.7, (200, 200, 200), 1)
+        return panel
+
+    def render(self, your_val, their_val, your_val_adj, their_val_adj, your_count, their_count,
+               backdrop: np.ndarray = None) -> np.ndarray:
+        """Finished panel; ``backdrop`` is the screen area the panel covers."""
+        panel = self.chrome.copy()
+
+        diff = their_val - your_val
+        pct = (diff / max(your_val, 1)) * 100 if your_val > 0 else 0
+        diff_adj = their_val_adj - your_val_adj
+        pct_adj = (diff_adj / max(your_val_adj, 1)) * 100 if your_val_adj > 0 else 0
+
+        cv2.putText(panel, f"{int(your_val):,}", (250, 110), FONT, 0.8, (100, 200, 255), 2)
+        cv2.putText(panel, f"Demand: {int(your_val_adj):,}", (550, 110), FONT, 0.7, (80, 180, 235), 2)
+        cv2.putText(panel, f"({your_count} items)", (30, 140), FONT, 0.5, (150, 150, 150), 1)
+
+        cv2.putText(panel, f"{int(their_val):,}", (250, 190), FONT, 0.8, (255, 200, 100), 2)
+        cv2.putText(panel, f"Demand: {int(their_val_adj):,}", (550, 190), FONT, 0.7, (235, 180, 80), 2)
+        cv2.putText(panel, f"({their_count} items)", (30, 220), FONT, 0.5, (150, 150, 150), 1)
+
+        cv2.line(panel, (30, 220), (PANEL_W - 30, 220), (100, 100, 100), 2)
+
+        status, color = verdict(diff, pct)
+        cv2.putText(panel, status, (30, 295), FONT, 1.0, color, 3)
+        status_adj, color_adj = verdict(diff_adj, pct_adj)
+        cv2.putText(panel, status_adj, (30, 375), FONT, 1.0, color_adj, 3)
+
+        if backdrop is not None and backdrop.shape == panel.shape:
+            cv2.addWeighted(panel, 0.85, backdrop, 0.15, 0, dst=panel)
+        return panel
+
+
+class OverlayWindow:
+    """A single topmost Tk window living on its own UI thread.
+
+    show() queues a new panel; the UI thread swaps it into the existing
+    label in place, so results appear without rebuilding Tk. The window
+    hides itself after ``display_seconds`` or on click / Escape.
+    """
+
+    def __init__(self, display_seconds: float = 15, poll_ms: int = 50):
+        self.display_seconds = display_seconds
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._started = Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = Thread(target=self._run, name="overlay-ui", daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5)
+
+    def show(self, panel_bgr: np.ndarray) -> None:
+        self.start()
+        self._queue.put(panel_bgr)
+
+    def close(self) -> None:
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _run(self) -> None:
+        try:
+            from PIL import Image, ImageTk
+            import tkinter as tk
+
+            root = tk.Tk()
+            root.overrideredirect(True)
+            root.attributes('-topmost', True)
+            root.attributes('-alpha', 0.9)  # Window transparency
+            root.configure(bg='black')
+            root.withdraw()
+
+            label = tk.Label(root, bg='black', borderwidth=0)
+            label.pack()
+        except Exception as e:
+            print(f"    Could not display overlay: {e}")
+            self._started.set()
+            return
+
+        hide_job = [None]
+
+        def hide(event=None):
+            if hide_job[0] is not None:
+                root.after_cancel(hide_job[0])
+                hide_job[0] = None
+            root.withdraw()
+
+        def update(panel_bgr):
+            img_pil = Image.fromarray(cv2.cvtColor(panel_bgr, cv2.COLOR_BGR2RGB)).convert('RGBA')
+            img_pil.putalpha(220)  # 220/255 = ~86% opacity
+
+            photo = ImageTk.PhotoImage(img_pil)
+            label.configure(image=photo)
+            label.image = photo
+
+            h, w = panel_bgr.shape[:2]
+            x_pos = root.winfo_screenwidth() - w - PANEL_MARGIN
+            root.geometry(f'{w}x{h}+{x_pos}+{PANEL_MARGIN}')
+            root.deiconify()
+            root.lift()
+
+            if hide_job[0] is not None:
+                root.after_cancel(hide_job[0])
+            hide_job[0] = root.after(int(self.display_seconds * 1000), hide)
+
+        def poll():
+            latest = False
+            try:
+                while True:
+                    latest = self._queue.get_nowait()
+                    if latest is None:
+                        root.destroy()
+                        return
+            except queue.Empty:
+                pass
+            if latest is not False:
+                try:
+                    update(latest)
+                except Exception as e:
+                    print(f"    Could not display overlay: {e}")
+            root.after(self.poll_ms, poll)
+
+        root.bind('<Button-1>', hide)
+        root.bind('<Escape>', hide)
+        root.after(self.poll_ms, poll)
+        self._started.set()
+        root.mainloop()
@@ -0,0 +1,407 @@
+import glob
+import math
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from catalog_store import NO_INT
+
+MAGIC = b'CBHIST\x00\x00'
+VERSION = 1
+
+# magic, version, items, records, reserved, first and last timestamp (unix time)
+HEADER = struct.Struct('<8sIIIIdd')
+FIELDS = ('base_value', 'dg_value', 'ck_value', 'upg_value')
+# one appended point in the tail log: item id, timestamp, FIELDS (NaN = missing), demand
+RECORD = struct.Struct('<Id4di')
+
+NAMES_FILE = 'names.txt'
+TAIL_FILE = 'tail.bin'
+# tail records folded into a sorted segment at a time
+COMPACT_EVERY = 4096
+
+# (base, dg, ck, upg, demand), None where the item has no value
+Point = Tuple[Optional[float], Optional[float], Optional[float], Optional[float], Optional[int]]
+
+# demand stored for an item that left the value list; no real demand is this low
+REMOVED_DEMAND = NO_INT + 1
+# the point appended when an item is removed
+TOMBSTONE: Point = (None, None, None, None, REMOVED_DEMAND)
+
+
+def history_path(json_path: str) -> str:
+    """item_values_cache.json -> item_values_cache.history/"""
+    return os.path.splitext(json_path)[0] + '.history'
+
+
+def item_point(item: Mapping) -> Point:
+    values = tuple(None if item.get(field) is None else float(item[field]) for field in FIELDS)
+    demand = item.get('demand')
+    return values + (None if demand is None else int(demand),)
+
+
+def point_dict(point: Point) -> Dict:
+    if point == TOMBSTONE:
+        return {'removed': True}
+    data = {field: value for field, value in zip(FIELDS, point) if value is not None}
+    if point[4] is not None:
+        data['demand'] = point[4]
+    return data
+
+
+def _pack_values(point: Point) -> tuple:
+    return tuple(math.nan if value is None else value for value in point[:4]) + \
+        (NO_INT if point[4] is None else point[4],)
+
+
+def _layout(items: int, records: int) -> Dict[str, Tuple[int, int]]:
+    """(offset, length in bytes) of every section after the header; the
+    8-byte columns come first so every column stays aligned."""
+    sections = {}
+    offset = HEADER.size
+    for field in ('time',) + FIELDS:
+        sections[field] = (offset, records * 8)
+        offset += records * 8
+    sections['demand'] = (offset, records * 4)
+    offset += records * 4
+    sections['item_ids'] = (offset, items * 4)
+    offset += items * 4
+    sections['offsets'] = (offset, (items + 1) * 4)
+    return sections
+
+
+def write_segment(path: str, records: List[Tuple[int, float, Point]]) -> None:
+    """Write tail records as one segment: sorted by item, then time, with
+    a per-item offset table. Atomic like write_catalog."""
+    records = sorted(records, key=lambda record: (record[0], record[1]))
+    item_ids = []
+    offsets = []
+    for row, (item_id, _, _) in enumerate(records):
+        if not item_ids or item_ids[-1] != item_id:
+            item_ids.append(item_id)
+            offsets.append(row)
+    offsets.append(len(records))
+
+    rows = len(records)
+    columns = list(zip(*(_pack_values(point) for _, _, point in records)))
+    times = [stamp for _, stamp, _ in records]
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(item_ids), rows, 0, min(times), max(times)))
+            f.write(struct.pack(f'<{rows}d', *times))
+            for column in columns[:4]:
+                f.write(struct.pack(f'<{rows}d', *column))
+            f.write(struct.pack(f'<{rows}i', *columns[4]))
+            f.write(struct.pack(f'<{len(item_ids)}I', *item_ids))
+            f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Segment:
+    """Memory-mapped, read-only history segment. An item's points are
+    ``rows(item_id)``, in time order, so range lookups are two bisects."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, items, records, _, self.first, self.last = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} history segment")
+        self.records = records
+
+        self._view = memoryview(self._mm)
+        self.columns = {}
+        for name, (offset, length) in _layout(items, records).items():
+            fmt = 'd' if name == 'time' or name in FIELDS else ('i' if name == 'demand' else 'I')
+            self.columns[name] = self._view[offset:offset + length].cast(fmt)
+        self.time = self.columns['time']
+        self.item_ids = self.columns['item_ids']
+        self.offsets = self.columns['offsets']
+
+    def rows(self, item_id: int) -> range:
+        idx = bisect_left(self.item_ids, item_id)
+        if idx < len(self.item_ids) and self.item_ids[idx] == item_id:
+            return range(self.offsets[idx], self.offsets[idx + 1])
+        return range(0)
+
+    def value(self, row: int, field: str) -> Optional[float]:
+        value = self.columns[field][row]
+        if field == 'demand':
+            return None if value == NO_INT else value
+        return None if math.isnan(value) else value
+
+    def point(self, row: int) -> Point:
+        return tuple(self.value(row, field) for field in FIELDS + ('demand',))
+
+    def removed(self, row: int) -> bool:
+        return self.columns['demand'][row] == REMOVED_DEMAND
+
+    def close(self) -> None:
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self._view.release()
+        self._mm.close()
+
+
+class PriceHistory:
+    """Append-only value history of the catalog, one directory on disk:
+
+    - names.txt: item names, the line number is the item id
+    - tail.bin: fixed-size records appended by every refresh
+    - seg-NNNNNN.bin: compacted tails, columnar and sorted per item
+
+    Only points that differ from the item's previous point are appended,
+    so a refresh that changes 3 values costs 3 records. An item that drops
+    off the value list gets a TOMBSTONE point, so it stops counting as
+    current (series ends with ``{'removed': True}``, movers skip it).
+    """
+
+    def __init__(self, directory: str, compact_every: int = COMPACT_EVERY):
+        self.directory = directory
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+
+        self.names: List[str] = []
+        try:
+            with open(self._path(NAMES_FILE), 'r', encoding='utf-8') as f:
+                self.names = f.read().splitlines()
+        except FileNotFoundError:
+            pass
+        self.ids = {name: item_id for item_id, name in enumerate(self.names)}
+
+        self.segments = [Segment(path) for path in sorted(glob.glob(self._path('seg-*.bin')))]
+        self._tail = self._read_tail()
+        self._latest = self._load_latest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_tail(self) -> List[Tuple[int, float, Point]]:
+        try:
+            with open(self._path(TAIL_FILE), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        compacted = self.segments[-1].last if self.segments else -math.inf
+        records = []
+        # a torn final write leaves a partial record, which is dropped
+        for item_id, stamp, *values in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+            # already in a segment if compaction stopped before truncating the tail
+            if stamp <= compacted:
+                continue
+            point = tuple(None if math.isnan(v) else v for v in values[:4]) + \
+                (None if values[4] == NO_INT else values[4],)
+            records.append((item_id, stamp, point))
+        return records
+
+    def _load_latest(self) -> Dict[int, Tuple[float, Point]]:
+        """Newest (timestamp, point) of every item, for deduplication."""
+        latest = {}
+        for segment in self.segments:
+            for idx, item_id in enumerate(segment.item_ids):
+                row = segment.offsets[idx + 1] - 1
+                latest[item_id] = (segment.time[row], segment.point(row))
+        for item_id, stamp, point in self._tail:
+            latest[item_id] = (stamp, point)
+        return latest
+
+    @property
+    def last_timestamp(self) -> float:
+        if self._tail:
+            return self._tail[-1][1]
+        return self.segments[-1].last if self.segments else -math.inf
+
+    def record(self, items: Mapping[str, Mapping], when: Optional[datetime] = None) -> int:
+        """Append the points of ``items`` (the whole catalog) that changed
+        since their last point, and a TOMBSTONE for every item whose last
+        point is live but that ``items`` no longer has; returns how many
+        records were appended."""
+        # keep the log in time order even if the clock stepped back
+        stamp = max((when or datetime.now()).timestamp(), self.last_timestamp + 1e-6)
+        new_names = []
+        records = []
+        for name, item in items.items():
+            point = item_point(item)
+            item_id = self.ids.get(name)
+            if item_id is None:
+                item_id = self.ids[name] = len(self.names)
+                self.names.append(name)
+                new_names.append(name)
+            elif item_id in self._latest and self._latest[item_id][1] == point:
+                continue
+            records.append((item_id, stamp, point))
+        for item_id, (_, point) in self._latest.items():
+            if point != TOMBSTONE and self.names[item_id] not in items:
+                records.append((item_id, stamp, TOMBSTONE))
+
+        # names before records, so every stored id resolves
+        if new_names:
+            with open(self._path(NAMES_FILE), 'a', encoding='utf-8') as f:
+                f.write(''.join(name + '\n' for name in new_names))
+        if records:
+            with open(self._path(TAIL_FILE), 'ab') as f:
+                f.write(b''.join(RECORD.pack(item_id, stamp, *_pack_values(point))
+                                 for item_id, stamp, point in records))
+                f.flush()
+                os.fsync(f.fileno())
+            self._tail.extend(records)
+            for item_id, stamp, point in records:
+                self._latest[item_id] = (stamp, point)
+
+        if len(self._tail) >= self.compact_every:
+            self.compact()
+        return len(records)
+
+    def compact(self) -> None:
+        """Fold the tail into a new segment and empty it."""
+        if not self._tail:
+            return
+        path = self._path(f"seg-{len(self.segments) + 1:06d}.bin")
+        write_segment(path, self._tail)
+        self.segments.append(Segment(path))
+        with open(self._path(TAIL_FILE), 'wb'):
+            pass
+        self._tail = []
+
+    def series(self, name: str, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> List[Tuple[datetime, Dict]]:
+        """(time, values) points of one item between ``start`` and ``end``."""
+        item_id = self.ids.get(name)
+        if item_id is None:
+            return []
+        lo = start.timestamp() if start else -math.inf
+        hi = end.timestamp() if end else math.inf
+
+        points = []
+        for segment in self.segments:
+            if segment.last < lo or segment.first > hi:
+                continue
+            rows = segment.rows(item_id)
+            first = bisect_left(segment.time, lo, rows.start, rows.stop)
+            last = bisect_right(segment.time, hi, rows.start, rows.stop)
+            points.extend((segment.time[row], segment.point(row)) for row in range(first, last))
+        points.extend((stamp, point) for record_id, stamp, point in self._tail
+                      if record_id == item_id and lo <= stamp <= hi)
+        return [(datetime.fromtimestamp(stamp), point_dict(point)) for stamp, point in points]
+
+    def top_movers(self, since: datetime, field: str = 'base_value', limit: int = 10,
+                   by: str = 'pct') -> List[Dict]:
+        """Items whose ``field`` moved the most between ``since`` and now,
+        ranked by absolute percentage (``by='pct'``) or absolute change.
+
+        Only items with a point after ``since`` are looked up further back,
+        and old segments are only bisected for those.
+        """
+        cutoff = since.timestamp()
+        slot = (FIELDS + ('demand',)).index(field)
+
+        latest = {}
+        for segment in self.segments:
+            if segment.last <= cutoff:
+                continue
+            for idx, item_id in enumerate(segment.item_ids):
+                row = segment.offsets[idx + 1] - 1
+                if segment.time[row] > cutoff:
+                    # a removed item has no current value
+                    latest[item_id] = None if segment.removed(row) else segment.value(row, field)
+        for item_id, stamp, point in self._tail:
+            if stamp > cutoff:
+                latest[item_id] = None if point == TOMBSTONE else point[slot]
+
+        # value each of those items had at the cutoff, newest data first
+        baseline = {}
+        for item_id, stamp, point in reversed(self._tail):
+            if stamp <= cutoff and item_id in latest and item_id not in baseline:
+                baseline[item_id] = None if point == TOMBSTONE else point[slot]
+        for segment in reversed(self.segments):
+            if len(baseline) == len(latest):
+                break
+            if segment.first > cutoff:
+                continue
+            for item_id in latest.keys() - baseline.keys():
+                rows = segment.rows(item_id)
+                split = bisect_right(segment.time, cutoff, rows.start, rows.stop)
+                if split > rows.start:
+                    baseline[item_id] = None if segment.removed(split - 1) else segment.value(split - 1, field)
+
+        movers = []
+        for item_id, new in latest.items():
+            old = baseline.get(item_id)
+            if old is None or new is None or new == old:
+                continue
+            change = new - old
+            pct = change / old * 100 if old else math.inf
+            movers.append({'name': self.names[item_id], 'old': old, 'new': new, 'change': change, 'pct': pct})
+        key = (lambda m: abs(m['pct'])) if by == 'pct' else (lambda m: abs(m['change']))
+        movers.sort(key=key, reverse=True)
+        return movers[:limit]
+
+    def stats(self) -> Dict:
+        files = glob.glob(self._path('*'))
+        return {
+            'items': len(self.names),
+            'points': sum(segment.records for segment in self.segments) + len(self._tail),
+            'segments': len(self.segments),
+            'tail': len(self._tail),
+            'bytes': sum(os.path.getsize(path) for path in files),
+        }
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import timedelta
+
+    parser = argparse.ArgumentParser(description="Query the value history recorded by doc-scrape.py")
+    parser.add_argument('--history', default=history_path('item_values_cache.json'))
+    commands = parser.add_subparsers(dest='command', required=True)
+    series_cmd = commands.add_parser('series', help="value points of one item")
+    series_cmd.add_argument('name')
+    series_cmd.add_argument('--days', type=float, help="only the last N days")
+    movers_cmd = commands.add_parser('movers', help="items whose value moved the most")
+    movers_cmd.add_argument('--days', type=float, default=7.0, help="compare against N days ago (default: 7)")
+    movers_cmd.add_argument('--field', choices=FIELDS + ('demand',), default='base_value')
+    movers_cmd.add_argument('--by', choices=('pct', 'change'), default='pct')
+    movers_cmd.add_argument('--limit', type=int, default=20)
+    commands.add_parser('stats', help="size of the history")
+    commands.add_parser('compact', help="fold the tail log into a segment")
+    args = parser.parse_args()
+
+    history = PriceHistory(args.history)
+    if args.command == 'series':
+        start = datetime.now() - timedelta(days=args.days) if args.days else None
+        for when, values in history.series(args.name, start=start):
+            if values.get('removed'):
+                print(f"{when:%Y-%m-%d %H:%M}  removed from the value list")
+                continue
+            print(f"{when:%Y-%m-%d %H:%M}  " + "  ".join(f"{k}={v:,.0f}" for k, v in values.items()))
+    elif args.command == 'movers':
+        since = datetime.now() - timedelta(days=args.days)
+        for mover in history.top_movers(since, field=args.field, limit=args.limit, by=args.by):
+            print(f"{mover['name']:<40} {mover['old']:>12,.0f} -> {mover['new']:>12,.0f}  "
+                  f"{mover['change']:>+12,.0f} ({mover['pct']:+.1f}%)")
+    elif args.command == 'stats':
+        stats = history.stats()
+        print(f"{stats['items']} items, {stats['points']} points in {stats['segments']} segment(s) "
+              f"+ {stats['tail']} tail records, {stats['bytes']/1024:.1f} KB")
+    else:
+        history.compact()
+        print(f"Compacted into {len(history.segments)} segment(s)")
+    history.close()
@@ -0,0 +1,105 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+from collections import Counter
+
+import cv2
+
+from auto_trade_helper import TradeHelper
+
+SCREEN_SIZE = (1920, 1080)
+
+
+def load_crops(crop_dir):
+    """(name, RGB image, expected item names) for every labeled crop.
+
+    Each ``<crop>.png`` needs a ``<crop>.json`` next to it holding
+    {"items": ["AK-47 Ace", ...]}.
+    """
+    crops = []
+    for path in sorted(glob.glob(os.path.join(crop_dir, '*.png'))):
+        label_path = os.path.splitext(path)[0] + '.json'
+        if not os.path.exists(label_path):
+            print(f"  Skipping {os.path.basename(path)} (no label file)")
+            continue
+        with open(label_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f).get('items', [])
+        img = cv2.imread(path)
+        if img is None:
+            print(f"  Skipping unreadable {os.path.basename(path)}")
+            continue
+        crops.append((os.path.basename(path), cv2.cvtColor(img, cv2.COLOR_BGR2RGB), expected))
+    return crops
+
+
+def evaluate(helper, crops, repeat):
+    latencies = []
+    true_pos = false_pos = false_neg = exact = 0
+    for _, img, expected in crops:
+        text = ""
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = helper.extract_text(img)
+            latencies.append(time.perf_counter() - start)
+
+        found = Counter(item['name'] for item in helper.parse_text_for_items(text))
+        wanted = Counter(expected)
+        hits = sum((found & wanted).values())
+        true_pos += hits
+        false_pos += sum(found.values()) - hits
+        false_neg += sum(wanted.values()) - hits
+        exact += found == wanted
+
+    latencies.sort()
+    return {
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        'match_rate': true_pos / max(true_pos + false_neg, 1),
+        'precision': true_pos / max(true_pos + false_pos, 1),
+        'exact_crops': exact,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 OCR speed and item-match rate on labeled crops")
+    parser.add_argument('crops', help="directory of <crop>.png + <crop>.json label files")
+    parser.add_argument('--cache', default='item_values_cache.json')
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads, 0 = torch default")
+    parser.add_argument('--repeat', type=int, default=3, help="timed OCR runs per crop")
+    args = parser.parse_args()
+
+    crops = load_crops(args.crops)
+    if not crops:
+        print("No labeled crops found")
+        return
+
+    results = {}
+    for precision in ('fp32', 'int8'):
+        helper = TradeHelper(screen_size=SCREEN_SIZE, cache_file=args.cache, ocr_cache_size=0,
+                             debug_level='off', ocr_quantize=precision == 'int8', ocr_threads=args.threads)
+        try:
+            helper.ocr_ready.wait()
+            results[precision] = evaluate(helper, crops, args.repeat)
+        finally:
+            helper.close()
+
+    print("\n" + "="*70)
+    print(f"QUANTIZATION CHECK ({len(crops)} crops, {args.repeat} runs each)")
+    print("="*70)
+    print(f"   {'':<10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'match':>8} {'prec':>8} {'exact':>7}")
+    for precision, r in results.items():
+        print(f"   {precision:<10} {r['mean_ms']:>10.1f} {r['p50_ms']:>10.1f} {r['p95_ms']:>10.1f} "
+              f"{r['match_rate']:>8.1%} {r['precision']:>8.1%} {r['exact_crops']:>7}")
+    fp32, int8 = results['fp32'], results['int8']
+    print("─"*70)
+    print(f"   speedup: {fp32['mean_ms'] / max(int8['mean_ms'], 1e-9):.2f}x, "
+          f"match-rate change: {(int8['match_rate'] - fp32['match_rate']) * 100:+.1f} pts")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
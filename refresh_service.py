@@ -0,0 +1,156 @@
+import importlib.util
+import itertools
+import os
+import time
+import traceback
+from datetime import datetime
+from threading import Event, Thread
+from typing import Callable, Dict, Optional
+
+from item_matcher import ItemMatcher
+from item_table import ItemTable
+
+
+class CatalogSnapshot:
+    """One immutable generation of the catalog: the items plus every index
+    derived from them. Built completely before anyone can see it, then
+    published by swapping a single reference."""
+
+    _versions = itertools.count(1)
+
+    def __init__(self, items: Dict[str, Dict], last_update: Optional[datetime] = None,
+                 matcher: Optional[ItemMatcher] = None, table: Optional[ItemTable] = None):
+        self.version = next(self._versions)
+        self.items = items
+        self.matcher = matcher or ItemMatcher(items)
+        self.table = table or ItemTable.from_items(items)
+        self.last_update = last_update
+        self.loaded_at = datetime.now()
+
+    def patched(self, items: Dict[str, Dict], delta, last_update: Optional[datetime] = None) -> 'CatalogSnapshot':
+        """The next snapshot after ``delta`` (a ValueDelta) turned this one's
+        items into ``items``.
+
+        When only values of existing items changed, the name indexes
+        (trigram postings, automaton, row order) are shared and just the
+        changed rows are rewritten. Added or removed names shift rows and
+        the automaton can't drop a pattern, so those rebuild everything.
+        """
+        if (delta.added or delta.removed or len(items) != len(self.table)
+                or any(name not in self.table.index for name in delta.changed)):
+            return CatalogSnapshot(items, last_update)
+        changed = {name: new for name, (_, new) in delta.changed.items()}
+        return CatalogSnapshot(items, last_update, matcher=self.matcher.with_items(items),
+                               table=self.table.with_changes(changed))
+
+    def age(self) -> float:
+        """Seconds since the value list behind this snapshot was fetched."""
+        stamp = self.last_update or self.loaded_at
+        return (datetime.now() - stamp).total_seconds()
+
+
+def load_fetcher_class():
+    # doc-scrape.py has a hyphen in its name, so it can't be imported normally
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'doc-scrape.py')
+    spec = importlib.util.spec_from_file_location('doc_scrape', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ValueListFetcher
+
+
+def format_age(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
+
+
+class RefreshService:
+    """Runs ValueListFetcher.fetch_values on its refresh interval in the
+    background and hands every changed catalog to ``publish`` as a fully
+    built CatalogSnapshot. ``publish`` returns how long the swap took.
+    ``current`` returns the published snapshot; new snapshots are patched
+    from it, and an unchanged fetch refreshes its last_update."""
+
+    def __init__(self, fetcher, publish: Callable[[CatalogSnapshot], float],
+                 interval: Optional[float] = None, retry_interval: float = 60.0,
+                 current: Optional[Callable[[], Optional[CatalogSnapshot]]] = None):
+        self.fetcher = fetcher
+        self.publish = publish
+        self.current = current or (lambda: None)
+        self.interval = interval or fetcher.refresh_interval
+        self.retry_interval = min(retry_interval, self.interval)
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="catalog-refresh", daemon=True)
+
+        self.counts = {'refreshes': 0, 'swaps': 0, 'patched': 0, 'unchanged': 0, 'failed': 0}
+        self.last_build_ms = 0.0
+        self.last_swap_us = 0.0
+        self.total_swap_us = 0.0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+
+    def _first_delay(self) -> float:
+        # a cache that's already stale refreshes right away
+        age = self.fetcher.get_cache_age()
+        if age is None:
+            return 0.0
+        return max(0.0, self.interval - age.total_seconds())
+
+    def _run(self) -> None:
+        delay = self._first_delay()
+        while not self._stop.wait(delay):
+            try:
+                ok = self.refresh_once()
+            except Exception as e:
+                print(f"\n   Catalog refresh error: {e}")
+                traceback.print_exc()
+                ok = False
+            delay = self.interval if ok else self.retry_interval
+
+    def refresh_once(self) -> bool:
+        """Fetch now; returns False only when the fetch failed."""
+        self.counts['refreshes'] += 1
+        if not self.fetcher.fetch_values(force_refresh=True):
+            self.counts['failed'] += 1
+            return False
+        current = self.current()
+        if self.fetcher.last_fetch.get('unchanged') or not self.fetcher.last_delta:
+            self.counts['unchanged'] += 1
+            # the values were just confirmed current, so the live snapshot isn't stale
+            if current is not None:
+                current.last_update = self.fetcher.last_update
+            return True
+
+        build_start = time.perf_counter()
+        # the fetcher updates values_cache in place, so the snapshot gets its own dict
+        items = dict(self.fetcher.values_cache)
+        if current is None:
+            snapshot = CatalogSnapshot(items, self.fetcher.last_update)
+        else:
+            snapshot = current.patched(items, self.fetcher.last_delta, self.fetcher.last_update)
+            if snapshot.matcher.postings is current.matcher.postings:
+                self.counts['patched'] += 1
+        self.last_build_ms = (time.perf_counter() - build_start) * 1000
+
+        swap_seconds = self.publish(snapshot)
+        self.last_swap_us = swap_seconds * 1e6
+        self.total_swap_us += self.last_swap_us
+        self.counts['swaps'] += 1
+        print(f"\n Catalog v{snapshot.version}: {self.fetcher.last_delta.summary()}, "
+              f"{len(snapshot.items)} items, built in {self.last_build_ms:.1f} ms, "
+              f"swapped in {self.last_swap_us:.1f} us")
+        return True
+
+    def stats(self) -> dict:
+        swaps = self.counts['swaps']
+        return dict(self.counts,
+                    last_build_ms=self.last_build_ms,
+                    last_swap_us=self.last_swap_us,
+                    avg_swap_us=self.total_swap_us / swaps if swaps else 0.0)
@@ -0,0 +1,211 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class Frame:
+    """A single BGRA screen grab, viewed in place as a NumPy array.
+
+    Regions are slices of the same buffer, so every crop comes from the
+    same instant and nothing is copied until a stage converts the pixels
+    it actually needs.
+    """
+
+    def __init__(self, bgra: np.ndarray, timestamp: float = None, left: int = 0, top: int = 0):
+        self.bgra = bgra
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        # monitor-relative position of the grabbed area
+        self.left = left
+        self.top = top
+
+    @property
+    def width(self) -> int:
+        return self.bgra.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.bgra.shape[0]
+
+    def region(self, x: int, y: int, w: int, h: int) -> np.ndarray:
+        """BGRA view of a monitor-relative rectangle (no copy)."""
+        x -= self.left
+        y -= self.top
+        return self.bgra[y:y + h, x:x + w]
+
+    def contains(self, x: int, y: int, w: int, h: int) -> bool:
+        return (x >= self.left and y >= self.top
+                and x + w <= self.left + self.width and y + h <= self.top + self.height)
+
+    def region_rgb(self, x: int, y: int, w: int, h: int) -> np.ndarray:
+        return cv2.cvtColor(self.region(x, y, w, h), cv2.COLOR_BGRA2RGB)
+
+    def region_bgr(self, x: int, y: int, w: int, h: int) -> np.ndarray:
+        return cv2.cvtColor(self.region(x, y, w, h), cv2.COLOR_BGRA2BGR)
+
+    def bgr(self, width: int = None, height: int = None) -> np.ndarray:
+        """BGR copy of the frame.
+
+        When the grab only covers part of the monitor (ROI capture), pass the
+        monitor size to get it placed on a black canvas of that size.
+        """
+        bgr = cv2.cvtColor(self.bgra, cv2.COLOR_BGRA2BGR)
+        if width is None or height is None or (self.left, self.top, self.width, self.height) == (0, 0, width, height):
+            return bgr
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        canvas[self.top:self.top + self.height, self.left:self.left + self.width] = bgr
+        return canvas
+
+
+def bgra_view(screenshot) -> np.ndarray:
+    """Wrap an mss ScreenShot's raw buffer without copying it."""
+    return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+
+
+def bounding_area(monitor, rois=None):
+    """mss grab area covering ``rois`` and its monitor-relative origin.
+
+    With no rois this is the whole monitor.
+    """
+    if not rois:
+        return dict(monitor), (0, 0)
+    x0 = min(x for x, _, _, _ in rois)
+    y0 = min(y for _, y, _, _ in rois)
+    x1 = max(x + w for x, _, w, _ in rois)
+    y1 = max(y + h for _, y, _, h in rois)
+    area = {'left': monitor['left'] + x0, 'top': monitor['top'] + y0,
+            'width': x1 - x0, 'height': y1 - y0}
+    return area, (x0, y0)
+
+
+def grab_frame(sct, monitor, rois=None) -> Frame:
+    area, origin = bounding_area(monitor, rois)
+    screenshot = sct.grab(area)
+    return Frame(bgra_view(screenshot), None, *origin)
+
+
+class FrameLease:
+    """Pins a ring-buffer slot so the capture thread won't overwrite it.
+
+    Use as a context manager; the Frame is only valid inside the block.
+    """
+
+    def __init__(self, service, slot: int, frame: Frame):
+        self.service = service
+        self.slot = slot
+        self.frame = frame
+
+    def __enter__(self) -> Frame:
+        return self.frame
+
+    def __exit__(self, *exc):
+        self.service._release(self.slot)
+        return False
+
+
+class CaptureService:
+    """Keeps one mss handle open on a background thread and grabs frames
+    into a small preallocated ring buffer at a fixed rate.
+
+    ``rois`` limits each grab to the bounding box of the given
+    monitor-relative (x, y, w, h) rectangles; None grabs the full monitor.
+    """
+
+    def __init__(self, rois=None, fps: float = 10.0, slots: int = 3, monitor_index: int = 1):
+        self.rois = rois
+        self.interval = 1.0 / max(fps, 0.1)
+        self.slot_count = max(slots, 2)
+        self.monitor_index = monitor_index
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._pins = [0] * self.slot_count
+        self._stamps = [0.0] * self.slot_count
+        self._newest = -1
+        self._buffers = None
+        self._origin = (0, 0)
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.frames_grabbed = 0
+        self.grab_seconds = 0.0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _next_slot(self) -> int:
+        with self._changed:
+            while not self._stop.is_set():
+                for step in range(1, self.slot_count + 1):
+                    slot = (self._newest + step) % self.slot_count
+                    if slot != self._newest and not self._pins[slot]:
+                        return slot
+                self._changed.wait(0.1)
+        return -1
+
+    def _run(self) -> None:
+        import mss
+        with mss.mss() as sct:
+            area, self._origin = bounding_area(sct.monitors[self.monitor_index], self.rois)
+            self._buffers = np.empty((self.slot_count, area['height'], area['width'], 4), dtype=np.uint8)
+
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                slot = self._next_slot()
+                if slot < 0:
+                    break
+                try:
+                    screenshot = sct.grab(area)
+                    np.copyto(self._buffers[slot], bgra_view(screenshot))
+                except Exception as e:
+                    print(f"   Capture Error: {e}")
+                    self._stop.wait(self.interval)
+                    continue
+
+                with self._changed:
+                    self._stamps[slot] = time.time()
+                    self._newest = slot
+                    self._changed.notify_all()
+
+                elapsed = time.perf_counter() - started
+                self.frames_grabbed += 1
+                self.grab_seconds += elapsed
+                self._stop.wait(max(0.0, self.interval - elapsed))
+
+    def latest(self, timeout: float = 1.0):
+        """Lease the newest frame, waiting up to ``timeout`` for the first one.
+
+        Returns None when no frame is available.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._newest < 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return None
+                self._changed.wait(remaining)
+            slot = self._newest
+            self._pins[slot] += 1
+            frame = Frame(self._buffers[slot], self._stamps[slot], *self._origin)
+        return FrameLease(self, slot, frame)
+
+    def _release(self, slot: int) -> None:
+        with self._changed:
+            self._pins[slot] -= 1
+            self._changed.notify_all()
+
+    def average_grab_ms(self) -> float:
+        return self.grab_seconds / self.frames_grabbed * 1000 if self.frames_grabbed else 0.0
@@ -0,0 +1,118 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from item_matcher import trigrams
+
+# completions offered per Tab
+DEFAULT_LIMIT = 10
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokens(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def compact(text: str) -> str:
+    """'AK-47 Ace' -> 'ak47ace', so 'ak47' finds it too"""
+    return ''.join(tokens(text))
+
+
+class SearchIndex:
+    """Ranked search over item names for typed (not OCR'd) queries.
+
+    Results come in tiers: exact name, name prefix, every query word a
+    prefix of some name word ("ak ace" -> "AK-47 Ace"), then plain
+    substring. Inside a tier shorter names rank first, then alphabetical,
+    so the same query always gives the same answer.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(names)
+        self.lowered: List[str] = [name.lower() for name in self.names]
+        self.exact: Dict[str, int] = {}
+        for row, lowered in enumerate(self.lowered):
+            self.exact.setdefault(lowered, row)
+        self.rank_key: List[Tuple[int, str]] = [(len(lowered), lowered) for lowered in self.lowered]
+
+        # whole names (lowered and compacted) and single words, each sorted
+        # so a prefix is one contiguous bisect range
+        keys = set()
+        words = set()
+        for row, lowered in enumerate(self.lowered):
+            keys.add((lowered, row))
+            keys.add((compact(lowered), row))
+            for word in tokens(lowered):
+                words.add((word, row))
+        self.keys: List[Tuple[str, int]] = sorted(keys)
+        self.words: List[Tuple[str, int]] = sorted(words)
+
+        postings = defaultdict(list)
+        for row, lowered in enumerate(self.lowered):
+            for gram in trigrams(lowered):
+                postings[gram].append(row)
+        self.postings: Dict[str, List[int]] = dict(postings)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _prefix_rows(entries: List[Tuple[str, int]], prefix: str) -> Set[int]:
+        lo = bisect_left(entries, (prefix, -1))
+        hi = bisect_left(entries, (prefix + '\uffff', -1), lo)
+        return {row for _, row in entries[lo:hi]}
+
+    def _word_prefix_rows(self, query_words: List[str]) -> Set[int]:
+        rows = None
+        # longest word first: it has the fewest matches to intersect with
+        for word in sorted(query_words, key=len, reverse=True):
+            matches = self._prefix_rows(self.words, word)
+            rows = matches if rows is None else rows & matches
+            if not rows:
+                break
+        return rows or set()
+
+    def _substring_rows(self, query: str) -> Set[int]:
+        grams = sorted(trigrams(query), key=lambda gram: len(self.postings.get(gram, ())))
+        if not grams:
+            # too short for trigrams; only reached when no word starts with it
+            return {row for row, lowered in enumerate(self.lowered) if query in lowered}
+        rows = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not rows:
+                break
+            rows.intersection_update(self.postings.get(gram, ()))
+        return {row for row in rows if query in self.lowered[row]}
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        """Up to ``limit`` names matching ``query``, best first."""
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        ranked = []
+        seen = set()
+
+        def take(rows):
+            for row in heapq.nsmallest(limit - len(ranked), rows - seen, key=self.rank_key.__getitem__):
+                seen.add(row)
+                ranked.append(row)
+
+        tiers = (
+            lambda: {self.exact[query]} if query in self.exact else set(),
+            lambda: self._prefix_rows(self.keys, query) | self._prefix_rows(self.keys, compact(query) or query),
+            lambda: self._word_prefix_rows(tokens(query)),
+            lambda: self._substring_rows(query),
+        )
+        for tier in tiers:
+            if len(ranked) >= limit:
+                break
+            take(tier())
+        return [self.names[row] for row in ranked[:limit]]
+
+    def best(self, query: str) -> Optional[str]:
+        matches = self.search(query, limit=1)
+        return matches[0] if matches else None
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from collections import deque
+from threading import Lock, current_thread, get_ident, local
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'args', 'start_ns', 'depth')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+        self.depth = 0
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.depth = len(stack)
+        stack.append(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record(self, end_ns)
+        return False
+
+    def set(self, **args) -> None:
+        """Attach extra arguments (counts, sizes, scores) to the span."""
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects nested, per-thread timing spans.
+
+    Disabled, span() returns one shared no-op object, so instrumented code
+    pays a function call and an attribute check. Enabled, finished spans go
+    into a bounded ring so a long session keeps only the most recent ones.
+    """
+
+    def __init__(self, max_events: int = 100000):
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        self._local = local()
+        self._lock = Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span: Span, end_ns: int) -> None:
+        tid = get_ident()
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = current_thread().name
+            self._events.append((span.name, span.start_ns, end_ns, tid, span.depth, span.args))
+
+    def events(self) -> list:
+        """Finished spans as dicts, times in microseconds since the tracer was created."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        return [{
+            'name': name,
+            'start_us': (start_ns - self._origin_ns) / 1000,
+            'dur_us': (end_ns - start_ns) / 1000,
+            'tid': tid,
+            'thread': threads.get(tid, ''),
+            'depth': depth,
+            'args': args,
+        } for name, start_ns, end_ns, tid, depth, args in events]
+
+    def export_chrome(self, path: str) -> int:
+        """Write chrome://tracing / Perfetto ``trace_event`` JSON; returns the span count."""
+        events = self.events()
+        pid = os.getpid()
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in {e['tid']: e['thread'] for e in events}.items()]
+        trace.extend({
+            'name': e['name'],
+            'cat': e['name'].split('.', 1)[0],
+            'ph': 'X',
+            'ts': e['start_us'],
+            'dur': e['dur_us'],
+            'pid': pid,
+            'tid': e['tid'],
+            'args': e['args'],
+        } for e in events)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, default=str)
+        return len(events)
+
+    def export_jsonl(self, path: str) -> int:
+        """Write one JSON object per span; returns the span count."""
+        events = self.events()
+        with open(path, 'w', encoding='utf-8') as f:
+            for e in events:
+                f.write(json.dumps(e, default=str) + '\n')
+        return len(events)
+
+    def export(self, path: str) -> int:
+        """JSON lines for ``.jsonl`` paths, Chrome trace JSON otherwise."""
+        if path.endswith('.jsonl'):
+            return self.export_jsonl(path)
+        return self.export_chrome(path)
+
+
+# process-wide tracer; modules instrument with ``with span('stage'):``
+tracer = Tracer()
+span = tracer.span
@@ -1,25 +1,63 @@
+import argparse
+import csv
 import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from catalog_store import load_catalog
+from item_table import FAIR_MARGIN, ItemTable, verdict
+from search_index import SearchIndex
+
+CACHE_FILE = 'item_values_cache.json'
+# trades handed to a batch worker at a time
+BATCH_CHUNK_SIZE = 2000
 
 def load_items():
     try:
-        with open('item_values_cache.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('items', {})
+        items, _ = load_catalog(CACHE_FILE)
+        return items
     except:
-        print("Error: item_values_cache.json not found!")
+        print(f"Error: {CACHE_FILE} not found!")
         return {}
 
-def find_item(items, search_term):
-    search_lower = search_term.lower().strip()
+def find_item(items, search_term, index=None):
+    """Best-ranked item for ``search_term`` (see SearchIndex)"""
+    if index is None:
+        index = SearchIndex(items)
+    name = index.best(search_term)
+    return items[name] if name is not None else None
+
+def install_completion(index):
+    """Tab-complete item names at the input() prompts; needs readline,
+    which Windows Python doesn't ship, so it's skipped there"""
+    try:
+        import readline
+    except ImportError:
+        return False
     
-    for item_name, item_data in items.items():
-        if search_lower in item_name.lower():
-            return item_data
+    matches = []
+    def complete(text, state):
+        if state == 0:
+            matches[:] = index.search(text)
+        return matches[state] if state < len(matches) else None
     
-    return None
+    readline.set_completer(complete)
+    # item names contain spaces and dashes: complete the whole line
+    readline.set_completer_delims('')
+    readline.parse_and_bind('tab: complete')
+    return True
 
 def calculate_trade():
     items = load_items()
+    table = ItemTable.from_items(items)
+    index = SearchIndex(items)
+    if install_completion(index):
+        print("\nPress Tab to complete item names")
     print(f"\nLoaded {len(items)} items from cache\n")
     print("="*60)
     print("COUNTER BLOX TRADE HELPER")
@@ -36,7 +74,7 @@ def calculate_trade():
         if not item_name:
             continue
             
-        found = find_item(items, item_name)
+        found = find_item(items, item_name, index)
         if found:
             your_items.append(found)
             print(f"    ✓ Added: {found['name']} - Value: {int(found.get('base_value', 0)):,}")
@@ -51,15 +89,16 @@ def calculate_trade():
         if not item_name:
             continue
             
-        found = find_item(items, item_name)
+        found = find_item(items, item_name, index)
         if found:
             their_items.append(found)
             print(f"    ✓ Added: {found['name']} - Value: {int(found.get('base_value', 0)):,}")
         else:
             print(f"    ✗ Not found. Try again.")
     
-    your_value = sum(item.get('base_value', 0) for item in your_items)
-    their_value = sum(item.get('base_value', 0) for item in their_items)
+    totals = table.compare(table.rows(your_items), table.rows(their_items))
+    your_value = totals['your']['base']
+    their_value = totals['their']['base']
     
     print("\n" + "="*60)
     print("TRADE ANALYSIS")
@@ -77,11 +116,11 @@ def calculate_trade():
         print(f"  • {item['name']:<45} {value:>10,}")
     print(f"\n{'TOTAL:':<47} {int(their_value):>10,}")
     
-    difference = their_value - your_value
-    percentage = (difference / max(your_value, 1)) * 100 if your_value > 0 else 0
+    difference = totals['base']['diff']
+    percentage = totals['base']['pct']
     
     print("\n" + "="*60)
-    if abs(difference) < 50:
+    if abs(difference) < FAIR_MARGIN:
         print("RESULT: FAIR TRADE")
     elif difference > 0:
         print(f"RESULT: WIN (You gain +{int(difference):,} | +{percentage:.1f}%)")
@@ -94,5 +133,180 @@ def calculate_trade():
         print("\n\n")
         calculate_trade()
 
+def read_trades(path):
+    """Stream (id, your names, their names) from a JSONL file of
+    {"id": ..., "your": [...], "their": [...]} lines, or from a CSV file
+    with id, your and their columns and names separated by ';'"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for line_no, row in enumerate(csv.DictReader(f), 1):
+                your, their = ([name.strip() for name in (row.get(side) or '').split(';') if name.strip()]
+                               for side in ('your', 'their'))
+                yield row.get('id') or line_no, your, their
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                trade = json.loads(line)
+                yield trade.get('id', line_no), trade.get('your', []), trade.get('their', [])
+
+def chunked(iterable, size):
+    chunk = []
+    for entry in iterable:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class TradeEvaluator:
+    """Scores chunks of trades against one catalog, same rules as the
+    helper's show_result. Names resolve exactly first, then through the
+    SearchIndex; every resolution is remembered, trade logs repeat a lot.
+    A name the SearchIndex turned into a different item is listed in the
+    trade's ``resolved`` field, so a typo scored as some other item shows."""
+    
+    def __init__(self, items):
+        self.table = ItemTable.from_items(items)
+        self.index = SearchIndex(self.table.names)
+        self.resolved = {}
+        # name -> the item the SearchIndex picked for it
+        self.fuzzy = {}
+    
+    def row(self, name):
+        """Table row of ``name``, -1 when nothing matches"""
+        row = self.resolved.get(name)
+        if row is None:
+            row = self.table.index.get(name)
+            if row is None:
+                best = self.index.best(name)
+                row = self.table.index[best] if best is not None else -1
+                if best is not None:
+                    self.fuzzy[name] = best
+            self.resolved[name] = row
+        return row
+    
+    def evaluate(self, trades):
+        # both sides of the whole chunk as flat rows + offsets, summed per trade in one go
+        sums = {}
+        unresolved = [[] for _ in trades]
+        resolved = [{} for _ in trades]
+        for side, pos in (('your', 1), ('their', 2)):
+            rows = []
+            offsets = [0]
+            for i, trade in enumerate(trades):
+                for name in trade[pos]:
+                    row = self.row(name)
+                    if row < 0:
+                        unresolved[i].append(name)
+                    else:
+                        rows.append(row)
+                        if name in self.fuzzy:
+                            resolved[i][name] = self.fuzzy[name]
+                offsets.append(len(rows))
+            rows = np.array(rows, dtype=np.intp)
+            offsets = np.array(offsets, dtype=np.intp)
+            sums[side] = {column: self.table.group_totals(rows, offsets, column).tolist()
+                          for column in ('base', 'adjusted')}
+        
+        results = []
+        for i, (trade_id, _, _) in enumerate(trades):
+            result = {'id': trade_id}
+            for column in ('base', 'adjusted'):
+                your, their = sums['your'][column][i], sums['their'][column][i]
+                diff = their - your
+                pct = (diff / max(your, 1)) * 100 if your > 0 else 0
+                result[column] = {'your': your, 'their': their, 'diff': diff,
+                                  'pct': round(pct, 2), 'verdict': verdict(diff)}
+            if resolved[i]:
+                result['resolved'] = resolved[i]
+            if unresolved[i]:
+                result['unresolved'] = unresolved[i]
+            results.append(result)
+        return results
+
+# one per batch worker process, built by _init_worker
+_evaluator = None
+
+def _init_worker(cache_file):
+    # the binary catalog is mmap'd, so workers share its pages
+    global _evaluator
+    items, _ = load_catalog(cache_file)
+    _evaluator = TradeEvaluator(items)
+
+def _evaluate_chunk(trades):
+    return _evaluator.evaluate(trades)
+
+def batch_evaluate(input_path, output_path='-', workers=None, chunk_size=BATCH_CHUNK_SIZE, cache_file=CACHE_FILE):
+    """Score every trade in ``input_path`` and write one JSON result per
+    line, in input order; returns the number of trades.
+
+    The evaluator is built here first, so a missing or broken cache raises
+    OSError/ValueError instead of breaking every worker's initializer."""
+    workers = workers or os.cpu_count() or 1
+    items, _ = load_catalog(cache_file)
+    evaluator = TradeEvaluator(items)
+    out = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    count = 0
+    resolved = 0
+    unresolved = 0
+    
+    def write(results):
+        nonlocal count, resolved, unresolved
+        out.write(''.join(json.dumps(result) + '\n' for result in results))
+        count += len(results)
+        resolved += sum(len(result.get('resolved', ())) for result in results)
+        unresolved += sum(len(result.get('unresolved', ())) for result in results)
+    
+    start = time.perf_counter()
+    chunks = chunked(read_trades(input_path), chunk_size)
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                write(evaluator.evaluate(chunk))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(cache_file,)) as pool:
+                # a bounded window of chunks in flight, so the input is only read a little ahead of the output
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_evaluate_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    elapsed = time.perf_counter() - start
+    # stdout may be the results, so the summary goes to stderr
+    print(f"Scored {count:,} trades in {elapsed:.2f}s: {count / max(elapsed, 1e-9):,.0f} trades/sec "
+          f"({workers} worker(s), {resolved} fuzzy-matched name(s), {unresolved} unresolved name(s))",
+          file=sys.stderr)
+    return count
+
 if __name__ == "__main__":
-    calculate_trade()
+    parser = argparse.ArgumentParser(description="Counter Blox trade calculator")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="score every trade in a .jsonl file ({\"your\": [...], \"their\": [...]} per line) "
+                             "or a .csv file (id,your,their columns, names separated by ';') instead of asking")
+    parser.add_argument('--output', default='-',
+                        help="where batch results go, one JSON object per line (default: stdout)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="batch worker processes, 0 = one per CPU (default: 0)")
+    parser.add_argument('--chunk-size', type=int, default=BATCH_CHUNK_SIZE,
+                        help=f"trades per worker task (default: {BATCH_CHUNK_SIZE})")
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help=f"item cache to score against (default: {CACHE_FILE})")
+    args = parser.parse_args()
+    
+    if args.batch:
+        try:
+            batch_evaluate(args.batch, args.output, workers=args.workers,
+                           chunk_size=args.chunk_size, cache_file=args.cache)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        calculate_trade()
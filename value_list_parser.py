@@ -0,0 +1,594 @@
+import codecs
+import hashlib
+import re
+from collections import deque
+from html import unescape
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+HEADINGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+TEXT_BLOCKS = HEADINGS | {'p'}
+CATEGORY_WINDOW = 5
+
+WEAPON_KEYWORDS = ['ak-47', 'ak', 'awp', 'm4a4', 'm4a1', 'mp', 'mac', 'p250', 'p90',
+                   'eagle', 'desert', 'deagle', 'five', 'seven', 'glock', 'usp',
+                   'famas', 'galil', 'aug', 'sg', 'ssg', 'scout', 'negev',
+                   'bizon', 'ppsh', 'thompson', 'nova', 'xm', 'mag', 'sawed',
+                   'karambit', 'huntsman', 'bayonet', 'butterfly', 'bowie',
+                   'falchion', 'flip', 'gut', 'navaja', 'shadow', 'stiletto',
+                   'talon', 'ursus', 'cleaver', 'sickle']
+STATUS_WORDS = frozenset(['decent', 'good', 'bad', 'mid', 'tsthas', 'unknown yet',
+                          'null', 'doesnt exist', 'low', 'high', 'pink', 'red', 'blue',
+                          'purple', 'gold', 'covert', 'classified', 'cks', 'ck'])
+IGNORED_CATEGORIES = frozenset(['hi', 'guns', 'gloves', 'knives', ''])
+HEADER_KEYWORDS = ['skin', 'item', 'name', 'rarities', 'rarity',
+                   'too small to have a status', 'tsthas',
+                   'easy to find', 'a little bit harder to find', 'hard to find',
+                   'doesn\'t exist', 'noone ever had it', 'case item',
+                   'base value', 'dg value', 'ck value', 'upg value', 'status',
+                   'value', 'demand', 'except mods']
+STATUS_KEYWORDS = ['good', 'bad', 'mid', 'low', 'high', 'pink', 'red', 'purple',
+                   'blue', 'gold', 'covert', 'classified', 'restricted', 'mil-spec',
+                   'consumer', 'industrial', 'decent']
+KNIFE_SUFFIXES = [' KNIVES', ' Knives', ' knives', ' KNIFE', ' Knife', ' knife']
+CK_DELIMITERS = ["CKS", " CK", " -", " (", "CASE"]
+
+
+def _any_of(words) -> re.Pattern:
+    # one alternation instead of a Python-level any(kw in text ...) loop
+    return re.compile('|'.join(re.escape(w) for w in sorted(set(words), key=len, reverse=True)))
+
+
+WEAPON_RE = _any_of(WEAPON_KEYWORDS)
+HEADER_RE = _any_of(HEADER_KEYWORDS)
+STATUS_RE = _any_of(STATUS_KEYWORDS)
+STATUS_SET = frozenset(STATUS_KEYWORDS)
+KNIFE_RE = _any_of(['knives', 'knife'])
+NUMBER_RE = re.compile(r'[\d,]+\.?\d*')
+# text that is only a number once , . - + k and spaces are dropped
+NUMERIC_ONLY_RE = re.compile(r'[\d,.\-+k ]*\d[\d,.\-+k ]*')
+DIGIT_OR_DASH_RE = re.compile(r'[\d-]')
+NON_ASCII_RE = re.compile(r'[^\x00-\x7f]+')
+
+# only the tags the parser acts on (quoted attribute values may contain
+# '>'), plus comments so tags inside them are skipped; any other markup
+# (span, a, br, ...) stays in the text between matches and is stripped there
+MARKUP_RE = re.compile(r'<!--.*?-->|<(/?)(p|h[1-6]|table|tr|td|th|script|style)(?=[\s/>])'
+                       r'((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.S | re.I)
+OTHER_MARKUP_RE = re.compile(r'<!--.*?-->|<(?:/?[a-zA-Z][^\t\n\r\f />\x00]*(?:[^>"\']|"[^"]*"|\'[^\']*\')*'
+                             r'|![^>]*|\?[^>]*)>', re.S)
+TABLE_TAG_RE = re.compile(r'<(/?)table(?=[\s/>])(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.I)
+RAW_TEXT_END = {'script': re.compile(r'</script\s*>', re.I), 'style': re.compile(r'</style\s*>', re.I)}
+STRUCTURE_TAGS = TEXT_BLOCKS | {'table', 'tr', 'td', 'th'}
+
+
+class IrregularMarkup(ValueError):
+    """The export uses markup the streaming parser doesn't reproduce the
+    tree builder's reading of; parse it with _parse_document instead."""
+
+
+def remove_emojis(text: str) -> str:
+    return NON_ASCII_RE.sub('', text)
+
+
+def status_to_demand(status: str) -> int:
+    status_lower = status.lower()
+
+    if 'red' in status_lower or 'gold' in status_lower or 'covert' in status_lower:
+        base = 8
+    elif 'pink' in status_lower or 'classified' in status_lower:
+        base = 6
+    elif 'purple' in status_lower or 'restricted' in status_lower:
+        base = 4
+    elif 'blue' in status_lower or 'mil-spec' in status_lower:
+        base = 2
+    else:
+        base = 5
+
+    if 'good' in status_lower or 'high' in status_lower:
+        return min(10, base + 2)
+    elif 'bad' in status_lower or 'low' in status_lower:
+        return max(1, base - 2)
+    else:
+        return base
+
+
+def category_candidate(text: str, distance: int):
+    """(priority, cleaned text, distance) for one text element before a
+    table, or None when it can't name the table."""
+    text = remove_emojis(text.strip()).strip()
+    if len(text) < 2:
+        return None
+
+    cleaned = text
+    for suffix in ("'s", "'S"):
+        if cleaned.endswith(suffix):
+            cleaned = cleaned[:-len(suffix)]
+            break
+
+    if 'CKS' in cleaned or 'CASE KNIVES' in cleaned.upper():
+        for delimiter in CK_DELIMITERS:
+            if delimiter in cleaned:
+                before = cleaned.split(delimiter)[0].strip()
+                if before and len(before) >= 2:
+                    cleaned = before
+                    break
+
+    cleaned = cleaned.strip()
+    lower = cleaned.lower()
+    if lower in IGNORED_CATEGORIES or 'rarities' in lower:
+        return None
+    if not 2 <= len(cleaned) <= 50:
+        return None
+    if NUMERIC_ONLY_RE.fullmatch(cleaned):
+        return None
+
+    priority = 0
+    if WEAPON_RE.search(lower):
+        priority += 100
+    if DIGIT_OR_DASH_RE.search(cleaned):
+        priority += 50
+    if cleaned.isupper() and len(cleaned) <= 8:
+        priority += 40
+    priority += max(0, 11 - distance * 2)
+    if lower in STATUS_WORDS:
+        priority -= 50
+    return priority, cleaned, distance
+
+
+def infer_category(texts: List[str]) -> str:
+    """Category of a table from the texts of the elements just before it,
+    oldest first (the last one is directly above the table)."""
+    best = None
+    for pos, text in enumerate(texts):
+        candidate = category_candidate(text, len(texts) - pos)
+        if candidate and (best is None or (-candidate[0], candidate[2]) < (-best[0], best[2])):
+            best = candidate
+    return best[1] if best else "Unknown"
+
+
+def table_end(html: str, start: int) -> int:
+    """End of the </table> closing the table whose start tag ends at
+    ``start``, or -1 if it isn't in ``html`` yet."""
+    depth = 1
+    for match in TABLE_TAG_RE.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+    return -1
+
+
+def table_fingerprint(category: str, table_html: str) -> str:
+    return hashlib.blake2b(f"{category}\0{table_html}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+# fingerprint -> ([(name, item), ...] in row order, texts of the last <= 5
+# heading/paragraph elements inside the table)
+TableEntry = Tuple[List[Tuple[str, Dict]], List[str]]
+
+
+class ValueDelta:
+    """What a refresh changed: added and removed items by name, and
+    changed ones as (old, new) pairs. apply() brings an older item dict up
+    to date in place."""
+
+    def __init__(self, added: Dict[str, Dict] = None, removed: Dict[str, Dict] = None,
+                 changed: Dict[str, Tuple[Dict, Dict]] = None):
+        self.added = added or {}
+        self.removed = removed or {}
+        self.changed = changed or {}
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def apply(self, items: Dict[str, Dict]) -> Dict[str, Dict]:
+        for name in self.removed:
+            items.pop(name, None)
+        for name, (_, new) in self.changed.items():
+            items[name] = new
+        items.update(self.added)
+        return items
+
+    def summary(self) -> str:
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+    def to_dict(self) -> Dict:
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'changed': {name: {'old': old, 'new': new} for name, (old, new) in self.changed.items()},
+        }
+
+
+def diff_items(old: Dict[str, Dict], new: Dict[str, Dict], names: Optional[Iterable[str]] = None) -> ValueDelta:
+    """ValueDelta from ``old`` to ``new``, looking only at ``names`` when given."""
+    delta = ValueDelta()
+    for name in (set(old) | set(new)) if names is None else names:
+        before, after = old.get(name), new.get(name)
+        if before == after:
+            continue
+        if before is None:
+            delta.added[name] = after
+        elif after is None:
+            delta.removed[name] = before
+        else:
+            delta.changed[name] = (before, after)
+    return delta
+
+
+def numeric_value(text: str):
+    match = NUMBER_RE.search(text.strip().replace(',', ''))
+    if match:
+        try:
+            return float(match.group())
+        except ValueError:
+            return 0
+    return 0
+
+
+class _Element:
+    __slots__ = ('tag', 'parts', 'text')
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.parts = []
+        self.text = None
+
+    def get_text(self) -> str:
+        return self.text if self.text is not None else ''.join(self.parts)
+
+
+class _Table:
+    __slots__ = ('category', 'row_count', 'headers', 'name_prefix', 'parsed')
+
+    def __init__(self, category: str):
+        self.category = category
+        self.row_count = 0
+        self.headers = 0
+        self.parsed = 0
+        # what goes in front of a skin name that doesn't already contain the category
+        prefix = category
+        if KNIFE_RE.search(category.lower()):
+            for suffix in KNIFE_SUFFIXES:
+                prefix = prefix.replace(suffix, '')
+        self.name_prefix = prefix
+
+
+class ValueListParser:
+    """Streaming parser for the value-list HTML export.
+
+    Produces the same items as ValueListFetcher._parse_document without a
+    document tree: only the last five heading/paragraph/table elements are
+    kept for naming the next table, and each row becomes an item as soon as
+    its closing </tr> is seen. Feed it the export in chunks or all at once.
+
+    Markup is tokenized with one regex and only table/row/cell/paragraph/
+    heading tags are acted on; html.parser's per-attribute work is skipped.
+
+    Only well-formed tables are supported, which is what Google Docs
+    exports. A table nested in a cell, a table inside an unclosed <p> or
+    heading, and omitted </td>/</th>/</tr> tags read differently in the
+    tree builder (nested rows and cells are flattened into the outer
+    table, an open <p> swallows the table's text); they raise
+    IrregularMarkup rather than silently giving different items.
+
+    Every top-level table is fingerprinted by its HTML and category. With
+    ``previous_tables`` from an earlier parse, a table whose fingerprint is
+    known is not tokenized again: its items are replayed and only the
+    category window is restored. ``tables`` holds the entries for the next
+    refresh and ``dirty_names`` the names coming from re-parsed tables.
+    """
+
+    def __init__(self, on_item: Optional[Callable[[str, Dict], None]] = None, verbose: bool = False,
+                 previous_tables: Optional[Dict[str, TableEntry]] = None):
+        self.previous_tables = previous_tables or {}
+        self.tables: Dict[str, TableEntry] = {}
+        self.dirty_names = set()
+        self.reused_tables = 0
+        self.parsed_tables = 0
+        self._next_category = None
+        self._top = None         # (fingerprint, items, window serial) of the table being parsed
+        self._serial = 0         # elements pushed into the window so far
+        self._buffer = ''
+        self._raw_end = None     # closing-tag pattern while inside <script>/<style>
+        self.items: Dict[str, Dict] = {}
+        self.on_item = on_item
+        self.verbose = verbose
+        self.table_count = 0
+
+        self._window = deque(maxlen=CATEGORY_WINDOW)
+        self._open = []          # open p/h/td/th/tr/table elements, innermost last
+        self._collectors = []    # open elements whose text is being gathered
+        self._tables = []
+        self._rows = []
+
+    def feed(self, data: str) -> None:
+        self._buffer += data
+        self._scan(final=False)
+
+    def close(self) -> None:
+        self._scan(final=True)
+
+    def _scan(self, final: bool) -> None:
+        buffer = self._buffer
+        pos = 0
+        while pos < len(buffer):
+            if self._raw_end is not None:
+                end = self._raw_end.search(buffer, pos)
+                if end is None:
+                    break
+                self._raw_end = None
+                pos = end.end()
+                continue
+            match = MARKUP_RE.search(buffer, pos)
+            if match is None:
+                break
+            if match.start() > pos and self._collectors:
+                self.handle_data(buffer[pos:match.start()])
+            pos = match.end()
+            closing, name, attrs = match.groups()
+            if name is None:
+                continue
+            tag = name.lower()
+            if closing:
+                if tag in STRUCTURE_TAGS:
+                    self.handle_endtag(tag)
+            elif tag in STRUCTURE_TAGS:
+                self._check_start(tag)
+                if tag == 'table' and not self._tables:
+                    # a top-level table is handled whole, so it can be fingerprinted
+                    end = table_end(buffer, match.end())
+                    if end < 0:
+                        if not final:
+                            pos = match.start()
+                            break
+                        end = len(buffer)
+                    if self._begin_table(buffer[match.start():end]):
+                        pos = end
+                        continue
+                self.handle_starttag(tag)
+                if attrs.endswith('/'):
+                    self.handle_endtag(tag)
+            else:
+                self._raw_end = RAW_TEXT_END[tag]
+        # text after the last tag waits for the next one, so an entity or a
+        # tag split across feeds is never cut in half
+        if final:
+            if pos < len(buffer) and self._collectors and self._raw_end is None:
+                self.handle_data(buffer[pos:])
+            self._buffer = ''
+        else:
+            self._buffer = buffer[pos:]
+
+    def _check_start(self, tag: str) -> None:
+        if tag == 'table':
+            if self._tables:
+                raise IrregularMarkup("nested <table>")
+            if any(e.tag in TEXT_BLOCKS for e in self._open):
+                raise IrregularMarkup("<table> inside an unclosed paragraph or heading")
+        elif tag == 'tr' and self._rows:
+            raise IrregularMarkup("<tr> without </tr>")
+        elif tag in ('td', 'th') and any(e.tag in ('td', 'th') for e in self._open):
+            raise IrregularMarkup(f"<{tag}> without closing the previous cell")
+
+    def _category(self) -> str:
+        # earlier tables keep their slot (distances count them) but never name one
+        return infer_category([e.get_text() if e.tag != 'table' else '' for e in self._window])
+
+    def _push_window(self, element: _Element) -> None:
+        self._window.append(element)
+        self._serial += 1
+
+    def _begin_table(self, table_html: str) -> bool:
+        """Fingerprint a top-level table; True when it was replayed from
+        ``previous_tables`` and needs no parsing."""
+        category = self._category()
+        fingerprint = table_fingerprint(category, table_html)
+        entry = self.previous_tables.get(fingerprint)
+        if entry is None:
+            self._next_category = category
+            self._top = (fingerprint, [], None)
+            return False
+
+        items, tail = entry
+        self.tables[fingerprint] = entry
+        self.table_count += 1
+        self.reused_tables += 1
+        table = _Element('table')
+        table.text = ''
+        self._push_window(table)
+        for text in tail:
+            element = _Element('p')
+            element.text = text
+            self._push_window(element)
+        for name, item in items:
+            self.items[name] = item
+            if self.on_item:
+                self.on_item(name, item)
+        if self.verbose:
+            print(f"  Unchanged '{category}' ({len(items)} items)")
+        return True
+
+    def handle_starttag(self, tag):
+        if tag in TEXT_BLOCKS:
+            element = _Element(tag)
+            self._push_window(element)
+            self._open.append(element)
+            self._collectors.append(element)
+        elif tag == 'table':
+            category = self._next_category if self._next_category is not None else self._category()
+            self._next_category = None
+            table = _Table(category)
+            self._tables.append(table)
+            self.table_count += 1
+            element = _Element(tag)
+            self._push_window(element)
+            self._open.append(element)
+            if self._top is not None and len(self._tables) == 1:
+                self._top = (self._top[0], self._top[1], self._serial)
+        elif tag == 'tr':
+            if self._tables:
+                row = _Element(tag)
+                row.parts = []   # cell texts
+                self._rows.append(row)
+                self._open.append(row)
+        elif tag in ('td', 'th'):
+            if self._rows:
+                element = _Element(tag)
+                self._open.append(element)
+                self._collectors.append(element)
+
+    def handle_endtag(self, tag):
+        # like the tree builder: a stray end tag is ignored, otherwise it
+        # also closes anything still open inside its element
+        if not any(e.tag == tag for e in self._open):
+            return
+        while self._open:
+            element = self._open.pop()
+            if element.tag != tag and (tag in ('table', 'tr') or element.tag in ('td', 'th', 'tr')):
+                raise IrregularMarkup(f"</{tag}> closing an unclosed <{element.tag}>")
+            self._close(element)
+            if element.tag == tag:
+                break
+
+    def handle_data(self, data):
+        if '<' in data:
+            data = OTHER_MARKUP_RE.sub('', data)
+        if '&' in data:
+            data = unescape(data)
+        for element in self._collectors:
+            element.parts.append(data)
+
+    def _close(self, element: _Element) -> None:
+        if element.tag in TEXT_BLOCKS or element.tag in ('td', 'th'):
+            element.text = ''.join(element.parts)
+            element.parts = None
+            self._collectors.remove(element)
+            if element.tag in ('td', 'th') and self._rows:
+                self._rows[-1].parts.append(element.text)
+        elif element.tag == 'tr':
+            self._rows.remove(element)
+            if self._tables:
+                self._row_done(self._tables[-1], element.parts)
+        elif element.tag == 'table':
+            element.text = ''
+            table = self._tables.pop()
+            if not self._tables and self._top is not None:
+                self._end_top_table()
+            if self.verbose:
+                if table.row_count < 3:
+                    print(f"  Skipping '{table.category}' - not enough rows (need at least 3, found {table.row_count})")
+                else:
+                    print(f"  Parsed {table.parsed} items from '{table.category}' ({table.row_count - 2} data rows)")
+
+    def _end_top_table(self) -> None:
+        fingerprint, items, serial = self._top
+        self._top = None
+        inner = min(self._serial - serial, CATEGORY_WINDOW)
+        tail = [e.get_text() if e.tag != 'table' else '' for e in list(self._window)[len(self._window) - inner:]] if inner else []
+        self.tables[fingerprint] = (items, tail)
+        self.parsed_tables += 1
+        self.dirty_names.update(name for name, _ in items)
+
+    def _row_done(self, table: _Table, cells: List[str]) -> None:
+        index = table.row_count
+        table.row_count += 1
+        if index == 1:
+            table.headers = len(cells)
+            return
+        if index < 2 or not cells:
+            return
+
+        skin_name = remove_emojis(cells[0].strip()).strip()
+        if not skin_name:
+            return
+        lower = skin_name.lower()
+        if HEADER_RE.search(lower):
+            return
+        if len(skin_name.split()) <= 2 and STATUS_RE.search(lower):
+            return
+        if lower in STATUS_SET:
+            return
+
+        category = table.category
+        if category and category.lower() not in lower:
+            name = f"{table.name_prefix} {skin_name}"
+        else:
+            name = skin_name
+
+        headers = table.headers
+
+        def cell_number(idx):
+            return numeric_value(cells[idx]) if idx < headers and idx < len(cells) else 0
+
+        base_value = cell_number(1)
+        dg_value = cell_number(2)
+        ck_value = cell_number(3)
+        upg_value = cell_number(4)
+        status = remove_emojis(cells[5].strip()).strip() if headers > 5 and len(cells) > 5 else ""
+
+        primary_value = base_value or ck_value or dg_value or upg_value
+        item = {
+            'name': name,
+            'value': primary_value,
+            'base_value': base_value,
+            'dg_value': dg_value,
+            'ck_value': ck_value,
+            'upg_value': upg_value,
+            'rap': primary_value,
+            'demand': status_to_demand(status),
+            'status': status,
+            'category': category
+        }
+        self.items[name] = item
+        table.parsed += 1
+        if self._top is not None:
+            self._top[1].append((name, item))
+        if self.on_item:
+            self.on_item(name, item)
+
+
+def _feed(parser: ValueListParser, html, chunk_size: int) -> None:
+    # incremental, so a multi-byte character split across chunks survives
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace') if isinstance(html, bytes) else None
+    for start in range(0, len(html), chunk_size):
+        chunk = html[start:start + chunk_size]
+        parser.feed(decoder.decode(chunk) if decoder else chunk)
+    if decoder:
+        parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+
+
+def parse_value_list(html, chunk_size: int = 1 << 16, verbose: bool = False) -> Dict[str, Dict]:
+    """Items from a value-list export (str or UTF-8 bytes), fed in chunks."""
+    parser = ValueListParser(verbose=verbose)
+    _feed(parser, html, chunk_size)
+    if verbose:
+        print(f"Found {parser.table_count} tables in document")
+    return parser.items
+
+
+def refresh_value_list(html, old_items: Dict[str, Dict], previous_tables: Optional[Dict[str, TableEntry]] = None,
+                       chunk_size: int = 1 << 16, verbose: bool = False):
+    """Re-parse only the tables that changed since ``previous_tables``.
+
+    Returns (items, delta from ``old_items``, tables for the next refresh).
+    Without previous tables everything is parsed and diffed.
+    """
+    parser = ValueListParser(verbose=verbose, previous_tables=previous_tables)
+    _feed(parser, html, chunk_size)
+    if verbose:
+        print(f"Found {parser.table_count} tables in document, "
+              f"{parser.parsed_tables} changed, {parser.reused_tables} unchanged")
+
+    if previous_tables is None:
+        names = None
+    else:
+        # only rows of re-parsed tables or of tables that are gone can differ
+        names = set(parser.dirty_names)
+        for fingerprint, (items, _) in previous_tables.items():
+            if fingerprint not in parser.tables:
+                names.update(name for name, _ in items)
+    return parser.items, diff_items(old_items, parser.items, names), parser.tables